@@ -0,0 +1,108 @@
+"""Run blocking calls off the Tk thread and hand their outcomes back to it."""
+
+from __future__ import annotations
+
+import queue
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+
+class BackgroundRunner:
+    """Run blocking calls on worker threads and deliver their outcomes on the UI thread.
+
+    ``after`` is the toolkit's timer hook (``win.after``). Workers put finished calls on a
+    queue, which is drained from that hook every ``poll_ms`` milliseconds while any call is
+    outstanding, so callbacks only ever run on the UI thread.
+
+    Every call belongs to a ``channel`` (one per button or view). Submitting again on a
+    channel supersedes the earlier call: it is cancelled if it has not started, and its
+    result is dropped if it arrives later.
+    """
+
+    def __init__(
+        self,
+        after: Callable[[int, Callable[[], None]], Any],
+        max_workers: int = 4,
+        poll_ms: int = 50,
+    ) -> None:
+        self._after = after
+        self._poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gui")
+        self._done: queue.SimpleQueue[tuple[str, int, bool, Any]] = queue.SimpleQueue()
+        self._generations: dict[str, int] = {}
+        self._callbacks: dict[str, tuple[Callable[[Any], None], Callable[[Exception], None]]] = {}
+        self._current: dict[str, Future] = {}
+        self._polling = False
+
+    def submit(
+        self,
+        channel: str,
+        fn: Callable[[], Any],
+        on_done: Callable[[Any], None],
+        on_error: Callable[[Exception], None] | None = None,
+    ) -> int:
+        """Run ``fn()`` in the background and pass its result to ``on_done`` on the UI thread.
+
+        If ``fn`` raises, the exception goes to ``on_error`` instead (or is re-raised on the
+        UI thread when there is none). Returns the call's generation on ``channel``.
+        """
+        generation = self._generations.get(channel, 0) + 1
+        self._generations[channel] = generation
+        self._callbacks[channel] = (on_done, on_error or _reraise)
+        previous = self._current.get(channel)
+        if previous is not None:
+            previous.cancel()
+
+        def run() -> None:
+            try:
+                self._done.put((channel, generation, True, fn()))
+            except Exception as exc:  # noqa: BLE001 - handed to on_error on the UI thread
+                self._done.put((channel, generation, False, exc))
+
+        self._current[channel] = self._executor.submit(run)
+        if not self._polling:
+            self._polling = True
+            self._after(self._poll_ms, self._poll)
+        return generation
+
+    def busy(self, channel: str) -> bool:
+        """Whether the latest call on ``channel`` has not been delivered yet."""
+        return channel in self._current
+
+    def cancel(self, channel: str) -> None:
+        """Drop the outstanding call on ``channel``, if any."""
+        self._generations[channel] = self._generations.get(channel, 0) + 1
+        future = self._current.pop(channel, None)
+        if future is not None:
+            future.cancel()
+
+    def shutdown(self) -> None:
+        for channel in list(self._current):
+            self.cancel(channel)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _poll(self) -> None:
+        finished = []
+        while True:
+            try:
+                finished.append(self._done.get_nowait())
+            except queue.Empty:
+                break
+        deliveries = []
+        for channel, generation, ok, value in finished:
+            if generation != self._generations.get(channel):
+                continue  # superseded by a newer call on the same channel
+            del self._current[channel]
+            on_done, on_error = self._callbacks.pop(channel)
+            deliveries.append((on_done, value) if ok else (on_error, value))
+        # Keep polling before running callbacks, so one that raises cannot stall delivery
+        self._polling = bool(self._current)
+        if self._polling:
+            self._after(self._poll_ms, self._poll)
+        for callback, value in deliveries:
+            callback(value)
+
+
+def _reraise(exc: Exception) -> None:
+    raise exc
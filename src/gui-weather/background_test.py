@@ -0,0 +1,78 @@
+"""Tests for the Tk background runner, driven by a fake ``after`` hook."""
+
+import threading
+
+import pytest
+from background import BackgroundRunner
+
+
+class FakeAfter:
+    """Collects scheduled callbacks; ``run()`` plays the Tk event loop for them."""
+
+    def __init__(self):
+        self.scheduled = []
+
+    def __call__(self, ms, callback):
+        self.scheduled.append(callback)
+
+    def run(self, until, limit=500):
+        for _ in range(limit):
+            if until() or not self.scheduled:
+                break
+            self.scheduled.pop(0)()
+            threading.Event().wait(0.005)
+
+
+@pytest.fixture()
+def after():
+    return FakeAfter()
+
+
+def test_results_are_delivered_from_the_after_hook(after):
+    runner = BackgroundRunner(after)
+    seen = []
+    worker_threads = []
+
+    def fetch():
+        worker_threads.append(threading.current_thread())
+        return 42
+
+    runner.submit("noaa", fetch, on_done=seen.append)
+    assert runner.busy("noaa") and seen == []
+    after.run(until=lambda: seen)
+    assert seen == [42] and not runner.busy("noaa")
+    assert worker_threads[0] is not threading.current_thread()
+    after.run(until=lambda: False)
+    assert after.scheduled == []  # polling stops once nothing is outstanding
+    runner.shutdown()
+
+
+def test_newer_call_supersedes_older(after):
+    runner = BackgroundRunner(after, max_workers=2)
+    release = threading.Event()
+    seen = []
+
+    def slow():
+        release.wait(5)
+        return "old"
+
+    runner.submit("owm", slow, on_done=seen.append)
+    runner.submit("owm", lambda: "new", on_done=seen.append)
+    after.run(until=lambda: seen)
+    release.set()
+    after.run(until=lambda: False)
+    assert seen == ["new"]
+    runner.shutdown()
+
+
+def test_errors_go_to_on_error(after):
+    runner = BackgroundRunner(after)
+    errors = []
+
+    def fail():
+        raise OSError("upstream down")
+
+    runner.submit("stations", fail, on_done=errors.append, on_error=errors.append)
+    after.run(until=lambda: errors)
+    assert isinstance(errors[0], OSError)
+    runner.shutdown()
@@ -0,0 +1,113 @@
+"""Benchmark the all-states seek.php crawl against the old one-state-at-a-time loop.
+
+Starts the stand-in server with ``--latency`` per response and fetches every state's station
+list twice: sequentially with the old read-everything-then-parse approach, and through
+:func:`~services.stations.crawl_seek_stations`. Also times the old attribute-stringifying
+parser against :class:`~services.stations.SeekParser` on the recorded pages. Run from
+``src/gui-weather``::
+
+    python -m benchmarks.crawl_bench --latency 0.25 --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import timeit
+import urllib.request
+from html.parser import HTMLParser
+
+from services import noaa, transport
+from services.ratelimit import LIMITERS
+from services.stations import US_STATES, SeekParser, crawl_seek_stations
+
+from benchmarks.standin_server import FIXTURES, Faults, StandinServer, point_services_at
+
+
+class LegacyParser(HTMLParser):
+    """The parser ``weather_app`` used before: stringify every attribute tuple and strip it."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.stations: list[str] = []
+        self.cities: list[str] = []
+        self.grab_data = False
+
+    def handle_starttag(self, tag, attrs):
+        for attr in attrs:
+            if "display.php?stid=" in str(attr):
+                cleaned_attr = str(attr)
+                cleaned_attr = cleaned_attr.replace("('href', 'display.php?stid=", "")
+                cleaned_attr = cleaned_attr.replace("')", "")
+                self.stations.append(cleaned_attr)
+                self.grab_data = True
+
+    def handle_data(self, data):
+        if self.grab_data:
+            self.cities.append(data)
+            self.grab_data = False
+
+
+def legacy_state(state: str) -> int:
+    url = f"{noaa.NOAA_SEEK_BASE}/xml/current_obs/seek.php?state={state.lower()}&Find=Find"
+    with urllib.request.urlopen(url, timeout=10) as request:
+        content = request.read().decode()
+    parser = LegacyParser()
+    parser.feed(content)
+    return len(parser.stations)
+
+
+def bench_parsers(number: int = 2000) -> None:
+    for path in sorted((FIXTURES / "seek").glob("*.html")):
+        page = path.read_text(encoding="latin-1")
+
+        def streaming() -> None:
+            parser = SeekParser(path.stem)
+            parser.feed(page)
+            parser.close()
+
+        legacy = timeit.timeit(lambda: LegacyParser().feed(page), number=number)
+        seek = timeit.timeit(streaming, number=number)
+        print(
+            f"{path.name:>8}  legacy {legacy / number * 1e6:7.1f} us"
+            f"  SeekParser {seek / number * 1e6:7.1f} us  ({legacy / seek:.2f}x)"
+        )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the seek.php station crawl.")
+    parser.add_argument("--latency", type=float, default=0.25, help="seconds per response")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument(
+        "--rate", type=float, default=None, help="client requests/second (default: NWS limit)"
+    )
+    args = parser.parse_args(argv)
+
+    bench_parsers()
+    with StandinServer(faults=Faults(latency=args.latency)) as server:
+        point_services_at(server.base_url, rate=args.rate)
+        if args.rate is None:
+            # Pace the stand-in host like the live seek.php host
+            rate, burst = LIMITERS.limits["w1.weather.gov"]
+            LIMITERS.configure(server.host, rate=rate, burst=burst)
+        # The shared pool allows 4 connections per host; size it to the worker count
+        transport.POOL = transport.ConnectionPool(max_per_host=args.workers, limiters=LIMITERS)
+
+        start = time.perf_counter()
+        found = sum(legacy_state(state) for state in US_STATES)
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = list(crawl_seek_stations(US_STATES, max_workers=args.workers))
+        crawled = time.perf_counter() - start
+
+    failures = sum(result.error is not None for result in results)
+    print(f"sequential  {sequential:6.2f} s  {found} stations")
+    print(
+        f"crawl       {crawled:6.2f} s  {sum(len(r.stations) for r in results)} stations"
+        f"  ({failures} failed states, {sequential / crawled:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Load test the NOAA batch lookups against the local stand-in server.
+
+Starts :class:`~benchmarks.standin_server.StandinServer` in-process with the requested
+faults, points the services at it and polls ``--stations`` synthetic stations through either
+the thread-pool batch API or the asyncio variant. Run from ``src/gui-weather``::
+
+    python -m benchmarks.load_bench --stations 5000 --mode aio --concurrency 128
+    python -m benchmarks.load_bench --mode threads --error-rate 0.05 --path-filter /stations/
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from services import aio, metrics, noaa, transport
+from services.ratelimit import LIMITERS
+
+from benchmarks.standin_server import Faults, StandinServer, point_services_at
+
+
+def run_threads(station_ids: list[str], concurrency: int) -> int:
+    # The shared pool allows 4 connections per host; size it to the worker count
+    transport.POOL = transport.ConnectionPool(max_per_host=concurrency, limiters=LIMITERS)
+    results = noaa.get_noaa_current_obs_many(station_ids, max_workers=concurrency)
+    return sum(result.error is not None for result in results)
+
+
+def run_aio(station_ids: list[str], concurrency: int) -> int:
+    # Likewise for the per-loop pools made by aio.get_pool()
+    aio.MAX_PER_HOST = concurrency
+
+    async def poll() -> int:
+        failures = 0
+        async for result in aio.get_noaa_current_obs_many(station_ids, concurrency=concurrency):
+            failures += result.error is not None
+        await aio.aclose()
+        return failures
+
+    return asyncio.run(poll())
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Load test NOAA lookups offline.")
+    parser.add_argument("--stations", type=int, default=2000)
+    parser.add_argument("--mode", choices=("threads", "aio"), default="aio")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--slow-body", type=float, default=0.0)
+    parser.add_argument("--path-filter", default="")
+    parser.add_argument("--prometheus", help="also write the metrics to this file")
+    args = parser.parse_args(argv)
+
+    faults = Faults(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        slow_body=args.slow_body,
+        path_filter=args.path_filter,
+    )
+    aggregator = metrics.MetricsAggregator()
+    unsubscribe = metrics.subscribe(aggregator)
+    station_ids = [f"S{n:05d}" for n in range(args.stations)]
+    noaa.OBS_CACHE.clear()
+    with StandinServer(faults=faults, seed=0) as server:
+        point_services_at(server.base_url)
+        start = time.perf_counter()
+        run = run_aio if args.mode == "aio" else run_threads
+        failures = run(station_ids, args.concurrency)
+        elapsed = time.perf_counter() - start
+    unsubscribe()
+
+    print(
+        f"{args.stations} stations via {args.mode} x{args.concurrency}: {elapsed:.2f}s"
+        f" ({args.stations / elapsed:.0f} lookups/s, {failures} failed)"
+    )
+    print(f"server responses: {dict(sorted(server.requests.items()))}")
+    for endpoint in ("nws_v3", "xml"):
+        quantiles = aggregator.quantiles("noaa", endpoint)
+        if quantiles:
+            summary = "  ".join(f"p{int(q * 100)} {v * 1000:.1f} ms" for q, v in quantiles.items())
+            print(f"noaa/{endpoint} total latency: {summary}")
+    if args.prometheus:
+        aggregator.write_prometheus(args.prometheus)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,481 @@
+"""Local stand-in for the NWS, legacy NOAA XML and OpenWeatherMap endpoints.
+
+Serves the recorded payloads under ``fixtures/`` on the same URL paths as upstream, with
+configurable latency, errors, throttling and slow bodies, so retries, fallback and
+concurrency can be load tested offline. Run from ``src/gui-weather``::
+
+    python -m benchmarks.standin_server --port 8080 --latency 0.05 --error-rate 0.02
+
+and point the services at it, either through the environment::
+
+    WEATHER_NWS_API_BASE=http://127.0.0.1:8080 WEATHER_NOAA_BASE=http://127.0.0.1:8080 \\
+    WEATHER_NOAA_SEEK_BASE=http://127.0.0.1:8080 WEATHER_OWM_API_BASE=http://127.0.0.1:8080 \\
+    WEATHER_OWM_ICON_BASE=http://127.0.0.1:8080 ...
+
+or in-process with :func:`point_services_at`. Station IDs without a recorded payload are
+answered with a default recording (pass ``strict=True`` / ``--strict`` to 404 instead), so
+thousands of synthetic stations can be polled.
+
+Routes:
+
+* ``/stations/{id}/observations/latest`` - ``fixtures/nws_v3/{id}.json``
+* ``/stations/{id}/observations?start=...&end=...&limit=...`` - hourly observations built from
+  the same recording, newest first, with ``pagination.next`` links
+* ``/stations?state=xx&limit=...`` - ``stations_per_state`` synthetic stations with names and
+  coordinates, paged through ``pagination.next`` links
+* ``/xml/current_obs/{id}.xml`` - ``fixtures/current_obs/{id}.xml``
+* ``/xml/current_obs/seek.php?state=xx`` - ``fixtures/seek/{XX}.html``
+* ``/data/2.5/weather?q=...|id=...&appid=...`` - ``fixtures/owm/weather.json``, with a
+  stable per-city ``id`` and ``name``
+* ``/data/2.5/group?id=...&appid=...`` - the same recording once per requested ID
+* ``/data/2.5/forecast[/hourly|/daily]?q=...|id=...&appid=...`` -
+  ``fixtures/owm/forecast.json`` (``forecast_daily.json`` for daily), renamed per city
+* ``/img/w/{code}.png`` - ``fixtures/owm_icons/{code}.png``
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import urllib.parse
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from http import HTTPStatus
+from pathlib import Path
+
+from services import icons, noaa, owm
+from services.ratelimit import LIMITERS
+
+FIXTURES = Path(__file__).resolve().parents[1] / "fixtures"
+
+# Fixture directory -> Content-Type of its payloads
+_CONTENT_TYPES = {
+    "nws_v3": "application/geo+json",
+    "current_obs": "application/xml; charset=ISO-8859-1",
+    "seek": "text/html; charset=ISO-8859-1",
+    "owm": "application/json; charset=utf-8",
+    "owm_icons": "image/png",
+}
+
+# Place names for the synthetic station list
+_TOWNS = ("Springfield", "Riverside", "Fairview", "Georgetown", "Salem", "Madison", "Clinton")
+
+
+@dataclass
+class Faults:
+    """What to inject into responses. Rates are fractions of requests in ``[0, 1]``.
+
+    ``latency`` (+ up to ``jitter``) delays the response headers; ``slow_body`` spreads the
+    body over ``slow_body_chunks`` writes taking that many seconds in total. Throttled
+    responses are ``429`` with ``Retry-After: retry_after``; errors are ``500`` or ``503``.
+    Faults only apply to paths containing ``path_filter`` (all paths if empty).
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: int = 1
+    slow_body: float = 0.0
+    slow_body_chunks: int = 4
+    path_filter: str = ""
+
+
+@dataclass(frozen=True)
+class _Payload:
+    content_type: str
+    body: bytes
+    gzipped: bytes
+    etag: str
+
+
+def _load(path: Path, content_type: str) -> _Payload:
+    return _payload(path.read_bytes(), content_type)
+
+
+def _payload(body: bytes, content_type: str) -> _Payload:
+    etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+    return _Payload(content_type, body, gzip.compress(body, mtime=0), etag)
+
+
+class StandinServer:
+    """Asyncio HTTP/1.1 keep-alive server for the recorded upstream payloads.
+
+    Use :meth:`start`/:meth:`stop` (or ``with``) to run it on a background thread, or
+    ``await serve_forever()`` from an event loop. ``requests`` counts responses by status.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        faults: Faults | None = None,
+        fixtures: Path = FIXTURES,
+        strict: bool = False,
+        seed: int | None = None,
+        stations_per_state: int = 120,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.faults = faults or Faults()
+        self.strict = strict
+        self.stations_per_state = stations_per_state
+        self.requests: Counter[int] = Counter()
+        self._random = random.Random(seed)
+        self._payloads = {
+            kind: {
+                path.stem.upper(): _load(path, content_type)
+                for path in sorted((fixtures / kind).glob("*.*"))
+            }
+            for kind, content_type in _CONTENT_TYPES.items()
+        }
+        self._owm_names: dict[int, str] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._server: asyncio.AbstractServer | None = None
+        self._thread: threading.Thread | None = None
+        self._ready = threading.Event()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    # Routing ----------------------------------------------------------------------------
+
+    def _recorded(self, kind: str, name: str) -> _Payload | None:
+        payloads = self._payloads[kind]
+        payload = payloads.get(name.upper())
+        if payload is None and not self.strict and payloads:
+            payload = next(iter(payloads.values()))
+        return payload
+
+    def route(self, target: str) -> tuple[HTTPStatus, _Payload | None]:
+        """Map a request target to ``(status, payload)``."""
+        parts = urllib.parse.urlsplit(target)
+        path = parts.path
+        query = urllib.parse.parse_qs(parts.query)
+        payload: _Payload | None = None
+        if path.startswith("/stations/") and path.endswith("/observations/latest"):
+            payload = self._recorded("nws_v3", path.split("/")[2])
+        elif path.startswith("/stations/") and path.endswith("/observations"):
+            payload = self._nws_history(path, query)
+        elif path == "/stations":
+            payload = self._nws_stations(query)
+        elif path == "/xml/current_obs/seek.php":
+            payload = self._recorded("seek", query.get("state", [""])[0])
+        elif path.startswith("/xml/current_obs/") and path.endswith(".xml"):
+            payload = self._recorded("current_obs", path.rsplit("/", 1)[1][: -len(".xml")])
+        elif path in ("/data/2.5/weather", "/data/2.5/group"):
+            if not query.get("appid"):
+                return HTTPStatus.UNAUTHORIZED, None
+            payload = self._owm(query, group=path.endswith("/group"))
+        elif path in (
+            "/data/2.5/forecast",
+            "/data/2.5/forecast/hourly",
+            "/data/2.5/forecast/daily",
+        ):
+            if not query.get("appid"):
+                return HTTPStatus.UNAUTHORIZED, None
+            payload = self._owm_forecast(query, daily=path.endswith("/daily"))
+        elif path.startswith("/img/w/") and path.endswith(".png"):
+            payload = self._recorded("owm_icons", path.rsplit("/", 1)[1][: -len(".png")])
+        return (HTTPStatus.OK, payload) if payload is not None else (HTTPStatus.NOT_FOUND, None)
+
+    def _nws_history(self, path: str, query: dict[str, list[str]]) -> _Payload | None:
+        recorded = self._recorded("nws_v3", path.split("/")[2])
+        if recorded is None:
+            return None
+        template = json.loads(recorded.body)["properties"]
+        try:
+            end = _parse_time(query["end"][0]) if "end" in query else int(time.time())
+            start = _parse_time(query["start"][0]) if "start" in query else end - 7 * 86400
+            limit = min(int(query.get("limit", ["500"])[0]), 500)
+        except ValueError:
+            return None
+        # Hourly observations at :53, newest first, like the live collection
+        newest = end - (end - 3180) % 3600
+        stamps = range(newest, start - 1, -3600)[:limit]
+        features = []
+        for stamp in stamps:
+            props = dict(template, timestamp=_format_time(stamp))
+            temperature = dict(template["temperature"])
+            temperature["value"] = round(15 + 8 * math.sin(stamp / 86400 * 2 * math.pi), 1)
+            props["temperature"] = temperature
+            features.append({"type": "Feature", "properties": props})
+        document: dict = {"type": "FeatureCollection", "features": features}
+        if len(stamps) == limit and stamps[-1] - 3600 >= start:
+            more = {"start": _format_time(start), "end": _format_time(stamps[-1] - 1)}
+            next_query = urllib.parse.urlencode({**more, "limit": limit})
+            document["pagination"] = {"next": f"{self.base_url}{path}?{next_query}"}
+        return _payload(json.dumps(document).encode(), recorded.content_type)
+
+    def _nws_stations(self, query: dict[str, list[str]]) -> _Payload | None:
+        state = query.get("state", [""])[0].upper()
+        if len(state) != 2 or not state.isalpha():
+            return None
+        try:
+            limit = min(int(query.get("limit", ["500"])[0]), 500)
+            cursor = int(query.get("cursor", ["0"])[0])
+        except ValueError:
+            return None
+        features = []
+        for n in range(cursor, min(cursor + limit, self.stations_per_state)):
+            seed = zlib.crc32(f"{state}{n}".encode())
+            lat, lon = 25 + seed % 2400 / 100, -125 + seed // 2400 % 5700 / 100
+            town = _TOWNS[n % len(_TOWNS)]
+            features.append(
+                {
+                    "type": "Feature",
+                    "geometry": {"type": "Point", "coordinates": [lon, lat]},
+                    "properties": {
+                        "stationIdentifier": f"{state}{n:03d}",
+                        "name": f"{town} {n // len(_TOWNS) + 1}, {town} Municipal Airport",
+                    },
+                }
+            )
+        document: dict = {"type": "FeatureCollection", "features": features}
+        if features:
+            next_query = urllib.parse.urlencode({"state": state, "limit": limit, "cursor": n + 1})
+            document["pagination"] = {"next": f"{self.base_url}/stations?{next_query}"}
+        return _payload(json.dumps(document).encode(), "application/geo+json")
+
+    def _owm(self, query: dict[str, list[str]], group: bool) -> _Payload | None:
+        recorded = self._recorded("owm", "weather")
+        if recorded is None:
+            return None
+        document = json.loads(recorded.body)
+        if "q" in query:
+            city_id, name = self._owm_city(query["q"][0])
+            document.update(id=city_id, name=name)
+        elif "id" in query:
+            ids = [int(i) for i in query["id"][0].split(",") if i.isdigit()]
+            items = [
+                dict(document, id=i, name=self._owm_names.get(i, document["name"])) for i in ids
+            ]
+            if group:
+                document = {"cnt": len(items), "list": items}
+            elif len(items) == 1:
+                document = items[0]
+            else:
+                return None
+        else:
+            return None
+        return _payload(json.dumps(document).encode(), recorded.content_type)
+
+    def _owm_city(self, q: str) -> tuple[int, str]:
+        # Stable per-name IDs, remembered so later id= requests get the name back
+        name = q.split(",")[0].strip()
+        city_id = zlib.crc32(name.lower().encode()) % 10_000_000
+        self._owm_names[city_id] = name
+        return city_id, name
+
+    def _owm_forecast(self, query: dict[str, list[str]], daily: bool) -> _Payload | None:
+        recorded = self._recorded("owm", "forecast_daily" if daily else "forecast")
+        if recorded is None:
+            return None
+        document = json.loads(recorded.body)
+        if "q" in query:
+            city_id, name = self._owm_city(query["q"][0])
+        elif query.get("id", [""])[0].isdigit():
+            city_id = int(query["id"][0])
+            name = self._owm_names.get(city_id, document["city"]["name"])
+        else:
+            return None
+        document["city"].update(id=city_id, name=name)
+        return _payload(json.dumps(document).encode(), recorded.content_type)
+
+    # HTTP -------------------------------------------------------------------------------
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers: dict[str, str] = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                if int(headers.get("content-length", "0")):
+                    await reader.readexactly(int(headers["content-length"]))
+                method, target, version = request_line.decode("latin-1").split(" ", 2)
+                keep_alive = (
+                    headers.get("connection", "").lower() != "close"
+                    and version.strip() == "HTTP/1.1"
+                )
+                await self._respond(writer, method, target, headers, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            # Server shutdown; end quietly (asyncio's stream callback reports cancelled
+            # connection handlers as errors)
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(
+        self,
+        writer: asyncio.StreamWriter,
+        method: str,
+        target: str,
+        headers: dict[str, str],
+        keep_alive: bool,
+    ) -> None:
+        faults = self.faults
+        inject = not faults.path_filter or faults.path_filter in target
+        if inject and (faults.latency or faults.jitter):
+            await asyncio.sleep(faults.latency + self._random.uniform(0, faults.jitter))
+
+        extra: dict[str, str] = {}
+        payload: _Payload | None = None
+        roll = self._random.random() if inject else 1.0
+        if roll < faults.throttle_rate:
+            status = HTTPStatus.TOO_MANY_REQUESTS
+            extra["Retry-After"] = str(faults.retry_after)
+        elif roll < faults.throttle_rate + faults.error_rate:
+            status = self._random.choice(
+                (HTTPStatus.INTERNAL_SERVER_ERROR, HTTPStatus.SERVICE_UNAVAILABLE)
+            )
+        else:
+            status, payload = self.route(target)
+
+        body = b""
+        if payload is not None:
+            extra["Content-Type"] = payload.content_type
+            extra["ETag"] = payload.etag
+            extra["Cache-Control"] = "max-age=60"
+            if headers.get("if-none-match") == payload.etag:
+                status = HTTPStatus.NOT_MODIFIED
+            elif "gzip" in headers.get("accept-encoding", ""):
+                body = payload.gzipped
+                extra["Content-Encoding"] = "gzip"
+            else:
+                body = payload.body
+        elif status != HTTPStatus.OK:
+            body = f"{status.value} {status.phrase}\n".encode()
+            extra["Content-Type"] = "text/plain"
+        if method == "HEAD" or status == HTTPStatus.NOT_MODIFIED:
+            body = b""
+
+        self.requests[status.value] += 1
+        head = [f"HTTP/1.1 {status.value} {status.phrase}", f"Content-Length: {len(body)}"]
+        head += [f"{name}: {value}" for name, value in extra.items()]
+        if not keep_alive:
+            head.append("Connection: close")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+
+        if inject and faults.slow_body and body:
+            chunks = max(1, faults.slow_body_chunks)
+            size = -(-len(body) // chunks)
+            for start in range(0, len(body), size):
+                await writer.drain()
+                await asyncio.sleep(faults.slow_body / chunks)
+                writer.write(body[start : start + size])
+        else:
+            writer.write(body)
+        await writer.drain()
+
+    # Lifecycle --------------------------------------------------------------------------
+
+    async def serve_forever(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, backlog=1024)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def start(self) -> str:
+        """Run the server on a daemon thread; returns its base URL once it is listening."""
+
+        def run() -> None:
+            try:
+                asyncio.run(self.serve_forever())
+            except asyncio.CancelledError:
+                pass
+
+        self._thread = threading.Thread(target=run, name="standin-server", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self.base_url
+
+    def stop(self) -> None:
+        if self._loop is not None and self._server is not None:
+            # Closing the server ends serve_forever(); asyncio.run() then cancels open
+            # keep-alive connections
+            self._loop.call_soon_threadsafe(self._server.close)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> StandinServer:
+        self.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+
+def _parse_time(value: str) -> int:
+    return int(datetime.fromisoformat(value).timestamp())
+
+
+def _format_time(seconds: int) -> str:
+    return datetime.fromtimestamp(seconds, UTC).isoformat()
+
+
+def point_services_at(base_url: str, rate: float | None = 1e6) -> None:
+    """Send all NOAA/NWS/OWM service requests to ``base_url`` (e.g. a :class:`StandinServer`).
+
+    ``rate`` replaces the client-side rate limit for that host so it does not cap load tests;
+    pass ``None`` to keep the default limit and exercise it instead.
+    """
+    noaa.NWS_API_BASE = noaa.NOAA_BASE = noaa.NOAA_SEEK_BASE = base_url
+    owm.OWM_API_BASE = icons.OWM_ICON_BASE = base_url
+    if rate is not None:
+        host = urllib.parse.urlsplit(base_url).hostname or ""
+        LIMITERS.configure(host, rate=rate, burst=max(1, int(rate)))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before headers")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 500/503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After for 429s")
+    parser.add_argument("--slow-body", type=float, default=0.0, help="seconds to send a body")
+    parser.add_argument("--path-filter", default="", help="only inject faults on these paths")
+    parser.add_argument("--strict", action="store_true", help="404 for unrecorded stations")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+    faults = Faults(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        slow_body=args.slow_body,
+        path_filter=args.path_filter,
+    )
+    server = StandinServer(args.host, args.port, faults, strict=args.strict, seed=args.seed)
+    print(f"Serving recorded NWS/NOAA/OWM payloads on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Tests for the stand-in upstream server, driven through the real service functions."""
+
+import math
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from services import icons, noaa, owm
+from services.cache import ObservationCache
+from services.history import HistoryStore
+from services.stations import (
+    Station,
+    StationDirectory,
+    build_directory,
+    crawl_directory,
+    write_directory,
+)
+
+from benchmarks.standin_server import FIXTURES, Faults, StandinServer, point_services_at
+
+
+@pytest.fixture()
+def server(monkeypatch):
+    for name in ("NWS_API_BASE", "NOAA_BASE", "NOAA_SEEK_BASE"):
+        monkeypatch.setattr(noaa, name, getattr(noaa, name))
+    monkeypatch.setattr(owm, "OWM_API_BASE", owm.OWM_API_BASE)
+    monkeypatch.setattr(icons, "OWM_ICON_BASE", icons.OWM_ICON_BASE)
+    for breaker in noaa.BREAKERS.values():
+        breaker.reset()
+    with StandinServer(seed=0) as standin:
+        point_services_at(standin.base_url)
+        yield standin
+
+
+def test_services_read_recorded_payloads(server):
+    data, _ = noaa.get_noaa_current_obs("KNYC", cache=None)
+    assert data["weather"] == "Light Rain"
+    xml_data, icon_url = noaa.get_noaa_xml_current_obs("KDEN", cache=None)
+    assert xml_data["location"] == "Denver International Airport, CO" and icon_url
+    assert owm.get_open_weather_data("London, UK", "key", cache=None)["location"] == "London, GB"
+    assert noaa.get_noaa_current_obs("S12345", cache=None)[0]["weather"]  # default recording
+
+
+def test_etag_revalidation_gets_304(server):
+    cache = ObservationCache(ttl=0)
+    first = noaa.get_observation("KLAX", cache=cache)
+    assert noaa.get_observation("KLAX", cache=cache) == first
+    assert server.requests[304] == 1
+
+
+def test_injected_errors_trigger_xml_fallback(server, monkeypatch):
+    monkeypatch.setattr(noaa.time, "sleep", lambda seconds: None)
+    server.faults = Faults(error_rate=1.0, path_filter="/stations/")
+    obs = noaa.get_observation("KLAX", cache=None)
+    assert obs.location == "Los Angeles, Los Angeles International Airport, CA"
+    assert server.requests[500] + server.requests[503] == 3  # first attempt + 2 retries
+
+
+def test_icons_are_served(server, tmp_path):
+    assert icons.IconCache(tmp_path).get("02d") == (FIXTURES / "owm_icons" / "02d.png").read_bytes()
+    assert server.requests[200] == 1
+
+
+def test_forecasts_are_served_per_city(server):
+    forecast = owm.get_open_weather_forecast("Oslo, NO", "key", cache=None)
+    assert forecast.city == "Oslo" and len(forecast) == 40
+    daily = owm.get_open_weather_forecast("Oslo, NO", "key", kind="daily", cache=None)
+    assert daily.city == "Oslo" and daily.city_id == forecast.city_id
+
+
+def test_history_backfill_pages_and_resumes(server, tmp_path):
+    store = HistoryStore(tmp_path)
+    end = datetime(2020, 8, 13, tzinfo=UTC)
+    start = end - timedelta(days=3)
+    pages = list(
+        noaa.iter_history_pages("KLAX", int(start.timestamp()), int(end.timestamp()), limit=30)
+    )
+    assert [len(page) for page in pages] == [30, 30, 12]
+
+    results = list(noaa.sync_stations(store, ["KLAX", "KDEN"], start=start, end=end))
+    assert sorted((r.station_id, r.rows, r.error) for r in results) == [
+        ("KDEN", 72, None),
+        ("KLAX", 72, None),
+    ]
+    series = store.read("KLAX", columns=["temperature_c", "wind_speed_m_s"])
+    assert series.time[0] == start.timestamp() + 53 * 60 and series.time[-1] < end.timestamp()
+    # The recorded KLAX document serves wind in km/h (12.96 km/h = 7 kt); the store keeps m/s
+    assert series.columns["wind_speed_m_s"][0] == pytest.approx(12.96 / 3.6)
+
+    later = end + timedelta(hours=5)
+    assert noaa.backfill_station(store, "KLAX", start, later) == 5  # only the new hours
+
+
+def test_station_directory_is_built_from_the_station_list(server, tmp_path):
+    server.stations_per_state = 45
+    pages = list(noaa.iter_station_pages("ca", limit=20))
+    assert [len(page) for page in pages] == [20, 20, 5]
+
+    path = tmp_path / "stations.tsv"
+    assert build_directory(path, states=["CA", "CO"]) == 90
+    directory = StationDirectory.load(path)
+    station = directory.get("CO007")
+    assert station.state == "CO" and 25 <= station.lat <= 49 and -125 <= station.lon <= -68
+    assert [s.id for s in directory.search("springfield 2", state="CO")] == ["CO007"]
+
+
+def test_seek_crawl_writes_one_directory_and_keeps_coordinates(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(noaa.time, "sleep", lambda seconds: None)
+    path = tmp_path / "stations.tsv"
+    write_directory(
+        [
+            Station("KLAX", "Los Angeles", "CA", 33.938, -118.389),
+            Station("KDEN", "Denver International Airport", "CO", 39.847, -104.656),
+            Station("PAFA", "Fairbanks International Airport", "AK", 64.804, -147.876),
+        ],
+        path,
+    )
+    server.faults = Faults(error_rate=1.0, path_filter="state=co")
+    count, errors = crawl_directory(path, states=["CA", "CO", "NY"], max_workers=3)
+    assert list(errors) == ["CO"]
+
+    directory = StationDirectory.load(path)
+    assert count == len(directory) == 12  # 5 CA + 5 NY crawled, CO and AK kept
+    klax = directory.get("KLAX")
+    assert klax.name == "Los Angeles, Los Angeles International Airport" and klax.lat == 33.938
+    assert directory.get("KJFK").state == "NY" and math.isnan(directory.get("KJFK").lat)
+    assert directory.get("KDEN") and directory.get("PAFA")
@@ -0,0 +1,91 @@
+"""Startup benchmark: import cost and time to first frame of the weather app.
+
+Each run starts a fresh interpreter under ``-X importtime``, imports ``weather_app`` and
+drives Tk until the first frame is drawn. ``lazy`` is the normal startup, where only the
+visible tab is built; ``eager`` then selects every other tab as well, which is the work the
+app used to do before showing its window. Needs a display; run from ``src/gui-weather``::
+
+    python -m benchmarks.startup_bench --runs 5
+    xvfb-run python -m benchmarks.startup_bench  # headless
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parents[1]
+
+# Times are printed on stdout; -X importtime writes its table to stderr
+SNIPPET = """
+import sys, time
+start = time.perf_counter()
+import weather_app
+weather_app.win.update()
+first_frame = time.perf_counter() - start
+if {eager}:
+    for tab in weather_app.tab_control.tabs():
+        weather_app.tab_control.select(tab)
+        weather_app.win.update()
+all_tabs = time.perf_counter() - start
+loaded = ",".join(name for name in ("PIL", "numpy", "services.owm") if name in sys.modules)
+print(first_frame, all_tabs, loaded)
+weather_app.TASKS.shutdown()
+weather_app.win.destroy()
+"""
+
+
+def parse_importtime(stderr: str) -> dict[str, int]:
+    """Cumulative microseconds per top-level import from ``-X importtime`` output."""
+    totals: dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _self, cumulative, name = line[len("import time:") :].split("|")
+        if not cumulative.strip().isdigit() or name.startswith("  "):
+            continue  # the header line, or a nested import already counted by its parent
+        totals[name.strip()] = totals.get(name.strip(), 0) + int(cumulative)
+    return totals
+
+
+def run_once(eager: bool) -> tuple[float, float, str, dict[str, int]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SNIPPET.format(eager=eager)],
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if proc.returncode:
+        raise SystemExit(proc.stderr.strip().splitlines()[-1])
+    first_frame, all_tabs, loaded = (proc.stdout.split() + [""])[:3]
+    return float(first_frame), float(all_tabs), loaded, parse_importtime(proc.stderr)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Measure weather_app startup.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="slowest imports to list")
+    args = parser.parse_args(argv)
+
+    for mode in ("lazy", "eager"):
+        runs = [run_once(eager=mode == "eager") for _ in range(args.runs)]
+        first_frame = statistics.median(run[0] for run in runs)
+        all_tabs = statistics.median(run[1] for run in runs)
+        imports = runs[-1][3]
+        print(
+            f"{mode:>5}  first frame {first_frame * 1e3:7.1f} ms"
+            f"  all tabs {all_tabs * 1e3:7.1f} ms"
+            f"  imports {sum(imports.values()) / 1e3:7.1f} ms"
+            f"  loaded [{runs[-1][2]}]"
+        )
+        slowest = sorted(imports.items(), key=lambda item: item[1], reverse=True)[: args.top]
+        for name, micros in slowest:
+            print(f"        {micros / 1e3:7.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
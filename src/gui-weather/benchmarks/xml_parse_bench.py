@@ -0,0 +1,71 @@
+"""Micro-benchmark: the legacy-XML parser vs. the streaming one-pass parse it was measured against.
+
+``legacy`` is :func:`services.noaa._parse_noaa_xml`: one ``fromstring()`` of the response
+body plus a ``find()`` per wanted tag. ``streaming`` feeds the response to an
+``XMLParser`` in chunks and collects the wanted tags in one pass over the children. The
+streaming variant was not adopted because it is no faster on the recorded fixtures: building
+the element tree is most of the cost for both. This benchmark keeps the comparison
+reproducible. Run from ``src/gui-weather``::
+
+    python -m benchmarks.xml_parse_bench
+"""
+
+from __future__ import annotations
+
+import io
+import timeit
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import BinaryIO
+
+from services.noaa import _XML_TAGS, _parse_noaa_xml
+from services.observation import Observation
+
+PAYLOADS = sorted((Path(__file__).resolve().parents[1] / "fixtures" / "current_obs").glob("*.xml"))
+
+CHUNK_SIZE = 16 * 1024
+
+
+def streaming_parse(stream: BinaryIO, station_id: str) -> Observation:
+    """Feed ``stream`` to the parser in chunks and read the top-level tags in one pass."""
+    parser = ET.XMLParser()
+    while chunk := stream.read(CHUNK_SIZE):
+        parser.feed(chunk)
+    wanted = frozenset(_XML_TAGS)
+    tags = {child.tag: child.text or "" for child in parser.close() if child.tag in wanted}
+    return Observation.from_noaa_xml(tags, station_id)
+
+
+def main(number: int = 2000, repeat: int = 5) -> None:
+    for path in PAYLOADS:
+        content = path.read_bytes()
+        station_id = path.stem
+        legacy_obs = _parse_noaa_xml(io.BytesIO(content), station_id)
+        streaming_obs = streaming_parse(io.BytesIO(content), station_id)
+        assert legacy_obs.to_dict() == streaming_obs.to_dict()
+        assert legacy_obs.icon_url == streaming_obs.icon_url
+
+        # Interleave the repeats so drift in machine load hits both parsers alike
+        legacy = streaming = float("inf")
+        for _ in range(repeat):
+            legacy = min(
+                legacy,
+                timeit.timeit(
+                    lambda: _parse_noaa_xml(io.BytesIO(content), station_id), number=number
+                ),
+            )
+            streaming = min(
+                streaming,
+                timeit.timeit(
+                    lambda: streaming_parse(io.BytesIO(content), station_id), number=number
+                ),
+            )
+        print(
+            f"{path.name:>10}  legacy {legacy / number * 1e6:7.1f} us"
+            f"  streaming {streaming / number * 1e6:7.1f} us"
+            f"  (streaming at {legacy / streaming:.2f}x the legacy speed)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Periodic refresh and diff-based display updates for the Tk tabs."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+from typing import Any, Protocol
+
+# Choices offered by the auto-refresh comboboxes, in seconds (0 disables)
+REFRESH_CHOICES = {"Off": 0, "1 min": 60, "5 min": 300, "15 min": 900, "1 hour": 3600}
+
+
+class _Variable(Protocol):
+    def set(self, value: str) -> None: ...
+
+
+class DiffUpdater:
+    """Apply display values to Tk variables, setting only those whose text changed.
+
+    :meth:`stage` may be called any number of times; the staged values are applied together
+    from a single ``after_idle`` callback, so a refresh costs one pass and redraws only the
+    widgets that show something new. The last value applied to each variable is remembered,
+    so unchanged values cost no Tcl calls at all. ``updates`` counts the ``set()`` calls
+    made.
+    """
+
+    def __init__(
+        self,
+        after_idle: Callable[[Callable[[], None]], Any],
+        variables: Mapping[str, _Variable],
+    ) -> None:
+        self._after_idle = after_idle
+        self._variables = variables
+        self._shown: dict[str, str] = {}
+        self._pending: dict[str, str] = {}
+        self._scheduled = False
+        self.updates = 0
+
+    def stage(self, values: Mapping[str, str]) -> None:
+        """Queue ``values`` (variable name -> text) for the next idle pass."""
+        self._pending.update(values)
+        if not self._scheduled:
+            self._scheduled = True
+            self._after_idle(self._flush)
+
+    def _flush(self) -> None:
+        pending, self._pending = self._pending, {}
+        self._scheduled = False
+        for name, value in pending.items():
+            if self._shown.get(name) != value:
+                self._variables[name].set(value)
+                self._shown[name] = value
+                self.updates += 1
+
+
+class AutoRefresh:
+    """Call ``refresh`` every ``interval`` seconds through the toolkit's timer (0 disables)."""
+
+    def __init__(
+        self,
+        after: Callable[[int, Callable[[], None]], Any],
+        after_cancel: Callable[[Any], None],
+        refresh: Callable[[], None],
+        interval: float = 0,
+    ) -> None:
+        self._after = after
+        self._after_cancel = after_cancel
+        self._refresh = refresh
+        self._job: Any = None
+        self.interval = 0.0
+        self.set_interval(interval)
+
+    def set_interval(self, seconds: float) -> None:
+        """Change the interval; the next refresh is ``seconds`` from now."""
+        self.interval = max(0.0, float(seconds))
+        if self._job is not None:
+            self._after_cancel(self._job)
+            self._job = None
+        if self.interval:
+            self._job = self._after(int(self.interval * 1000), self._tick)
+
+    def _tick(self) -> None:
+        # Schedule the next run first, so a refresh that raises does not stop the timer
+        self._job = self._after(int(self.interval * 1000), self._tick)
+        self._refresh()
@@ -0,0 +1,68 @@
+"""Tests for the auto-refresh timer and diff-based display updates."""
+
+from refresh import AutoRefresh, DiffUpdater
+
+
+class FakeVar:
+    def __init__(self):
+        self.sets = []
+
+    def set(self, value):
+        self.sets.append(value)
+
+
+class FakeTimer:
+    """Stands in for ``win.after``/``after_idle``/``after_cancel``."""
+
+    def __init__(self):
+        self.jobs = {}
+        self.next_id = 0
+
+    def after(self, ms, callback):
+        self.next_id += 1
+        self.jobs[self.next_id] = (ms, callback)
+        return self.next_id
+
+    def after_idle(self, callback):
+        return self.after(0, callback)
+
+    def after_cancel(self, job):
+        del self.jobs[job]
+
+    def fire(self):
+        job = min(self.jobs)
+        _ms, callback = self.jobs.pop(job)
+        callback()
+
+
+def test_only_changed_values_are_set_in_one_idle_pass():
+    timer = FakeTimer()
+    temp, wind = FakeVar(), FakeVar()
+    view = DiffUpdater(timer.after_idle, {"temp": temp, "wind": wind})
+
+    view.stage({"temp": "70 F", "wind": "calm"})
+    view.stage({"temp": "71 F"})
+    assert len(timer.jobs) == 1 and temp.sets == []
+    timer.fire()
+    assert temp.sets == ["71 F"] and wind.sets == ["calm"]
+
+    view.stage({"temp": "71 F", "wind": "NW 5 MPH"})
+    timer.fire()
+    assert temp.sets == ["71 F"] and wind.sets == ["calm", "NW 5 MPH"]
+    assert view.updates == 3
+
+
+def test_auto_refresh_reschedules_and_can_be_turned_off():
+    timer = FakeTimer()
+    calls = []
+    refresher = AutoRefresh(timer.after, timer.after_cancel, lambda: calls.append(1))
+    assert timer.jobs == {}
+
+    refresher.set_interval(60)
+    assert [ms for ms, _ in timer.jobs.values()] == [60_000]
+    timer.fire()
+    timer.fire()
+    assert len(calls) == 2 and len(timer.jobs) == 1
+
+    refresher.set_interval(0)
+    assert timer.jobs == {}
@@ -0,0 +1,514 @@
+"""Asyncio counterparts of the NOAA/NWS and OpenWeatherMap service calls.
+
+The sync functions in :mod:`services.noaa` and :mod:`services.owm` block a thread per
+request. The coroutines here speak HTTP/1.1 over ``asyncio`` streams instead, so thousands
+of stations can be polled from one event loop. They share request construction, parsing,
+normalization, caches, circuit breakers and rate limiters with the sync code. Caches backed
+by a disk store are read and written on a worker thread, so SQLite never blocks the loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import http.client
+import io
+import json
+import socket
+import ssl
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import weakref
+from collections.abc import AsyncIterator, Callable, Iterable
+from dataclasses import dataclass
+from email.parser import BytesParser
+from typing import TypeVar
+
+from . import metrics, noaa, owm
+from .breaker import CircuitOpenError
+from .cache import ObservationCache
+from .observation import Observation
+from .ratelimit import LIMITERS, parse_retry_after
+from .transport import ACCEPT_ENCODING, ContentDecoder, _Timing
+
+T = TypeVar("T")
+
+DEFAULT_CONCURRENCY = 64
+# Per-host connection cap of the pools made by get_pool(); batch lookups raise it as needed
+MAX_PER_HOST = 4
+MAX_REDIRECTS = 5
+
+
+@dataclass
+class AsyncResponse:
+    """A fully read HTTP response."""
+
+    url: str
+    status: int
+    reason: str
+    headers: http.client.HTTPMessage
+    body: bytes
+
+
+_Stream = tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+class AsyncConnectionPool:
+    """Keep-alive HTTP/1.1 connections for one event loop, keyed by (scheme, host, port).
+
+    At most ``max_per_host`` connections per host are in use at once, like
+    :class:`services.transport.ConnectionPool`; further requests wait for a free one.
+    """
+
+    def __init__(self, max_per_host: int = 4, max_idle_per_host: int | None = None) -> None:
+        self.max_per_host = max_per_host
+        self.max_idle_per_host = max_per_host if max_idle_per_host is None else max_idle_per_host
+        self._idle: dict[tuple[str, str, int], list[_Stream]] = {}
+        self._slots: dict[tuple[str, str, int], asyncio.Semaphore] = {}
+        self._ssl_context = ssl.create_default_context()
+        self.opened = 0
+        self.reused = 0
+        self.bytes_received = 0
+        self.bytes_decoded = 0
+
+    def grow(self, max_per_host: int) -> None:
+        """Raise the per-host cap (and the idle cap with it) to at least ``max_per_host``."""
+        extra = max_per_host - self.max_per_host
+        if extra <= 0:
+            return
+        self.max_per_host = max_per_host
+        self.max_idle_per_host = max(self.max_idle_per_host, max_per_host)
+        for slots in self._slots.values():
+            for _ in range(extra):
+                slots.release()
+
+    async def _open(self, key: tuple[str, str, int], timing: _Timing) -> _Stream:
+        scheme, host, port = key
+        ctx = self._ssl_context if scheme == "https" else None
+        self.opened += 1
+        # Resolve separately so name lookup and connect/TLS time can be reported apart
+        start = time.perf_counter()
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        timing.dns = time.perf_counter() - start
+        start = time.perf_counter()
+        stream = await asyncio.open_connection(
+            str(infos[0][4][0]), port, ssl=ctx, server_hostname=host if ctx else None
+        )
+        timing.connect = time.perf_counter() - start
+        return stream
+
+    async def _exchange(
+        self, stream: _Stream, request: bytes, method: str, timing: _Timing
+    ) -> tuple[int, str, http.client.HTTPMessage, bytes, bool, int]:
+        reader, writer = stream
+        sent = time.perf_counter()
+        writer.write(request)
+        await writer.drain()
+        status_line = await reader.readline()
+        timing.ttfb = time.perf_counter() - sent
+        if not status_line:
+            raise http.client.RemoteDisconnected("connection closed before response")
+        version, status, reason = _parse_status_line(status_line)
+        head = bytearray()
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            head += line
+        headers = BytesParser(_class=http.client.HTTPMessage).parsebytes(bytes(head))
+        assert isinstance(headers, http.client.HTTPMessage)
+        body, reusable = await _read_body(reader, headers, status, method)
+        received = len(body)
+        self.bytes_received += received
+        decoder = ContentDecoder.for_encoding(headers.get("Content-Encoding"))
+        if decoder is not None:
+            body = decoder.decompress(body) + decoder.flush()
+        self.bytes_decoded += len(body)
+        if version == "HTTP/1.0" or (headers.get("Connection") or "").lower() == "close":
+            reusable = False
+        return status, reason, headers, body, reusable, received
+
+    async def request(self, req: urllib.request.Request) -> AsyncResponse:
+        """Send ``req`` and read the whole response, following redirects.
+
+        Raises ``urllib.error.HTTPError`` for 4xx/5xx and ``304`` responses, like the sync
+        transport does.
+        """
+        url = req.full_url
+        method = req.get_method()
+        headers = dict(req.header_items())
+        if not req.has_header("Accept-encoding"):
+            headers["Accept-Encoding"] = ACCEPT_ENCODING
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urllib.parse.urlsplit(url)
+            scheme = parts.scheme.lower()
+            if scheme not in ("http", "https"):
+                raise urllib.error.URLError(f"unsupported URL scheme: {scheme!r}")
+            key = (scheme, parts.hostname or "", parts.port or (443 if scheme == "https" else 80))
+            limiter = LIMITERS.for_host(key[1])
+            wait = limiter.reserve()
+            if wait:
+                await asyncio.sleep(wait)
+
+            selector = urllib.parse.urlunsplit(("", "", parts.path or "/", parts.query, ""))
+            host_header = parts.netloc.rsplit("@", 1)[-1]
+            lines = [f"{method} {selector} HTTP/1.1", f"Host: {host_header}"]
+            lines += [f"{name}: {value}" for name, value in headers.items()]
+            request = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+            status, reason, resp_headers, body = await self._send(key, request, method)
+            if status in (429, 503):
+                limiter.throttled(parse_retry_after(resp_headers.get("Retry-After")))
+            else:
+                limiter.success()
+
+            location = resp_headers.get("Location")
+            if status in (301, 302, 303, 307, 308) and location:
+                url = urllib.parse.urljoin(url, location)
+                if status == 303:
+                    method = "GET"
+                continue
+            if status >= 400 or status == 304:
+                raise urllib.error.HTTPError(url, status, reason, resp_headers, io.BytesIO(body))
+            return AsyncResponse(url, status, reason, resp_headers, body)
+        raise urllib.error.URLError(f"too many redirects for {req.full_url}")
+
+    async def _send(
+        self, key: tuple[str, str, int], request: bytes, method: str
+    ) -> tuple[int, str, http.client.HTTPMessage, bytes]:
+        slots = self._slots.get(key)
+        if slots is None:
+            slots = self._slots[key] = asyncio.Semaphore(self.max_per_host)
+        async with slots:
+            return await self._send_on_connection(key, request, method)
+
+    async def _send_on_connection(
+        self, key: tuple[str, str, int], request: bytes, method: str
+    ) -> tuple[int, str, http.client.HTTPMessage, bytes]:
+        idle = self._idle.setdefault(key, [])
+        timing = _Timing()
+        while True:
+            reused = bool(idle)
+            if reused:
+                self.reused += 1
+            stream: _Stream | None = None
+            try:
+                stream = idle.pop() if reused else await self._open(key, timing)
+                status, reason, headers, body, reusable, received = await self._exchange(
+                    stream, request, method, timing
+                )
+            except (ConnectionError, asyncio.IncompleteReadError, http.client.HTTPException) as exc:
+                if stream is not None:
+                    stream[1].close()
+                if reused:
+                    continue  # idle keep-alive connection was dropped; retry on another
+                _emit_request(key, timing, None, error=type(exc).__name__)
+                raise
+            except BaseException as exc:
+                # Includes cancellation: never return a half-read connection to the pool
+                if stream is not None:
+                    stream[1].close()
+                _emit_request(key, timing, None, error=type(exc).__name__)
+                raise
+            if reusable and len(idle) < self.max_idle_per_host:
+                idle.append(stream)
+            else:
+                stream[1].close()
+            _emit_request(key, timing, status, received, len(body), reused)
+            return status, reason, headers, body
+
+    async def aclose(self) -> None:
+        for streams in self._idle.values():
+            for _reader, writer in streams:
+                writer.close()
+                with contextlib.suppress(Exception):
+                    await writer.wait_closed()
+        self._idle.clear()
+
+
+def _emit_request(
+    key: tuple[str, str, int],
+    timing: _Timing,
+    status: int | None,
+    bytes_received: int = 0,
+    bytes_decoded: int = 0,
+    reused: bool = False,
+    error: str = "",
+) -> None:
+    if metrics.BUS.active:
+        metrics.emit(
+            metrics.RequestEvent(
+                *metrics.current_labels(),
+                host=key[1],
+                status=status,
+                total=time.perf_counter() - timing.start,
+                ttfb=timing.ttfb,
+                dns=timing.dns,
+                connect=timing.connect,
+                bytes_received=bytes_received,
+                bytes_decoded=bytes_decoded,
+                reused=reused,
+                error=error,
+            )
+        )
+
+
+def _parse_status_line(line: bytes) -> tuple[str, int, str]:
+    parts = line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+    if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+        raise http.client.BadStatusLine(line.decode("latin-1"))
+    return parts[0], int(parts[1]), parts[2] if len(parts) > 2 else ""
+
+
+async def _read_body(
+    reader: asyncio.StreamReader, headers: http.client.HTTPMessage, status: int, method: str
+) -> tuple[bytes, bool]:
+    """Read a response body per RFC 9112 framing; returns (body, connection_reusable)."""
+    if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+        return b"", True
+    if "chunked" in (headers.get("Transfer-Encoding") or "").lower():
+        chunks: list[bytes] = []
+        while True:
+            size_line = await reader.readline()
+            size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+            if size == 0:
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass  # discard trailers
+                return b"".join(chunks), True
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+    length = headers.get("Content-Length")
+    if length is not None:
+        return await reader.readexactly(int(length)), True
+    return await reader.read(), False
+
+
+_POOLS: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncConnectionPool] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_pool(max_per_host: int | None = None) -> AsyncConnectionPool:
+    """Return the connection pool of the running event loop.
+
+    The pool allows :data:`MAX_PER_HOST` connections per host, or ``max_per_host`` if that
+    is larger.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _POOLS.get(loop)
+    if pool is None:
+        pool = _POOLS[loop] = AsyncConnectionPool(max_per_host=MAX_PER_HOST)
+    if max_per_host is not None:
+        pool.grow(max_per_host)
+    return pool
+
+
+async def aclose() -> None:
+    """Close idle connections of the running loop's pool (call before the loop ends)."""
+    pool = _POOLS.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.aclose()
+
+
+async def _cache_call(cache: ObservationCache, fn: Callable[..., T], *args, **kwargs) -> T:
+    """Call a method of ``cache``, on a worker thread if it reads or writes a disk store."""
+    if cache.store is None:
+        return fn(*args, **kwargs)
+    return await asyncio.to_thread(fn, *args, **kwargs)
+
+
+async def _fetch_with_retry(
+    req: urllib.request.Request, timeout: float, retries: int = 2, backoff: float = 0.5
+) -> AsyncResponse:
+    """Async twin of ``noaa._urlopen_with_retry``: per-attempt timeout, non-blocking backoff."""
+    for attempt in range(retries + 1):
+        try:
+            return await asyncio.wait_for(get_pool().request(req), timeout)
+        except urllib.error.HTTPError as exc:
+            if exc.code == 304 or attempt >= retries:
+                raise
+            delay = backoff * (2**attempt)
+            if exc.code in (429, 503):
+                retry_after = parse_retry_after(exc.headers.get("Retry-After"))
+                if retry_after is not None:
+                    if retry_after > noaa.MAX_RETRY_AFTER:
+                        raise
+                    delay = max(delay, retry_after)
+            noaa._emit_retry(attempt, delay, exc)
+        except Exception as exc:  # noqa: BLE001 - broad catch acceptable for retry wrapper
+            if attempt >= retries:
+                raise
+            delay = backoff * (2**attempt)
+            noaa._emit_retry(attempt, delay, exc)
+        await asyncio.sleep(delay)
+    raise RuntimeError("_fetch_with_retry failed without exception")
+
+
+async def _fetch_cached(
+    key: tuple[str, str],
+    req: urllib.request.Request,
+    timeout: float,
+    parse: Callable[[bytes], T],
+    cache: ObservationCache | None,
+) -> T:
+    """Async twin of ``noaa._fetch_cached`` (TTL cache, revalidation, circuit breaker)."""
+    with metrics.labels("noaa", key[0]):
+        return await _fetch_cached_labelled(key, req, timeout, parse, cache)
+
+
+async def _fetch_cached_labelled(
+    key: tuple[str, str],
+    req: urllib.request.Request,
+    timeout: float,
+    parse: Callable[[bytes], T],
+    cache: ObservationCache | None,
+) -> T:
+    entry = await _cache_call(cache, cache.get, key) if cache is not None else None
+    if entry is not None and cache is not None:
+        if cache.is_fresh(entry):
+            noaa._emit_cache(key, "hit")
+            return entry.value
+        for name, header_value in entry.conditional_headers().items():
+            req.add_header(name, header_value)
+    breaker = noaa.BREAKERS.get(key[0])
+    if breaker is not None and not breaker.allow_request():
+        raise CircuitOpenError(f"{key[0]} circuit is open")
+    try:
+        resp = await _fetch_with_retry(req, timeout)
+        value = parse(resp.body)
+    except urllib.error.HTTPError as exc:
+        if breaker is not None:
+            if exc.code < 500 and exc.code != 429:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+        if exc.code == 304 and entry is not None and cache is not None:
+            await _cache_call(cache, cache.touch, key)
+            noaa._emit_cache(key, "revalidated")
+            return entry.value
+        if cache is not None:
+            noaa._emit_cache(key, "miss")
+        raise
+    except Exception:
+        if breaker is not None:
+            breaker.record_failure()
+        if cache is not None:
+            noaa._emit_cache(key, "miss")
+        raise
+    except BaseException:
+        # Cancelled mid-request: no verdict on the endpoint, so free a half-open probe
+        if breaker is not None:
+            breaker.release_probe()
+        raise
+    if breaker is not None:
+        breaker.record_success()
+    if cache is not None:
+        noaa._emit_cache(key, "miss")
+        await _cache_call(
+            cache,
+            cache.put,
+            key,
+            value,
+            etag=resp.headers.get("ETag", ""),
+            last_modified=resp.headers.get("Last-Modified", ""),
+            payload=resp.body if cache.store is not None else None,
+        )
+    return value
+
+
+async def get_observation(
+    station_id: str,
+    timeout: float = 10,
+    cache: ObservationCache | None = noaa.OBS_CACHE,
+    semaphore: asyncio.Semaphore | None = None,
+) -> Observation:
+    """Async :func:`services.noaa.get_observation`: NWS v3 JSON with legacy XML fallback.
+
+    ``semaphore`` bounds how many lookups run at once when many are scheduled together.
+    """
+    async with semaphore if semaphore is not None else contextlib.nullcontext():
+        try:
+            return await _fetch_cached(
+                ("nws_v3", station_id),
+                noaa._nws_v3_request(station_id),
+                timeout,
+                lambda body: Observation.from_nws_v3(json.loads(body), station_id),
+                cache,
+            )
+        except Exception:
+            noaa._emit_fallback("xml")
+            return await _fetch_cached(
+                ("xml", station_id),
+                noaa._xml_request(station_id),
+                timeout,
+                lambda body: noaa._parse_noaa_xml(io.BytesIO(body), station_id),
+                cache,
+            )
+
+
+async def get_noaa_current_obs(
+    station_id: str,
+    timeout: float = 10,
+    cache: ObservationCache | None = noaa.OBS_CACHE,
+    semaphore: asyncio.Semaphore | None = None,
+) -> tuple[dict[str, str], str]:
+    """Async :func:`services.noaa.get_noaa_current_obs`; returns (data_dict, icon_url)."""
+    obs = await get_observation(station_id, timeout=timeout, cache=cache, semaphore=semaphore)
+    return obs.to_dict(), obs.icon_url
+
+
+async def get_noaa_current_obs_many(
+    station_ids: Iterable[str], timeout: float = 10, concurrency: int = DEFAULT_CONCURRENCY
+) -> AsyncIterator[noaa.StationResult]:
+    """Async :func:`services.noaa.get_noaa_current_obs_many` with ``concurrency`` in flight.
+
+    Results are yielded as they complete; leaving the loop early cancels the rest. The
+    loop's connection pool is sized so that every lookup in flight can hold a connection.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    get_pool(max_per_host=concurrency)
+
+    async def one(sid: str) -> noaa.StationResult:
+        try:
+            data, icon_url = await get_noaa_current_obs(sid, timeout=timeout, semaphore=semaphore)
+        except Exception as exc:  # noqa: BLE001 - reported per station
+            return noaa.StationResult(sid, None, "", exc)
+        return noaa.StationResult(sid, data, icon_url, None)
+
+    tasks = [asyncio.ensure_future(one(sid)) for sid in station_ids]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def get_open_weather_data(
+    city: str,
+    api_key: str,
+    timeout: float = 10,
+    cache: ObservationCache | None = owm.OWM_CACHE,
+    semaphore: asyncio.Semaphore | None = None,
+) -> dict[str, str]:
+    """Async :func:`services.owm.get_open_weather_data`."""
+    key = ("owm", city)
+    entry = await _cache_call(cache, cache.get, key) if cache is not None else None
+    if entry is not None and cache is not None and cache.is_fresh(entry):
+        if metrics.BUS.active:
+            metrics.emit(metrics.CacheEvent("owm", "weather", "hit"))
+        return dict(entry.value)
+    with metrics.labels("owm", "weather"):
+        async with semaphore if semaphore is not None else contextlib.nullcontext():
+            req = owm._weather_request(city, api_key)
+            resp = await _fetch_with_retry(req, timeout, retries=0)
+    json_data = json.loads(resp.body)
+    result = owm._parse_open_weather(json_data)
+    if "id" in json_data:
+        owm.remember_city_id(city, json_data["id"])
+    if cache is not None:
+        if metrics.BUS.active:
+            metrics.emit(metrics.CacheEvent("owm", "weather", "miss"))
+        await _cache_call(
+            cache, cache.put, key, result, payload=resp.body if cache.store is not None else None
+        )
+    return dict(result)
@@ -0,0 +1,230 @@
+"""Tests for the asyncio service variants (local HTTP server; NOAA fetches monkeypatched)."""
+
+import asyncio
+import http.client
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from services import aio, noaa, owm
+from services.breaker import CircuitBreaker
+from services.cache import ObservationCache
+from services.diskcache import DiskCache
+from services.observation import Observation
+
+FIXTURES = Path(__file__).resolve().parents[1] / "fixtures"
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/chunked":
+            self.send_response(200)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for part in (b'{"ok":', b" true}"):
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(part), part))
+            self.wfile.write(b"0\r\n\r\n")
+            return
+        if self.path == "/slow":
+            time.sleep(0.02)
+        status = 404 if self.path == "/missing" else 200
+        body = b'{"ok": true}'
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def base_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def closed_breakers():
+    for breaker in noaa.BREAKERS.values():
+        breaker.reset()
+
+
+def test_pool_reuses_connections_and_decodes_chunked_bodies(base_url):
+    async def run():
+        pool = aio.AsyncConnectionPool()
+        bodies = [
+            (await pool.request(urllib.request.Request(base_url + path))).body
+            for path in ("/obs", "/chunked", "/obs")
+        ]
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            await pool.request(urllib.request.Request(base_url + "/missing"))
+        await pool.aclose()
+        return bodies, excinfo.value.code, pool.opened, pool.reused
+
+    bodies, code, opened, reused = asyncio.run(run())
+    assert bodies == [b'{"ok": true}'] * 3
+    assert (code, opened, reused) == (404, 1, 3)
+
+
+def test_pool_caps_connections_per_host(base_url):
+    async def run():
+        pool = aio.AsyncConnectionPool(max_per_host=2)
+        requests = [pool.request(urllib.request.Request(base_url + "/slow")) for _ in range(6)]
+        await asyncio.gather(*requests)
+        await pool.aclose()
+        return pool.opened, pool.reused
+
+    assert asyncio.run(run()) == (2, 4)
+
+
+def test_batch_lookups_size_the_pool_to_their_concurrency(monkeypatch):
+    async def fake_get_observation(station_id, timeout=10, cache=None, semaphore=None):
+        return Observation(station_id)
+
+    monkeypatch.setattr(aio, "get_observation", fake_get_observation)
+
+    async def run():
+        async for _ in aio.get_noaa_current_obs_many(["A"], concurrency=32):
+            pass
+        pool = aio.get_pool()
+        await aio.aclose()
+        return pool.max_per_host, pool.max_idle_per_host
+
+    assert asyncio.run(run()) == (32, 32)
+
+
+def test_get_observation_falls_back_to_xml_and_caches(monkeypatch):
+    xml = (FIXTURES / "current_obs" / "KLAX.xml").read_bytes()
+    calls = []
+
+    async def fake_fetch(req, timeout, retries=2, backoff=0.5):
+        calls.append(req.full_url)
+        if req.full_url.endswith("/observations/latest"):
+            raise urllib.error.URLError("json down")
+        return aio.AsyncResponse(req.full_url, 200, "OK", http.client.HTTPMessage(), xml)
+
+    monkeypatch.setattr(aio, "_fetch_with_retry", fake_fetch)
+    cache = ObservationCache(ttl=60)
+
+    async def run():
+        first = await aio.get_noaa_current_obs("KLAX", cache=cache)
+        second = await aio.get_noaa_current_obs("KLAX", cache=cache)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == second
+    assert first[0]["location"] and first[1].endswith(".png")
+    # JSON is retried on the second lookup, but the XML result is served from the cache
+    assert [url.endswith(".xml") for url in calls] == [False, True, False]
+
+
+def test_cancelled_half_open_probe_is_released(monkeypatch, clock):
+    breaker = CircuitBreaker("nws_v3", failure_threshold=1, reset_timeout=60, clock=clock)
+    monkeypatch.setitem(noaa.BREAKERS, "nws_v3", breaker)
+    breaker.record_failure()
+    clock.now = 60
+
+    async def hanging_fetch(req, timeout, retries=2, backoff=0.5):
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(aio, "_fetch_with_retry", hanging_fetch)
+
+    async def run():
+        key = ("nws_v3", "KLAX")
+        task = asyncio.ensure_future(
+            aio._fetch_cached(key, noaa._nws_v3_request("KLAX"), 10, bytes, cache=None)
+        )
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert breaker.allow_request()
+
+
+def test_get_noaa_current_obs_many_bounds_concurrency(monkeypatch):
+    active = peak = 0
+
+    async def fake_get_observation(station_id, timeout=10, cache=None, semaphore=None):
+        nonlocal active, peak
+        async with semaphore:
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+        if station_id == "BAD":
+            raise urllib.error.URLError("boom")
+        return Observation(station_id, location=station_id)
+
+    monkeypatch.setattr(aio, "get_observation", fake_get_observation)
+
+    async def run():
+        stations = ["A", "B", "BAD", "C", "D"]
+        return [r async for r in aio.get_noaa_current_obs_many(stations, concurrency=2)]
+
+    results = {r.station_id: r for r in asyncio.run(run())}
+    assert peak == 2
+    assert isinstance(results["BAD"].error, urllib.error.URLError)
+    assert results["C"].data["location"] == "C"
+
+
+class ThreadRecordingStore(DiskCache):
+    def __init__(self, path):
+        super().__init__(path)
+        self.threads: set[int] = set()
+
+    def get(self, key):
+        self.threads.add(threading.get_ident())
+        return super().get(key)
+
+    def put(self, key, *args, **kwargs):
+        self.threads.add(threading.get_ident())
+        return super().put(key, *args, **kwargs)
+
+
+def test_disk_backed_cache_is_used_off_the_event_loop(monkeypatch, tmp_path):
+    xml = (FIXTURES / "current_obs" / "KLAX.xml").read_bytes()
+
+    async def fake_fetch(req, timeout, retries=2, backoff=0.5):
+        return aio.AsyncResponse(req.full_url, 200, "OK", http.client.HTTPMessage(), xml)
+
+    monkeypatch.setattr(aio, "_fetch_with_retry", fake_fetch)
+    store = ThreadRecordingStore(tmp_path / "cache.sqlite")
+    cache = ObservationCache(
+        ttl=60, store=store, encode=Observation.to_record, decode=Observation.from_record
+    )
+
+    async def run():
+        obs = await aio.get_observation("KLAX", cache=cache)
+        return obs, threading.get_ident()
+
+    obs, loop_thread = asyncio.run(run())
+    assert obs.station_id == "KLAX"
+    assert store.threads and loop_thread not in store.threads
+
+
+def test_open_weather_lookup_remembers_the_city_id(monkeypatch):
+    document = (FIXTURES / "owm" / "weather.json").read_bytes()
+
+    async def fake_fetch(req, timeout, retries=2, backoff=0.5):
+        return aio.AsyncResponse(req.full_url, 200, "OK", http.client.HTTPMessage(), document)
+
+    monkeypatch.setattr(aio, "_fetch_with_retry", fake_fetch)
+    monkeypatch.setattr(owm, "CITY_IDS", {})
+
+    asyncio.run(aio.get_open_weather_data("London", "key", cache=None))
+
+    assert owm.CITY_IDS == {"London": 2643743}
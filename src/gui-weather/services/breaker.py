@@ -0,0 +1,101 @@
+"""Circuit breaker used to skip upstream endpoints that are currently failing."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an endpoint whose circuit is open."""
+
+
+class CircuitBreaker:
+    """Closed/open/half-open circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and requests are
+    refused for ``reset_timeout`` seconds. It then goes half-open and lets a single probe
+    through: success closes the circuit, failure opens it for another cool-off period.
+    A request that ends with neither outcome (the caller's deadline ran out, or it was
+    cancelled) must call :meth:`release_probe` so the next request can probe instead.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be sent now (claims the probe when half-open)."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """Give back a half-open probe claimed by :meth:`allow_request` without an outcome."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def reset(self) -> None:
+        self.record_success()
+
+    def snapshot(self) -> dict[str, object]:
+        """Return the breaker's state for monitoring/alerting."""
+        with self._lock:
+            state = self._current_state()
+            retry_in = 0.0
+            if state == OPEN:
+                retry_in = max(0.0, self.reset_timeout - (self._clock() - self._opened_at))
+            return {
+                "name": self.name,
+                "state": state,
+                "consecutive_failures": self._failures,
+                "retry_in": retry_in,
+            }
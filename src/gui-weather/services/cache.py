@@ -0,0 +1,134 @@
+"""In-memory observation cache with TTL expiry and HTTP revalidation support."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .diskcache import DiskCache
+
+
+@dataclass
+class CacheEntry:
+    """A cached value plus the validators needed to revalidate it upstream."""
+
+    value: Any
+    fetched_at: float
+    etag: str = ""
+    last_modified: str = ""
+
+    def conditional_headers(self) -> dict[str, str]:
+        """Return ``If-None-Match``/``If-Modified-Since`` headers for a revalidation request."""
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def _store_key(key: Hashable) -> str:
+    return ":".join(map(str, key)) if isinstance(key, tuple) else str(key)
+
+
+class ObservationCache:
+    """Thread-safe LRU cache whose entries are fresh for ``ttl`` seconds.
+
+    Stale entries are kept (until evicted) so callers can revalidate them with a conditional
+    request and reuse the parsed value on ``304 Not Modified``.
+
+    With a :class:`~services.diskcache.DiskCache` as ``store`` the cache is written through to
+    disk and misses (or stale entries) are looked up there, so entries survive restarts and
+    are shared with other processes. ``encode``/``decode`` convert values to and from JSON.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 600.0,
+        max_entries: int = 512,
+        clock: Callable[[], float] = time.monotonic,
+        store: DiskCache | None = None,
+        encode: Callable[[Any], Any] = lambda value: value,
+        decode: Callable[[Any], Any] = lambda value: value,
+    ) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.store = store
+        self.encode = encode
+        self.decode = decode
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> CacheEntry | None:
+        """Return the entry for ``key`` (fresh or stale), or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if self.store is not None and (entry is None or not self.is_fresh(entry)):
+            entry = self._load(key, entry)
+        return entry
+
+    def _load(self, key: Hashable, entry: CacheEntry | None) -> CacheEntry | None:
+        """Prefer the on-disk entry if it is newer than what is held in memory."""
+        assert self.store is not None
+        record = self.store.get(_store_key(key))
+        if record is None:
+            return entry
+        fetched_at = self._clock() - record.age
+        if entry is not None and entry.fetched_at >= fetched_at:
+            return entry
+        try:
+            value = self.decode(record.value)
+        except (TypeError, ValueError, KeyError):
+            return entry  # written by an incompatible version; refetch
+        loaded = CacheEntry(value, fetched_at, record.etag, record.last_modified)
+        with self._lock:
+            self._insert(key, loaded)
+        return loaded
+
+    def _insert(self, key: Hashable, entry: CacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return self._clock() - entry.fetched_at < self.ttl
+
+    def put(
+        self,
+        key: Hashable,
+        value: Any,
+        etag: str = "",
+        last_modified: str = "",
+        payload: bytes | None = None,
+    ) -> None:
+        """Store ``value``; ``payload`` (the raw response body) is only kept on disk."""
+        with self._lock:
+            self._insert(key, CacheEntry(value, self._clock(), etag, last_modified))
+        if self.store is not None:
+            self.store.put(_store_key(key), self.encode(value), payload, etag, last_modified)
+
+    def touch(self, key: Hashable) -> None:
+        """Mark an entry fresh again, e.g. after the origin answered ``304 Not Modified``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.fetched_at = self._clock()
+                self._entries.move_to_end(key)
+        if self.store is not None:
+            self.store.touch(_store_key(key))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,29 @@
+"""Tests for the in-memory observation cache."""
+
+from services.cache import ObservationCache
+
+
+def test_entries_go_stale_after_ttl_and_touch_refreshes(clock):
+    cache = ObservationCache(ttl=60, clock=clock)
+    cache.put("KLAX", {"temp_c": "20"}, etag='"abc"')
+
+    entry = cache.get("KLAX")
+    assert cache.is_fresh(entry)
+    clock.now = 61
+    assert not cache.is_fresh(entry)
+    assert entry.conditional_headers() == {"If-None-Match": '"abc"'}
+
+    cache.touch("KLAX")
+    assert cache.is_fresh(cache.get("KLAX"))
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ObservationCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a").value == 1
+    assert len(cache) == 2
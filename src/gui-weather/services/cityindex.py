@@ -0,0 +1,313 @@
+"""Offline OpenWeatherMap city-ID index built from the bulk city list.
+
+OWM publishes every city it knows as ``city.list.json.gz`` (a gzip-compressed JSON array of
+``{"id", "name", "state", "country", "coord": {"lon", "lat"}}``). :func:`build_index` streams
+that file once into a compact binary file; :meth:`CityIndex.open` memory-maps it, so opening
+costs a few milliseconds and pages are only read as lookups touch them.
+
+File layout (little-endian)::
+
+    header   magic "OWMCITY1", count (u32)
+    records  count x (id u32, lat f32, lon f32, key offset u32, name offset u32,
+             country 2s, state 2s), sorted by normalized name
+    by_lat   count x u32 record numbers, sorted by latitude
+    strings  u16 length-prefixed UTF-8 strings referenced by the records
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import math
+import mmap
+import os
+import struct
+import unicodedata
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import IO, NamedTuple
+
+MAGIC = b"OWMCITY1"
+_HEADER = struct.Struct("<8sI")
+_RECORD = struct.Struct("<IffII2s2s")
+_LENGTH = struct.Struct("<H")
+_READ_SIZE = 1 << 16
+EARTH_RADIUS_KM = 6371.0
+
+
+class City(NamedTuple):
+    id: int
+    name: str
+    state: str
+    country: str
+    lat: float
+    lon: float
+
+
+def default_index_path() -> Path:
+    """``$WEATHER_CITY_INDEX`` or ``$XDG_CACHE_HOME/python-projects/owm-cities.idx``."""
+    override = os.getenv("WEATHER_CITY_INDEX")
+    if override:
+        return Path(override)
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "python-projects" / "owm-cities.idx"
+
+
+def normalize(name: str) -> str:
+    """Case- and accent-insensitive lookup key: ``"São  Paulo"`` -> ``"sao paulo"``."""
+    decomposed = unicodedata.normalize("NFKD", name.casefold())
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.split())
+
+
+def iter_city_list(stream: IO[str]) -> Iterator[dict]:
+    """Yield the objects of a top-level JSON array without loading the whole document."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    started = False
+    eof = False
+    while True:
+        # Skip separators; refill when the buffer runs dry
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if not started and pos < len(buffer):
+            if buffer[pos] != "[":
+                raise ValueError("city list is not a JSON array")
+            started = True
+            pos += 1
+            continue
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+        if pos < len(buffer):
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                yield item
+                pos = end
+                continue
+        if eof:
+            raise ValueError("city list ended before the closing bracket")
+        chunk = stream.read(_READ_SIZE)
+        eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+
+def _fit(code: object) -> bytes:
+    return str(code or "").encode("ascii", "replace")[:2].ljust(2, b"\0")
+
+
+def build_index(source: str | os.PathLike[str], target: str | os.PathLike[str]) -> int:
+    """Stream the bulk city list at ``source`` (``.json`` or ``.json.gz``) into ``target``.
+
+    Returns the number of cities indexed. The index is written to a temporary file and
+    moved into place, so readers never see a partial file.
+    """
+    opener = gzip.open if str(source).endswith(".gz") else open
+    with opener(source, "rt", encoding="utf-8") as stream:
+        return write_index(iter_city_list(stream), target)
+
+
+def write_index(cities: Iterable[dict], target: str | os.PathLike[str]) -> int:
+    """Write an index for ``cities`` (dicts in the bulk-list format) to ``target``."""
+    rows: list[tuple[bytes, bytes, int, bytes, bytes, float, float]] = []
+    for city in cities:
+        coord = city.get("coord") or {}
+        name = str(city.get("name") or "")
+        rows.append(
+            (
+                normalize(name).encode(),
+                _fit(city.get("country")),
+                int(city["id"]),
+                name.encode(),
+                _fit(city.get("state")),
+                float(coord.get("lat", 0.0)),
+                float(coord.get("lon", 0.0)),
+            )
+        )
+    rows.sort()
+    count = len(rows)
+    strings_start = _HEADER.size + count * (_RECORD.size + 4)
+    records = bytearray()
+    strings = bytearray()
+    offsets: dict[bytes, int] = {}
+
+    def intern(value: bytes) -> int:
+        offset = offsets.get(value)
+        if offset is None:
+            offset = offsets[value] = strings_start + len(strings)
+            strings.extend(_LENGTH.pack(len(value)) + value)
+        return offset
+
+    for key, country, city_id, label, state, lat, lon in rows:
+        records += _RECORD.pack(city_id, lat, lon, intern(key), intern(label), country, state)
+    by_lat = sorted(range(count), key=lambda n: rows[n][5])
+
+    path = Path(target)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as out:
+        out.write(_HEADER.pack(MAGIC, count))
+        out.write(records)
+        out.write(struct.pack(f"<{count}I", *by_lat))
+        out.write(strings)
+    os.replace(tmp, path)
+    return count
+
+
+class _Keys:
+    """Sequence view of the records' normalized names, for :func:`bisect.bisect_left`."""
+
+    def __init__(self, index: CityIndex) -> None:
+        self._index = index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __getitem__(self, n: int) -> bytes:
+        return self._index._string(self._index._record(n)[3])
+
+
+class _Latitudes:
+    def __init__(self, index: CityIndex) -> None:
+        self._index = index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __getitem__(self, n: int) -> float:
+        return self._index._record(self._index._by_lat[n])[1]
+
+
+def _distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class CityIndex:
+    """Read-only, memory-mapped view of an index written by :func:`build_index`."""
+
+    def __init__(self, buffer: bytes | mmap.mmap) -> None:
+        magic, count = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("not an OWM city index")
+        self._buffer = buffer
+        self._count = count
+        by_lat_start = _HEADER.size + count * _RECORD.size
+        self._by_lat = memoryview(buffer)[by_lat_start : by_lat_start + 4 * count].cast("I")
+        self._keys = _Keys(self)
+        self._latitudes = _Latitudes(self)
+
+    @classmethod
+    def open(cls, path: str | os.PathLike[str]) -> CityIndex:
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _record(self, n: int) -> tuple[int, float, float, int, int, bytes, bytes]:
+        return _RECORD.unpack_from(self._buffer, _HEADER.size + n * _RECORD.size)
+
+    def _string(self, offset: int) -> bytes:
+        (length,) = _LENGTH.unpack_from(self._buffer, offset)
+        start = offset + _LENGTH.size
+        return bytes(self._buffer[start : start + length])
+
+    def _city(self, n: int) -> City:
+        city_id, lat, lon, _key, name, country, state = self._record(n)
+        return City(
+            city_id,
+            self._string(name).decode(),
+            state.rstrip(b"\0").decode(),
+            country.rstrip(b"\0").decode(),
+            round(lat, 5),
+            round(lon, 5),
+        )
+
+    def lookup(self, name: str, country: str = "", state: str = "") -> list[City]:
+        """All cities called ``name`` (case/accent-insensitive), optionally filtered."""
+        key = normalize(name).encode()
+        results = []
+        n = bisect_left(self._keys, key)
+        while n < self._count and self._keys[n] == key:
+            city = self._city(n)
+            if (not country or city.country == country.upper()) and (
+                not state or city.state == state.upper()
+            ):
+                results.append(city)
+            n += 1
+        return results
+
+    def resolve(self, query: str) -> City | None:
+        """Resolve an OWM-style ``"Name"``, ``"Name, CC"`` or ``"Name, ST, CC"`` query.
+
+        Returns ``None`` when nothing matches or when the match is ambiguous.
+        """
+        parts = [part.strip() for part in query.split(",")]
+        country = parts[-1] if len(parts) > 1 else ""
+        state = parts[1] if len(parts) > 2 else ""
+        matches = self.lookup(parts[0], country, state)
+        return matches[0] if len(matches) == 1 else None
+
+    def prefix_search(self, prefix: str, limit: int = 10, country: str = "") -> list[City]:
+        """Cities whose normalized name starts with ``prefix``, in name order."""
+        key = normalize(prefix).encode()
+        results: list[City] = []
+        n = bisect_left(self._keys, key)
+        while n < self._count and len(results) < limit and self._keys[n].startswith(key):
+            city = self._city(n)
+            if not country or city.country == country.upper():
+                results.append(city)
+            n += 1
+        return results
+
+    def nearest(self, lat: float, lon: float, limit: int = 1) -> list[tuple[City, float]]:
+        """The ``limit`` cities closest to ``(lat, lon)`` as ``(city, distance_km)`` pairs.
+
+        Scans outward from ``lat`` in latitude order and stops once the latitude difference
+        alone exceeds the current ``limit``-th best distance.
+        """
+        best: list[tuple[float, int]] = []
+        km_per_degree = math.pi * EARTH_RADIUS_KM / 180
+        start = bisect_left(self._latitudes, lat)
+        below, above = start - 1, start
+        while below >= 0 or above < self._count:
+            bound = best[-1][0] if len(best) >= limit else math.inf
+            below_gap = (lat - self._latitudes[below]) * km_per_degree if below >= 0 else math.inf
+            above_gap = (
+                (self._latitudes[above] - lat) * km_per_degree if above < self._count else math.inf
+            )
+            if min(below_gap, above_gap) > bound:
+                break
+            if below_gap <= above_gap:
+                n, below = self._by_lat[below], below - 1
+            else:
+                n, above = self._by_lat[above], above + 1
+            _id, city_lat, city_lon, *_ = self._record(n)
+            distance = _distance_km(lat, lon, city_lat, city_lon)
+            if distance < bound:
+                best.append((distance, n))
+                best.sort()
+                del best[limit:]
+        return [(self._city(n), round(distance, 3)) for distance, n in best]
+
+    def close(self) -> None:
+        self._by_lat.release()
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    target = sys.argv[2] if len(sys.argv) > 2 else default_index_path()
+    print(f"Indexed {build_index(sys.argv[1], target)} cities into {target}")
@@ -0,0 +1,71 @@
+"""Tests for the offline OWM city-ID index."""
+
+import gzip
+import io
+import json
+
+import pytest
+
+from services import owm
+from services.cityindex import CityIndex, build_index, iter_city_list
+
+CITIES = [
+    {"id": 5368361, "name": "Los Angeles", "state": "CA", "country": "US",
+     "coord": {"lon": -118.243683, "lat": 34.052231}},
+    {"id": 3882428, "name": "Los Ángeles", "state": "", "country": "CL",
+     "coord": {"lon": -72.349998, "lat": -37.466671}},
+    {"id": 5746545, "name": "Portland", "state": "OR", "country": "US",
+     "coord": {"lon": -122.676208, "lat": 45.523449}},
+    {"id": 4975802, "name": "Portland", "state": "ME", "country": "US",
+     "coord": {"lon": -70.255333, "lat": 43.661469}},
+    {"id": 5391959, "name": "San Francisco", "state": "CA", "country": "US",
+     "coord": {"lon": -122.419418, "lat": 37.774929}},
+    {"id": 3448439, "name": "São Paulo", "state": "", "country": "BR",
+     "coord": {"lon": -46.636108, "lat": -23.547501}},
+    {"id": 5392171, "name": "San Jose", "state": "CA", "country": "US",
+     "coord": {"lon": -121.894958, "lat": 37.339390}},
+]  # fmt: skip
+
+
+@pytest.fixture()
+def index(tmp_path):
+    source = tmp_path / "city.list.json.gz"
+    with gzip.open(source, "wt", encoding="utf-8") as f:
+        json.dump(CITIES, f, indent=1)
+    target = tmp_path / "cities.idx"
+    assert build_index(source, target) == len(CITIES)
+    idx = CityIndex.open(target)
+    yield idx
+    idx.close()
+
+
+def test_streaming_reader_handles_small_reads(monkeypatch):
+    monkeypatch.setattr("services.cityindex._READ_SIZE", 7)
+    assert list(iter_city_list(io.StringIO(json.dumps(CITIES)))) == CITIES
+
+
+def test_lookup_is_case_and_accent_insensitive(index):
+    assert [c.country for c in index.lookup("los angeles")] == ["CL", "US"]
+    assert index.lookup("SAO PAULO")[0].id == 3448439
+    assert index.resolve("Los Angeles, US").id == 5368361
+    assert index.resolve("Portland, US") is None  # ambiguous
+    assert index.resolve("Portland, ME, US").id == 4975802
+
+
+def test_prefix_search(index):
+    names = [c.name for c in index.prefix_search("san", country="US")]
+    assert names == ["San Francisco", "San Jose"]
+    assert [c.name for c in index.prefix_search("s", limit=1)] == ["San Francisco"]
+
+
+def test_nearest(index):
+    (city, km), second = index.nearest(37.8, -122.3, limit=2)
+    assert city.name == "San Francisco" and km < 15
+    assert second[0].name == "San Jose"
+
+
+def test_weather_requests_use_indexed_ids(index, monkeypatch):
+    monkeypatch.setattr(owm, "CITY_INDEX", index)
+    monkeypatch.setattr(owm, "CITY_IDS", {})
+    assert "id=5368361&" in owm._weather_request("Los Angeles, US", "key").full_url
+    assert "q=Portland%2C%20US" in owm._weather_request("Portland, US", "key").full_url
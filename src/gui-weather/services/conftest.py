@@ -0,0 +1,34 @@
+"""Test doubles shared by the service tests."""
+
+import io
+
+import pytest
+
+
+class FakeClock:
+    """Clock for caches, stores and breakers that only moves when a test sets ``now``."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeResponse(io.BytesIO):
+    """In-memory stand-in for a ``transport.urlopen`` response."""
+
+    def __init__(self, body, headers=None):
+        super().__init__(body)
+        self.headers = headers or {}
+
+
+@pytest.fixture()
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture()
+def fake_response():
+    """The response class, to build canned responses inside fake ``urlopen`` functions."""
+    return FakeResponse
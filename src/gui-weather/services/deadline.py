@@ -0,0 +1,68 @@
+"""End-to-end time budgets shared by every step of a service call."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when an operation's overall time budget has run out.
+
+    ``stages`` holds the seconds spent per stage up to the point of failure.
+    """
+
+    def __init__(self, message: str, stages: dict[str, float]) -> None:
+        super().__init__(message)
+        self.stages = stages
+
+
+class Deadline:
+    """A fixed time budget that attempts, backoff sleeps and fallbacks all draw from.
+
+    Time spent inside :meth:`stage` blocks is accumulated in :attr:`stages` so callers can
+    see how the budget was used, e.g. ``{"nws_v3": 2.1, "xml": 0.4}``.
+    """
+
+    def __init__(self, budget: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.budget = budget
+        self._clock = clock
+        self._start = clock()
+        self.stages: dict[str, float] = {}
+
+    def elapsed(self) -> float:
+        return self._clock() - self._start
+
+    def remaining(self) -> float:
+        return max(0.0, self.budget - self.elapsed())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self) -> None:
+        if self.expired:
+            raise DeadlineExceeded(f"deadline of {self.budget:.2f}s exceeded", dict(self.stages))
+
+    def timeout(self, timeout: float) -> float:
+        """Clamp a per-attempt ``timeout`` to the remaining budget, failing if none is left."""
+        self.check()
+        return min(timeout, self.remaining())
+
+    def sleep(self, seconds: float) -> None:
+        """Sleep for a backoff delay, failing fast if the delay would outlast the budget."""
+        if seconds >= self.remaining():
+            raise DeadlineExceeded(
+                f"deadline of {self.budget:.2f}s leaves no time for a {seconds:.2f}s backoff",
+                dict(self.stages),
+            )
+        time.sleep(seconds)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (self._clock() - start)
@@ -0,0 +1,159 @@
+"""SQLite-backed persistent cache for observations, shared safely between processes."""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    payload BLOB,
+    fetched_at REAL NOT NULL,
+    etag TEXT NOT NULL DEFAULT '',
+    last_modified TEXT NOT NULL DEFAULT '',
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_fetched_at ON entries (fetched_at);
+"""
+
+# Prune after this many writes rather than on every put
+_PRUNE_EVERY = 32
+
+
+def default_cache_path() -> Path:
+    """``$WEATHER_CACHE_PATH`` or ``$XDG_CACHE_HOME/python-projects/weather.sqlite3``."""
+    override = os.getenv("WEATHER_CACHE_PATH")
+    if override:
+        return Path(override)
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "python-projects" / "weather.sqlite3"
+
+
+@dataclass(frozen=True)
+class DiskEntry:
+    """A stored value (JSON-decoded) with its raw payload, validators and age in seconds."""
+
+    value: Any
+    payload: bytes | None
+    age: float
+    etag: str
+    last_modified: str
+
+
+class DiskCache:
+    """Persistent key/value store bounded by entry age and total size.
+
+    Uses SQLite in WAL mode with a busy timeout, so the GUI, the scheduler and other pollers
+    can read and write the same file concurrently. Values must be JSON-serializable.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        max_age: float = 24 * 3600.0,
+        max_bytes: int = 16 * 1024 * 1024,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = Path(path)
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._local = threading.local()
+        self._writes = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+        self.prune()
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads; keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> DiskEntry | None:
+        """Return the entry for ``key`` if it is younger than ``max_age``."""
+        row = (
+            self._connect()
+            .execute(
+                "SELECT value, payload, fetched_at, etag, last_modified FROM entries WHERE key = ?",
+                (key,),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        value, payload, fetched_at, etag, last_modified = row
+        age = self._clock() - fetched_at
+        if age > self.max_age:
+            return None
+        return DiskEntry(json.loads(value), payload, max(0.0, age), etag, last_modified)
+
+    def put(
+        self,
+        key: str,
+        value: Any,
+        payload: bytes | None = None,
+        etag: str = "",
+        last_modified: str = "",
+    ) -> None:
+        encoded = json.dumps(value, separators=(",", ":"))
+        size = len(key) + len(encoded) + (len(payload) if payload else 0)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries"
+                " (key, value, payload, fetched_at, etag, last_modified, size)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, encoded, payload, self._clock(), etag, last_modified, size),
+            )
+        self._writes += 1
+        if self._writes % _PRUNE_EVERY == 0:
+            self.prune()
+
+    def touch(self, key: str) -> None:
+        """Reset an entry's fetch time, e.g. after a ``304 Not Modified`` revalidation."""
+        with self._connect() as conn:
+            conn.execute("UPDATE entries SET fetched_at = ? WHERE key = ?", (self._clock(), key))
+
+    def prune(self) -> None:
+        """Drop entries older than ``max_age``, then the oldest until under ``max_bytes``."""
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM entries WHERE fetched_at < ?", (self._clock() - self.max_age,)
+            )
+            conn.execute(
+                "DELETE FROM entries WHERE key IN ("
+                " SELECT key FROM ("
+                "  SELECT key, SUM(size) OVER (ORDER BY fetched_at DESC, key) AS running"
+                "  FROM entries"
+                " ) WHERE running > ?"
+                ")",
+                (self.max_bytes,),
+            )
+
+    def total_bytes(self) -> int:
+        row = self._connect().execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return int(row[0])
+
+    def __len__(self) -> int:
+        return int(self._connect().execute("SELECT COUNT(*) FROM entries").fetchone()[0])
+
+    def close(self) -> None:
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,47 @@
+"""Tests for the SQLite-backed persistent cache."""
+
+from services.cache import ObservationCache
+from services.diskcache import DiskCache
+from services.observation import Observation
+
+
+def test_entries_survive_reopening_and_expire_by_age(tmp_path, clock):
+    clock.now = 1_000_000.0
+    path = tmp_path / "weather.sqlite3"
+    DiskCache(path, max_age=60, clock=clock).put("nws_v3:KLAX", {"t": 1}, b"{}", etag='"v1"')
+
+    reopened = DiskCache(path, max_age=60, clock=clock)
+    entry = reopened.get("nws_v3:KLAX")
+    assert (entry.value, entry.payload, entry.etag) == ({"t": 1}, b"{}", '"v1"')
+
+    clock.now += 61
+    assert reopened.get("nws_v3:KLAX") is None
+    reopened.prune()
+    assert len(reopened) == 0
+
+
+def test_prune_keeps_newest_entries_within_size_bound(tmp_path, clock):
+    clock.now = 1_000_000.0
+    cache = DiskCache(tmp_path / "c.sqlite3", max_bytes=300, clock=clock)
+    for idx in range(5):
+        clock.now += 1
+        cache.put(f"owm:city{idx}", {"n": idx}, payload=b"x" * 100)
+
+    cache.prune()
+
+    assert cache.total_bytes() <= 300
+    assert cache.get("owm:city4") is not None
+    assert cache.get("owm:city0") is None
+
+
+def test_memory_cache_warms_from_disk_after_restart(tmp_path):
+    path = tmp_path / "weather.sqlite3"
+    codec = {"encode": Observation.to_record, "decode": Observation.from_record}
+    obs = Observation("KLAX", temperature_c=21.5)
+    ObservationCache(store=DiskCache(path), **codec).put(("nws_v3", "KLAX"), obs)
+
+    fresh_process = ObservationCache(store=DiskCache(path), **codec)
+    entry = fresh_process.get(("nws_v3", "KLAX"))
+
+    assert entry.value == obs
+    assert fresh_process.is_fresh(entry)
@@ -0,0 +1,193 @@
+"""Columnar OpenWeatherMap forecasts with whole-column unit conversion.
+
+A forecast response holds 40 three-hourly steps (or up to 16 daily ones) per city. :class:`Forecast`
+keeps each quantity as one ``array('d')`` column in the upstream SI units. Conversions run over
+a whole column at once, through NumPy when it is installed, and are cached on the forecast.
+Text is only produced when a caller asks for :meth:`Forecast.rows`.
+"""
+
+from __future__ import annotations
+
+import importlib
+import math
+import sys
+from array import array
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from functools import cache, cached_property
+from typing import Any
+
+
+@cache
+def _numpy() -> Any:
+    """NumPy, imported on first conversion; ``None`` falls back to the array module."""
+    try:
+        return importlib.import_module("numpy")
+    except ImportError:
+        return None
+
+
+# Forecast kinds, named after the OWM endpoint that serves them
+THREE_HOURLY = "3h"
+HOURLY = "hourly"
+DAILY = "daily"
+
+KELVIN_OFFSET = 273.15
+MPS_TO_MPH = 2.23693629
+METERS_TO_MILES = 0.00062137
+
+
+def _affine(values: array, scale: float, offset: float = 0.0) -> array:
+    """Return ``values * scale + offset`` for a whole ``array('d')`` column."""
+    np = _numpy()
+    if np is None:
+        return array("d", [value * scale + offset for value in values])
+    out = array("d", values)
+    view = np.frombuffer(out, dtype=np.float64)
+    view *= scale
+    view += offset
+    return out
+
+
+def kelvin_to_celsius(values: array) -> array:
+    return _affine(values, 1.0, -KELVIN_OFFSET)
+
+
+def celsius_to_fahrenheit(values: array) -> array:
+    return _affine(values, 1.8, 32.0)
+
+
+def mps_to_mph(values: array) -> array:
+    return _affine(values, MPS_TO_MPH)
+
+
+def meters_to_miles(values: array) -> array:
+    return _affine(values, METERS_TO_MILES)
+
+
+@dataclass(eq=False)
+class Forecast:
+    """One city's forecast as parallel columns, one entry per time step.
+
+    Temperatures are in kelvin, wind speed in m/s, visibility in meters (NaN where it is not
+    reported), pressure in hPa, humidity in percent and ``pop`` (probability of
+    precipitation) in 0..1. Treat instances as read-only; they are shared through caches.
+    """
+
+    kind: str
+    city_id: int
+    city: str
+    country: str
+    time: array
+    temp: array
+    temp_min: array
+    temp_max: array
+    humidity: array
+    pressure: array
+    wind_speed: array
+    wind_deg: array
+    visibility: array
+    pop: array
+    description: list[str]
+    icon: list[str]
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    @cached_property
+    def temp_c(self) -> array:
+        return kelvin_to_celsius(self.temp)
+
+    @cached_property
+    def temp_f(self) -> array:
+        return celsius_to_fahrenheit(self.temp_c)
+
+    @cached_property
+    def temp_min_c(self) -> array:
+        return kelvin_to_celsius(self.temp_min)
+
+    @cached_property
+    def temp_max_c(self) -> array:
+        return kelvin_to_celsius(self.temp_max)
+
+    @cached_property
+    def wind_mph(self) -> array:
+        return mps_to_mph(self.wind_speed)
+
+    @cached_property
+    def visibility_miles(self) -> array:
+        return meters_to_miles(self.visibility)
+
+    def rows(self, start: int = 0, stop: int | None = None) -> Iterator[dict[str, str]]:
+        """Yield display strings for steps ``start:stop``, formatting each step on demand.
+
+        Keys follow :func:`services.owm.get_open_weather_data` where the quantities overlap.
+        """
+        time_format = "%Y-%m-%d" if self.kind == DAILY else "%Y-%m-%d %H:%M:%S"
+        temp_c, temp_f, wind_mph, visibility = (
+            self.temp_c,
+            self.temp_f,
+            self.wind_mph,
+            self.visibility_miles,
+        )
+        for i in range(*slice(start, stop).indices(len(self))):
+            miles = visibility[i]
+            yield {
+                "time": datetime.fromtimestamp(self.time[i]).strftime(time_format),
+                "weather": self.description[i],
+                "weather_icon": self.icon[i],
+                "temp_f": f"{temp_f[i]:.1f}",
+                "temp_c": f"{temp_c[i]:.1f}",
+                "humidity": f"{self.humidity[i]:.0f} %",
+                "pressure": f"{self.pressure[i]:.0f} hPa",
+                "wind": f"{self.wind_deg[i]:.0f} degrees at {wind_mph[i]:.1f} MPH",
+                "visibility": "N/A miles" if math.isnan(miles) else f"{miles:.2f} miles",
+                "pop": f"{self.pop[i] * 100:.0f} %",
+            }
+
+
+def parse_forecast(document: dict, kind: str = THREE_HOURLY) -> Forecast:
+    """Build a :class:`Forecast` from a decoded ``/data/2.5/forecast[/hourly|/daily]`` response."""
+    items = document.get("list", [])
+    city = document.get("city", {})
+    weather = [item["weather"][0] for item in items]
+    if kind == DAILY:
+        # Daily steps nest temperatures by time of day and put wind at the top level
+        temps = [item["temp"] for item in items]
+        temp = array("d", [t["day"] for t in temps])
+        temp_min = array("d", [t["min"] for t in temps])
+        temp_max = array("d", [t["max"] for t in temps])
+        humidity = array("d", [item["humidity"] for item in items])
+        pressure = array("d", [item["pressure"] for item in items])
+        wind_speed = array("d", [item["speed"] for item in items])
+        wind_deg = array("d", [item.get("deg", 0) for item in items])
+    else:
+        mains = [item["main"] for item in items]
+        temp = array("d", [main["temp"] for main in mains])
+        temp_min = array("d", [main["temp_min"] for main in mains])
+        temp_max = array("d", [main["temp_max"] for main in mains])
+        humidity = array("d", [main["humidity"] for main in mains])
+        pressure = array("d", [main["pressure"] for main in mains])
+        winds = [item["wind"] for item in items]
+        wind_speed = array("d", [wind["speed"] for wind in winds])
+        wind_deg = array("d", [wind.get("deg", 0) for wind in winds])
+    return Forecast(
+        kind=kind,
+        city_id=int(city.get("id", 0)),
+        city=str(city.get("name", "")),
+        country=str(city.get("country", "")),
+        time=array("q", [item["dt"] for item in items]),
+        temp=temp,
+        temp_min=temp_min,
+        temp_max=temp_max,
+        humidity=humidity,
+        pressure=pressure,
+        wind_speed=wind_speed,
+        wind_deg=wind_deg,
+        visibility=array("d", [item.get("visibility", math.nan) for item in items]),
+        pop=array("d", [item.get("pop", 0.0) for item in items]),
+        # A few dozen distinct strings repeat across every city; share one copy of each
+        description=[sys.intern(w["description"]) for w in weather],
+        icon=[sys.intern(w["icon"]) for w in weather],
+    )
@@ -0,0 +1,82 @@
+"""Tests for columnar OWM forecasts and their unit conversions."""
+
+import io
+import json
+import math
+from pathlib import Path
+
+import pytest
+
+from services import forecast, owm
+from services.cache import ObservationCache
+from services.forecast import DAILY, parse_forecast
+
+FIXTURES = Path(__file__).resolve().parents[1] / "fixtures" / "owm"
+THREE_HOURLY = json.loads((FIXTURES / "forecast.json").read_text())
+DAILY_DOC = json.loads((FIXTURES / "forecast_daily.json").read_text())
+
+
+def test_three_hourly_columns_match_scalar_conversions():
+    fc = parse_forecast(THREE_HOURLY)
+    assert len(fc) == 40 and fc.city == "London" and fc.city_id == 2643743
+    first = THREE_HOURLY["list"][0]
+    current = owm._parse_open_weather(
+        dict(
+            first,
+            name="London",
+            sys={"country": "GB", "sunrise": 0, "sunset": 0},
+        )
+    )
+    row = next(fc.rows())
+    for key in ("temp_f", "temp_c", "humidity", "pressure", "wind", "visibility", "weather"):
+        assert row[key] == current[key]
+    assert row["pop"] == "0 %" and fc.icon[0] == "10d"
+
+
+def test_daily_uses_day_temperature_and_top_level_wind():
+    fc = parse_forecast(DAILY_DOC, DAILY)
+    assert len(fc) == 7
+    assert fc.temp_c[0] == pytest.approx(DAILY_DOC["list"][0]["temp"]["day"] - 273.15)
+    assert fc.wind_mph[6] == pytest.approx(DAILY_DOC["list"][6]["speed"] * 2.23693629)
+    assert math.isnan(fc.visibility[0])
+    row = list(fc.rows(start=-1))[0]
+    assert row["visibility"] == "N/A miles" and len(row["time"]) == len("2020-08-19")
+
+
+def test_numpy_and_array_backends_agree(monkeypatch):
+    np = pytest.importorskip("numpy")
+    with_numpy = parse_forecast(THREE_HOURLY)
+    monkeypatch.setattr(forecast, "_numpy", lambda: None)
+    without = parse_forecast(THREE_HOURLY)
+    assert np.allclose(with_numpy.temp_f, without.temp_f)
+    assert list(with_numpy.rows()) == list(without.rows())
+
+
+def test_conversions_are_computed_once():
+    fc = parse_forecast(THREE_HOURLY)
+    assert fc.temp_f is fc.temp_f
+    assert fc.temp_c[0] == pytest.approx(THREE_HOURLY["list"][0]["main"]["temp"] - 273.15)
+
+
+def test_fetch_uses_known_ids_and_caches(monkeypatch):
+    monkeypatch.setattr(owm, "CITY_IDS", {})
+    urls = []
+
+    def fake_urlopen(req, timeout):
+        urls.append(req.full_url)
+        document = DAILY_DOC if "/daily?" in req.full_url else THREE_HOURLY
+        return io.BytesIO(json.dumps(document).encode())
+
+    monkeypatch.setattr(owm.transport, "urlopen", fake_urlopen)
+    cache = ObservationCache()
+    results = list(owm.get_open_weather_forecast_many(["London, UK", "Paris"], "k", cache=cache))
+    assert sorted(r.city for r in results) == ["London, UK", "Paris"]
+    assert all("/data/2.5/forecast?q=" in url for url in urls)
+
+    urls.clear()
+    owm.get_open_weather_forecast("London, UK", "k", kind=DAILY, cache=cache)
+    assert urls == ["https://api.openweathermap.org/data/2.5/forecast/daily?id=2643743&appid=k"]
+    owm.get_open_weather_forecast("London, UK", "k", kind=DAILY, cache=cache)
+    assert len(urls) == 1
+    with pytest.raises(ValueError):
+        owm.get_open_weather_forecast("London, UK", "k", kind="weekly")
@@ -0,0 +1,186 @@
+"""Append-only columnar store for per-station observation history.
+
+Each station gets a directory holding one file per variable plus a shared timestamp index::
+
+    <root>/<STATION>/time.i64       observation times, Unix seconds, ascending (int64)
+    <root>/<STATION>/<column>.f64   one float64 per row, NaN where not reported
+
+Appends write every variable column first and the timestamp index last, so ``time.i64`` is
+the commit record. Rows past its length, left behind by an interrupted append, are truncated
+the next time the station is written. Reads binary-search the memory-mapped index and load
+only the selected rows. Values are stored in native byte order.
+"""
+
+from __future__ import annotations
+
+import math
+import mmap
+import os
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable
+from pathlib import Path
+from typing import NamedTuple
+
+_TIME_FILE = "time.i64"
+_COLUMN_SUFFIX = ".f64"
+_ITEM_SIZE = 8
+_STATION_RE = re.compile(r"[A-Za-z0-9_-]+")
+
+
+def default_history_path() -> Path:
+    """``$WEATHER_HISTORY_DIR`` or ``$XDG_CACHE_HOME/python-projects/history``."""
+    override = os.getenv("WEATHER_HISTORY_DIR")
+    if override:
+        return Path(override)
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "python-projects" / "history"
+
+
+def _load(path: Path, typecode: str, start: int, stop: int) -> array:
+    """Read items ``start:stop`` of a column file."""
+    values = array(typecode)
+    if stop > start:
+        with open(path, "rb") as f:
+            f.seek(start * _ITEM_SIZE)
+            values.frombytes(f.read((stop - start) * _ITEM_SIZE))
+    return values
+
+
+class Series(NamedTuple):
+    """Rows of one station: the timestamp index and the requested columns, all aligned."""
+
+    time: array
+    columns: dict[str, array]
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+
+class HistoryStore:
+    """Per-station columnar history under ``root``; safe to share between threads.
+
+    Writers for different stations proceed in parallel; writes to one station are
+    serialized. Rows must be appended in time order, newer than :meth:`high_water`.
+    """
+
+    def __init__(self, root: str | os.PathLike[str]) -> None:
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self._station_locks: dict[str, threading.Lock] = {}
+
+    def _dir(self, station_id: str) -> Path:
+        if not _STATION_RE.fullmatch(station_id):
+            raise ValueError(f"invalid station id: {station_id!r}")
+        return self.root / station_id.upper()
+
+    def _station_lock(self, station_id: str) -> threading.Lock:
+        with self._lock:
+            return self._station_locks.setdefault(station_id.upper(), threading.Lock())
+
+    def stations(self) -> list[str]:
+        if not self.root.is_dir():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if (p / _TIME_FILE).is_file())
+
+    def columns(self, station_id: str) -> list[str]:
+        directory = self._dir(station_id)
+        if not directory.is_dir():
+            return []
+        return sorted(p.name[: -len(_COLUMN_SUFFIX)] for p in directory.glob("*" + _COLUMN_SUFFIX))
+
+    def __len__(self) -> int:
+        return sum(self.count(station_id) for station_id in self.stations())
+
+    def count(self, station_id: str) -> int:
+        try:
+            return (self._dir(station_id) / _TIME_FILE).stat().st_size // _ITEM_SIZE
+        except FileNotFoundError:
+            return 0
+
+    def high_water(self, station_id: str) -> int | None:
+        """Timestamp of the newest stored row for ``station_id``, or ``None`` if empty."""
+        rows = self.count(station_id)
+        if not rows:
+            return None
+        return _load(self._dir(station_id) / _TIME_FILE, "q", rows - 1, rows)[0]
+
+    def append(self, station_id: str, time: array, columns: dict[str, array]) -> int:
+        """Append rows (``time`` ascending, one value per row in each column).
+
+        Columns missing from ``columns`` are filled with NaN, and new column names start as NaN
+        for all earlier rows. Returns the number of rows written.
+        """
+        if not len(time):
+            return 0
+        if any(len(values) != len(time) for values in columns.values()):
+            raise ValueError("every column needs one value per timestamp")
+        if any(later <= earlier for earlier, later in zip(time, time[1:])):
+            raise ValueError("timestamps must be strictly increasing")
+        directory = self._dir(station_id)
+        with self._station_lock(station_id):
+            directory.mkdir(parents=True, exist_ok=True)
+            time_path = directory / _TIME_FILE
+            rows = time_path.stat().st_size // _ITEM_SIZE if time_path.exists() else 0
+            if rows:
+                newest = _load(time_path, "q", rows - 1, rows)[0]
+                if time[0] <= newest:
+                    raise ValueError(f"{station_id}: rows must be newer than {newest}")
+            names = set(columns) | {
+                p.name[: -len(_COLUMN_SUFFIX)] for p in directory.glob("*" + _COLUMN_SUFFIX)
+            }
+            for name in sorted(names):
+                values = columns.get(name)
+                if values is None:
+                    values = array("d", [math.nan]) * len(time)
+                self._append_column(directory / (name + _COLUMN_SUFFIX), rows, values)
+            with open(time_path, "ab") as f:
+                f.write(array("q", time).tobytes())
+        return len(time)
+
+    @staticmethod
+    def _append_column(path: Path, rows: int, values: array) -> None:
+        # Align the column with the committed index first: drop rows left by an interrupted
+        # append and pad columns that did not exist yet
+        with open(path, "ab") as f:
+            size = f.tell()
+            if size > rows * _ITEM_SIZE:
+                f.truncate(rows * _ITEM_SIZE)
+            elif size < rows * _ITEM_SIZE:
+                f.write((array("d", [math.nan]) * (rows - size // _ITEM_SIZE)).tobytes())
+            f.write(array("d", values).tobytes())
+
+    def read(
+        self,
+        station_id: str,
+        start: int | None = None,
+        end: int | None = None,
+        columns: Iterable[str] | None = None,
+    ) -> Series:
+        """Rows with ``start <= time < end`` (either bound optional) for ``columns`` (all)."""
+        directory = self._dir(station_id)
+        rows = self.count(station_id)
+        names = list(columns) if columns is not None else self.columns(station_id)
+        if not rows:
+            return Series(array("q"), {name: array("d") for name in names})
+        time_path = directory / _TIME_FILE
+        with open(time_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            index = memoryview(m)[: rows * _ITEM_SIZE].cast("q")
+            try:
+                lo = bisect_left(index, start) if start is not None else 0
+                hi = max(lo, bisect_left(index, end)) if end is not None else rows
+            finally:
+                index.release()
+        result = {}
+        for name in names:
+            path = directory / (name + _COLUMN_SUFFIX)
+            if path.exists():
+                size = path.stat().st_size // _ITEM_SIZE
+                values = _load(path, "d", lo, min(hi, size))
+                values.extend([math.nan] * (hi - lo - len(values)))
+            else:
+                values = array("d", [math.nan]) * (hi - lo)
+            result[name] = values
+        return Series(_load(time_path, "q", lo, hi), result)
@@ -0,0 +1,56 @@
+"""Tests for the per-station columnar history store."""
+
+import math
+from array import array
+
+import pytest
+
+from services.history import HistoryStore
+
+
+def rows(*times):
+    return array("q", times), {"temperature_c": array("d", [t / 10 for t in times])}
+
+
+def test_append_and_range_reads(tmp_path):
+    store = HistoryStore(tmp_path)
+    assert store.high_water("KLAX") is None and len(store.read("KLAX")) == 0
+    store.append("KLAX", *rows(100, 200, 300))
+    store.append("KLAX", *rows(400))
+
+    assert store.high_water("KLAX") == 400 and store.count("KLAX") == 4
+    series = store.read("KLAX", start=200, end=400)
+    assert list(series.time) == [200, 300]
+    assert list(series.columns["temperature_c"]) == [20.0, 30.0]
+    assert store.stations() == ["KLAX"] and store.columns("KLAX") == ["temperature_c"]
+
+
+def test_rows_must_be_newer_than_high_water(tmp_path):
+    store = HistoryStore(tmp_path)
+    store.append("KLAX", *rows(100, 200))
+    with pytest.raises(ValueError):
+        store.append("KLAX", *rows(200))
+    with pytest.raises(ValueError):
+        store.append("KDEN", *rows(300, 300))
+
+
+def test_new_and_missing_columns_are_nan_filled(tmp_path):
+    store = HistoryStore(tmp_path)
+    store.append("KLAX", *rows(100))
+    store.append("KLAX", array("q", [200]), {"dewpoint_c": array("d", [5.0])})
+
+    series = store.read("KLAX")
+    assert math.isnan(series.columns["dewpoint_c"][0]) and series.columns["dewpoint_c"][1] == 5
+    assert math.isnan(series.columns["temperature_c"][1])
+
+
+def test_interrupted_append_is_rolled_back(tmp_path):
+    store = HistoryStore(tmp_path)
+    store.append("KLAX", *rows(100))
+    # A crash after the value columns were written but before the timestamp index was
+    with open(tmp_path / "KLAX" / "temperature_c.f64", "ab") as f:
+        f.write(array("d", [99.0]).tobytes())
+    assert store.count("KLAX") == 1
+
+    store.append("KLAX", *rows(200))
+    assert list(store.read("KLAX").columns["temperature_c"]) == [10.0, 20.0]
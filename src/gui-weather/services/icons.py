@@ -0,0 +1,141 @@
+"""OpenWeatherMap condition icons, cached in memory and on disk and prefetched in the background.
+
+OWM uses a fixed set of eighteen icon codes (``01d`` .. ``50n``), so once they have been fetched
+the GUI never needs the network for icons again. :class:`IconCache` hands out the raw PNG bytes;
+decoding them into a Tk image is left to the GUI, which must do it on the Tk thread.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from pathlib import Path
+from urllib.request import Request
+
+from . import metrics, transport
+from .noaa import USER_AGENT
+from .singleflight import FLIGHTS
+
+# Override to point at a stand-in server (see ``benchmarks/standin_server.py``)
+OWM_ICON_BASE = os.getenv("WEATHER_OWM_ICON_BASE", "https://openweathermap.org")
+
+# Every icon code OWM returns: clear, few/scattered/broken clouds, showers, rain, thunderstorm,
+# snow and mist, each in a day and a night variant
+ICON_CODES = tuple(f"{n:02d}{tod}" for n in (1, 2, 3, 4, 9, 10, 11, 13, 50) for tod in "dn")
+
+_CODE_RE = re.compile(r"\d\d[dn]")
+
+
+def default_icon_dir() -> Path:
+    """``$WEATHER_ICON_DIR`` or ``$XDG_CACHE_HOME/python-projects/owm-icons``."""
+    override = os.getenv("WEATHER_ICON_DIR")
+    if override:
+        return Path(override)
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "python-projects" / "owm-icons"
+
+
+def icon_url(code: str) -> str:
+    return f"{OWM_ICON_BASE}/img/w/{code}.png"
+
+
+def _emit_cache(result: str) -> None:
+    if metrics.BUS.active:
+        metrics.emit(metrics.CacheEvent("owm", "icon", result))
+
+
+class IconCache:
+    """Thread-safe LRU of icon PNGs keyed by OWM icon code, backed by ``directory``.
+
+    Lookups try memory, then ``directory/<code>.png``, then the network; downloads are
+    written atomically to disk and concurrent requests for one icon share a single fetch.
+    Pass ``directory=None`` for a memory-only cache.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str] | None = None,
+        max_entries: int = len(ICON_CODES),
+        timeout: float = 10,
+    ) -> None:
+        self.directory = Path(directory) if directory is not None else None
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+
+    def __contains__(self, code: str) -> bool:
+        with self._lock:
+            return code in self._entries
+
+    def get(self, code: str) -> bytes:
+        """Return the PNG bytes for icon ``code``, fetching and storing them if needed."""
+        if not _CODE_RE.fullmatch(code):
+            raise ValueError(f"not an OWM icon code: {code!r}")
+        with self._lock:
+            data = self._entries.get(code)
+            if data is not None:
+                self._entries.move_to_end(code)
+        if data is not None:
+            _emit_cache("hit")
+            return data
+        data = self._read(code)
+        if data is not None:
+            _emit_cache("disk")
+        else:
+            _emit_cache("miss")
+            data = FLIGHTS.do(("owm-icon", code), lambda: self._fetch(code))
+        self._remember(code, data)
+        return data
+
+    def _remember(self, code: str, data: bytes) -> None:
+        with self._lock:
+            self._entries[code] = data
+            self._entries.move_to_end(code)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _read(self, code: str) -> bytes | None:
+        if self.directory is None:
+            return None
+        try:
+            return (self.directory / f"{code}.png").read_bytes() or None
+        except OSError:
+            return None
+
+    def _fetch(self, code: str) -> bytes:
+        req = Request(icon_url(code), headers={"User-Agent": USER_AGENT})
+        with metrics.labels("owm", "icon"), transport.urlopen(req, timeout=self.timeout) as resp:
+            data = resp.read()
+        if self.directory is not None:
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                tmp = self.directory / f".{code}.{os.getpid()}.{threading.get_ident()}.tmp"
+                tmp.write_bytes(data)
+                os.replace(tmp, self.directory / f"{code}.png")
+            except OSError:
+                pass  # a read-only cache directory only costs a refetch next run
+        return data
+
+    def prefetch(self, codes: Iterable[str] = ICON_CODES) -> threading.Thread:
+        """Load ``codes`` into the cache on a daemon thread and return the thread.
+
+        Failures are ignored; the icon is simply fetched again on first use.
+        """
+
+        def run() -> None:
+            for code in codes:
+                try:
+                    self.get(code)
+                except Exception:
+                    pass
+
+        thread = threading.Thread(target=run, name="owm-icon-prefetch", daemon=True)
+        thread.start()
+        return thread
+
+
+ICONS = IconCache(default_icon_dir())
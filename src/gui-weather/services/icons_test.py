@@ -0,0 +1,59 @@
+"""Tests for the OWM icon cache (network access is monkeypatched out)."""
+
+import pytest
+
+from services import icons, noaa
+from services.icons import ICON_CODES, IconCache
+
+PNG = b"\x89PNG\r\n\x1a\nfake"
+
+
+@pytest.fixture()
+def fetched(monkeypatch, fake_response):
+    urls = []
+
+    def fake_urlopen(req, timeout):
+        urls.append(req.full_url)
+        return fake_response(PNG + req.full_url.encode())
+
+    monkeypatch.setattr(icons.transport, "urlopen", fake_urlopen)
+    return urls
+
+
+def test_requests_use_the_shared_user_agent(monkeypatch, fake_response):
+    agents = []
+
+    def fake_urlopen(req, timeout):
+        agents.append(req.get_header("User-agent"))
+        return fake_response(PNG)
+
+    monkeypatch.setattr(icons.transport, "urlopen", fake_urlopen)
+    IconCache(directory=None).get("01d")
+    assert agents == [noaa.USER_AGENT]
+
+
+def test_memory_then_disk_then_network(tmp_path, fetched):
+    cache = IconCache(tmp_path)
+    data = cache.get("10d")
+    assert data.startswith(PNG) and fetched == ["https://openweathermap.org/img/w/10d.png"]
+    assert cache.get("10d") is data and len(fetched) == 1
+    assert (tmp_path / "10d.png").read_bytes() == data
+
+    # A fresh process reads the icon back from disk without a request
+    assert IconCache(tmp_path).get("10d") == data and len(fetched) == 1
+
+
+def test_lru_bound_and_code_validation(fetched):
+    cache = IconCache(directory=None, max_entries=2)
+    for code in ("01d", "02d", "03d"):
+        cache.get(code)
+    assert "01d" not in cache and "03d" in cache
+    with pytest.raises(ValueError):
+        cache.get("../../etc/passwd")
+
+
+def test_prefetch_loads_every_icon(tmp_path, fetched):
+    cache = IconCache(tmp_path)
+    cache.prefetch().join(timeout=5)
+    assert len(ICON_CODES) == 18 and len(fetched) == 18
+    assert all(code in cache for code in ICON_CODES)
@@ -0,0 +1,263 @@
+"""Instrumentation events for upstream weather requests, plus a Prometheus-style aggregator.
+
+The transport and service modules :func:`emit` small event records on :data:`BUS`:
+
+* :class:`RequestEvent` - one per HTTP exchange: status, DNS/connect/TTFB/total latency and
+  wire/decoded body bytes;
+* :class:`RetryEvent` - a failed attempt that will be retried after ``delay`` seconds;
+* :class:`CacheEvent` - a cache lookup: ``"hit"``, ``"miss"`` or ``"revalidated"`` (304);
+* :class:`FallbackEvent` - a provider falling back from one endpoint to another.
+
+Events carry the provider/endpoint labels set with :func:`labels` by the code making the
+request. Subscribe any callable with :func:`subscribe`; with no subscribers emitting is a
+no-op. :class:`MetricsAggregator` is a ready-made subscriber that keeps latency percentiles
+and counters and writes them in the Prometheus text exposition format.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import math
+import os
+import threading
+from collections import Counter, deque
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+_LABELS: contextvars.ContextVar[tuple[str, str]] = contextvars.ContextVar(
+    "weather_metrics_labels", default=("", "")
+)
+
+
+@dataclass(frozen=True, slots=True)
+class RequestEvent:
+    """One HTTP request/response exchange. Latencies are in seconds; ``None`` if not measured.
+
+    ``dns`` and ``connect`` are only set when a new connection was opened (``connect``
+    includes the TLS handshake). ``status`` is ``None`` and ``error`` names the exception
+    when no response was received.
+    """
+
+    provider: str
+    endpoint: str
+    host: str
+    status: int | None
+    total: float
+    ttfb: float | None = None
+    dns: float | None = None
+    connect: float | None = None
+    bytes_received: int = 0
+    bytes_decoded: int = 0
+    reused: bool = False
+    error: str = ""
+
+
+@dataclass(frozen=True, slots=True)
+class RetryEvent:
+    provider: str
+    endpoint: str
+    attempt: int
+    delay: float
+    error: str
+
+
+@dataclass(frozen=True, slots=True)
+class CacheEvent:
+    provider: str
+    endpoint: str
+    result: str
+
+
+@dataclass(frozen=True, slots=True)
+class FallbackEvent:
+    provider: str
+    endpoint: str
+    fallback: str
+
+
+Event = RequestEvent | RetryEvent | CacheEvent | FallbackEvent
+
+
+class EventBus:
+    """Synchronous fan-out of events to subscribers, safe to use from any thread.
+
+    Subscribers run on the thread that emitted the event, so they should be quick. An
+    exception raised by a subscriber is counted in ``errors`` and otherwise ignored:
+    instrumentation must never break a weather request.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: tuple[Callable[[Event], None], ...] = ()
+        self._lock = threading.Lock()
+        self.errors = 0
+
+    def subscribe(self, callback: Callable[[Event], None]) -> Callable[[], None]:
+        """Register ``callback``; returns a function that unsubscribes it."""
+        with self._lock:
+            self._subscribers += (callback,)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                self._subscribers = tuple(s for s in self._subscribers if s is not callback)
+
+        return unsubscribe
+
+    @property
+    def active(self) -> bool:
+        return bool(self._subscribers)
+
+    def emit(self, event: Event) -> None:
+        for callback in self._subscribers:
+            try:
+                callback(event)
+            except Exception:  # noqa: BLE001 - see class docstring
+                self.errors += 1
+
+
+BUS = EventBus()
+
+
+def subscribe(callback: Callable[[Event], None]) -> Callable[[], None]:
+    """Subscribe ``callback`` to the shared :data:`BUS`."""
+    return BUS.subscribe(callback)
+
+
+def emit(event: Event) -> None:
+    BUS.emit(event)
+
+
+@contextlib.contextmanager
+def labels(provider: str, endpoint: str) -> Iterator[None]:
+    """Attribute requests made inside the block to ``provider``/``endpoint``."""
+    token = _LABELS.set((provider, endpoint))
+    try:
+        yield
+    finally:
+        _LABELS.reset(token)
+
+
+def current_labels() -> tuple[str, str]:
+    """The ``(provider, endpoint)`` set by the innermost :func:`labels` block."""
+    return _LABELS.get()
+
+
+QUANTILES = (0.5, 0.95, 0.99)
+_PHASES = ("dns", "connect", "ttfb", "total")
+
+
+def _quantile(sorted_samples: list[float], q: float) -> float:
+    """Nearest-rank quantile of an already sorted, non-empty list."""
+    rank = math.ceil(q * len(sorted_samples))
+    return sorted_samples[min(len(sorted_samples), max(rank, 1)) - 1]
+
+
+def _label_str(**values: object) -> str:
+    def escape(value: object) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return ",".join(f'{name}="{escape(value)}"' for name, value in values.items())
+
+
+class MetricsAggregator:
+    """Collects events into per provider/endpoint latency summaries and counters.
+
+    Latency quantiles are computed over the most recent ``window`` samples of each series;
+    ``_sum``/``_count`` and all counters cover everything since the aggregator was created.
+    Use as a subscriber: ``metrics.subscribe(aggregator)``.
+    """
+
+    def __init__(self, prefix: str = "weather", window: int = 2048) -> None:
+        self.prefix = prefix
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: dict[tuple[str, str, str], deque[float]] = {}
+        self._sums: Counter[tuple[str, str, str]] = Counter()
+        self._counts: Counter[tuple[str, str, str]] = Counter()
+        self._requests: Counter[tuple[str, str, str]] = Counter()
+        self._bytes: Counter[tuple[str, str, str]] = Counter()
+        self._retries: Counter[tuple[str, str]] = Counter()
+        self._cache: Counter[tuple[str, str, str]] = Counter()
+        self._fallbacks: Counter[tuple[str, str, str]] = Counter()
+
+    def __call__(self, event: Event) -> None:
+        with self._lock:
+            if isinstance(event, RequestEvent):
+                self._record_request(event)
+            elif isinstance(event, RetryEvent):
+                self._retries[event.provider, event.endpoint] += 1
+            elif isinstance(event, CacheEvent):
+                self._cache[event.provider, event.endpoint, event.result] += 1
+            elif isinstance(event, FallbackEvent):
+                self._fallbacks[event.provider, event.endpoint, event.fallback] += 1
+
+    def _record_request(self, event: RequestEvent) -> None:
+        status = str(event.status) if event.status is not None else event.error or "error"
+        self._requests[event.provider, event.endpoint, status] += 1
+        self._bytes[event.provider, event.endpoint, "wire"] += event.bytes_received
+        self._bytes[event.provider, event.endpoint, "decoded"] += event.bytes_decoded
+        for phase in _PHASES:
+            value = getattr(event, phase)
+            if value is None:
+                continue
+            key = (event.provider, event.endpoint, phase)
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(value)
+            self._sums[key] += value
+            self._counts[key] += 1
+
+    def quantiles(self, provider: str, endpoint: str, phase: str = "total") -> dict[float, float]:
+        """Return ``{quantile: seconds}`` for one latency series (empty if no samples)."""
+        with self._lock:
+            samples = sorted(self._samples.get((provider, endpoint, phase), ()))
+        return {q: _quantile(samples, q) for q in QUANTILES} if samples else {}
+
+    def render(self) -> str:
+        """Format everything collected so far in the Prometheus text exposition format."""
+        p = self.prefix
+        lines: list[str] = []
+        with self._lock:
+            name = f"{p}_request_duration_seconds"
+            lines += [
+                f"# HELP {name} Upstream request latency by phase (dns, connect, ttfb, total).",
+                f"# TYPE {name} summary",
+            ]
+            for (provider, endpoint, phase), samples in sorted(self._samples.items()):
+                ordered = sorted(samples)
+                base = _label_str(provider=provider, endpoint=endpoint, phase=phase)
+                for q in QUANTILES:
+                    lines.append(f'{name}{{{base},quantile="{q}"}} {_quantile(ordered, q):.6f}')
+                key = (provider, endpoint, phase)
+                lines.append(f"{name}_sum{{{base}}} {self._sums[key]:.6f}")
+                lines.append(f"{name}_count{{{base}}} {self._counts[key]}")
+
+            counters: list[tuple[str, str, tuple[str, ...], Counter]] = [
+                (
+                    "requests_total",
+                    "Upstream HTTP exchanges by status.",
+                    ("status",),
+                    self._requests,
+                ),
+                ("response_bytes_total", "Response body bytes.", ("encoding",), self._bytes),
+                ("retries_total", "Attempts that were retried.", (), self._retries),
+                ("cache_lookups_total", "Cache lookups by result.", ("result",), self._cache),
+                ("fallbacks_total", "Endpoint fallbacks taken.", ("fallback",), self._fallbacks),
+            ]
+            for suffix, help_text, extra, counter in counters:
+                name = f"{p}_{suffix}"
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                for key, count in sorted(counter.items()):
+                    names = ("provider", "endpoint", *extra)
+                    lines.append(f"{name}{{{_label_str(**dict(zip(names, key)))}}} {count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str | os.PathLike[str]) -> None:
+        """Atomically write :meth:`render` to ``path`` (e.g. for node_exporter's textfile
+        collector)."""
+        target = Path(path)
+        tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        tmp.write_text(self.render(), encoding="utf-8")
+        os.replace(tmp, target)
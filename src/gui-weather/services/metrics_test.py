@@ -0,0 +1,112 @@
+"""Tests for the instrumentation event bus and the Prometheus aggregator."""
+
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services import metrics, noaa
+from services.cache import ObservationCache
+from services.observation import Observation
+from services.transport import ConnectionPool
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def events():
+    received = []
+    unsubscribe = metrics.subscribe(received.append)
+    yield received
+    unsubscribe()
+
+
+def test_transport_reports_phases_with_labels(events):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/obs"
+    pool = ConnectionPool()
+    try:
+        with metrics.labels("noaa", "nws_v3"):
+            for _ in range(2):
+                with pool.urlopen(urllib.request.Request(url), timeout=5) as resp:
+                    resp.read()
+    finally:
+        pool.close()
+        server.shutdown()
+        server.server_close()
+
+    first, second = events
+    assert (first.provider, first.endpoint, first.status, first.bytes_decoded) == (
+        "noaa",
+        "nws_v3",
+        200,
+        2,
+    )
+    assert first.dns is not None and first.connect is not None and not first.reused
+    assert first.ttfb is not None and first.total >= first.ttfb
+    assert second.reused and second.dns is None and second.connect is None
+
+
+def test_fallback_and_cache_events(monkeypatch, events):
+    for breaker in noaa.BREAKERS.values():
+        breaker.reset()
+
+    def fake_urlopen(req, timeout, **kwargs):
+        raise urllib.error.URLError("down")
+
+    def fake_xml(station_id, timeout=10, cache=None, deadline=None):
+        return Observation(station_id)
+
+    monkeypatch.setattr(noaa, "_urlopen_with_retry", fake_urlopen)
+    monkeypatch.setattr(noaa, "fetch_noaa_xml_observation", fake_xml)
+    noaa.get_observation("KLAX", cache=ObservationCache())
+
+    assert events == [
+        metrics.CacheEvent("noaa", "nws_v3", "miss"),
+        metrics.FallbackEvent("noaa", "nws_v3", "xml"),
+    ]
+
+
+def test_aggregator_renders_quantiles_and_counters(tmp_path):
+    aggregator = metrics.MetricsAggregator()
+    for ms in range(1, 101):
+        aggregator(metrics.RequestEvent("owm", "weather", "h", 200, total=ms / 1000))
+    assert aggregator.quantiles("owm", "weather") == {0.5: 0.05, 0.95: 0.095, 0.99: 0.099}
+
+    aggregator(metrics.RequestEvent("owm", "weather", "h", None, total=1.0, error="TimeoutError"))
+    aggregator(metrics.RetryEvent("owm", "weather", 1, 0.5, "TimeoutError()"))
+    aggregator(metrics.CacheEvent("owm", "weather", "hit"))
+
+    path = tmp_path / "weather.prom"
+    aggregator.write_prometheus(path)
+    text = path.read_text()
+    base = 'provider="owm",endpoint="weather"'
+    assert f'weather_request_duration_seconds{{{base},phase="total",quantile="0.95"}} ' in text
+    assert f'weather_requests_total{{{base},status="200"}} 100' in text
+    assert f'weather_requests_total{{{base},status="TimeoutError"}} 1' in text
+    assert f"weather_retries_total{{{base}}} 1" in text
+    assert f'weather_cache_lookups_total{{{base},result="hit"}} 1' in text
+
+
+def test_failing_subscriber_does_not_break_emit():
+    bus = metrics.EventBus()
+    seen = []
+    bus.subscribe(lambda event: 1 / 0)
+    bus.subscribe(seen.append)
+    bus.emit(metrics.CacheEvent("noaa", "xml", "hit"))
+    assert len(seen) == 1 and bus.errors == 1
@@ -3,24 +3,153 @@
 from __future__ import annotations
 
 import json
+import math
+import os
 import time
+import urllib.error
+import urllib.parse
 import urllib.request
 import xml.etree.ElementTree as ET
+from array import array
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from datetime import UTC, datetime, timedelta
+from typing import Any, BinaryIO, NamedTuple, TypeVar
+
+from . import metrics, transport
+from .breaker import CircuitBreaker, CircuitOpenError
+from .cache import ObservationCache
+from .deadline import Deadline, DeadlineExceeded
+from .history import HistoryStore
+from .observation import Observation, _nws_value
+from .ratelimit import RateLimitExceeded, parse_retry_after
+from .singleflight import FLIGHTS
 
 USER_AGENT = "python-projects/ci (github.com/brennanbrown)"
 
+# Upstream base URLs; override (environment or assignment) to point at a stand-in server such
+# as ``benchmarks/standin_server.py``
+NWS_API_BASE = os.getenv("WEATHER_NWS_API_BASE", "https://api.weather.gov")
+NOAA_BASE = os.getenv("WEATHER_NOAA_BASE", "https://www.weather.gov")
+NOAA_SEEK_BASE = os.getenv("WEATHER_NOAA_SEEK_BASE", "https://w1.weather.gov")
+
+# Longest server-requested Retry-After (seconds) the retry wrapper is willing to sleep for
+MAX_RETRY_AFTER = 30.0
+
+T = TypeVar("T")
+
+
+# Attach a DiskCache as ``OBS_CACHE.store`` to persist observations across restarts
+OBS_CACHE = ObservationCache(
+    ttl=600.0,
+    max_entries=512,
+    encode=Observation.to_record,
+    decode=Observation.from_record,
+)
+
+# One breaker per upstream endpoint; while the JSON circuit is open, lookups go straight to XML.
+BREAKERS = {
+    "nws_v3": CircuitBreaker("nws_v3", failure_threshold=5, reset_timeout=60.0),
+    "xml": CircuitBreaker("xml", failure_threshold=5, reset_timeout=60.0),
+}
+
+# Top-level tags of the legacy current_obs document used to build an Observation: the raw
+# numbers, the texts the feed formats itself and the icon URL parts. temp_f, dewpoint_f and
+# pressure_in are left out; Observation.to_dict() derives them.
+_XML_TAGS = (
+    "observation_time",
+    "weather",
+    "location",
+    "temp_c",
+    "dewpoint_c",
+    "relative_humidity",
+    "wind_mph",
+    "wind_degrees",
+    "visibility_mi",
+    "pressure_mb",
+    "wind_string",
+    "pressure_string",
+    "icon_url_base",
+    "icon_url_name",
+)
+
+# NWS observation properties kept by the history store, by column name; values are converted
+# to the column's SI unit by their ``unitCode`` (wind speeds are served in km/h)
+HISTORY_FIELDS = {
+    "temperature_c": "temperature",
+    "dewpoint_c": "dewpoint",
+    "relative_humidity": "relativeHumidity",
+    "wind_speed_m_s": "windSpeed",
+    "wind_gust_m_s": "windGust",
+    "wind_direction_deg": "windDirection",
+    "visibility_m": "visibility",
+    "pressure_pa": "barometricPressure",
+    "sea_level_pressure_pa": "seaLevelPressure",
+    "precipitation_last_hour_mm": "precipitationLastHour",
+}
+# History is fetched one window at a time, which also bounds the rows held in memory per station
+HISTORY_WINDOW = timedelta(days=1)
+HISTORY_PAGE_LIMIT = 500
+# How far back a station's first incremental sync reaches (NWS keeps roughly a week)
+HISTORY_LOOKBACK = timedelta(days=7)
+# Page size for the station list (``/stations?state=``)
+STATIONS_PAGE_LIMIT = 500
+
 
 def _urlopen_with_retry(
-    req: urllib.request.Request, timeout: int, retries: int = 2, backoff: float = 0.5
+    req: urllib.request.Request,
+    timeout: float,
+    retries: int = 2,
+    backoff: float = 0.5,
+    deadline: Deadline | None = None,
 ):
+    """Open ``req`` with exponential backoff between attempts.
+
+    With a ``deadline``, each attempt's timeout and each backoff sleep is clamped to the
+    remaining budget and :class:`DeadlineExceeded` is raised as soon as it runs out.
+
+    Throttling responses (429/503) wait at least as long as their ``Retry-After`` header asks;
+    if that exceeds ``MAX_RETRY_AFTER`` the error is raised instead of sleeping.
+    :class:`RateLimitExceeded` is raised at once: retrying only queues for the same limiter.
+    """
+    sleep = deadline.sleep if deadline is not None else time.sleep
     last_exc: Exception | None = None
     for attempt in range(retries + 1):
+        attempt_timeout = deadline.timeout(timeout) if deadline is not None else timeout
         try:
-            return urllib.request.urlopen(req, timeout=timeout)
+            return transport.urlopen(req, timeout=attempt_timeout)
+        except urllib.error.HTTPError as exc:
+            # 304 Not Modified answers a conditional request; it is not a failure to retry
+            if exc.code == 304:
+                raise
+            last_exc = exc
+            if attempt >= retries:
+                raise
+            delay = backoff * (2**attempt)
+            if exc.code in (429, 503):
+                retry_after = parse_retry_after(exc.headers.get("Retry-After"))
+                if retry_after is not None:
+                    if retry_after > MAX_RETRY_AFTER:
+                        raise
+                    delay = max(delay, retry_after)
+            _emit_retry(attempt, delay, exc)
+            sleep(delay)
+        except RateLimitExceeded:
+            raise
         except Exception as exc:  # noqa: BLE001 - broad catch acceptable for retry wrapper
             last_exc = exc
+            if deadline is not None:
+                # A timeout clamped to the budget is the deadline running out, not a failure
+                deadline.check()
             if attempt < retries:
-                time.sleep(backoff * (2**attempt))
+                _emit_retry(attempt, backoff * (2**attempt), exc)
+                sleep(backoff * (2**attempt))
             else:
                 raise
     # Unreachable, but keeps type-checkers happy
@@ -29,117 +158,585 @@ def _urlopen_with_retry(
     raise RuntimeError("_urlopen_with_retry failed without exception")
 
 
-def get_noaa_xml_current_obs(station_id: str, timeout: int = 10) -> tuple[dict[str, str], str]:
-    """Fetch current observations from legacy NOAA XML endpoint.
+def _emit_retry(attempt: int, delay: float, exc: Exception) -> None:
+    if metrics.BUS.active:
+        metrics.emit(
+            metrics.RetryEvent(
+                *metrics.current_labels(), attempt=attempt + 1, delay=delay, error=repr(exc)
+            )
+        )
 
-    Returns a tuple of (data_dict, icon_url).
+
+def _emit_cache(key: tuple[str, str], result: str) -> None:
+    if metrics.BUS.active:
+        metrics.emit(metrics.CacheEvent("noaa", key[0], result))
+
+
+def _emit_fallback(fallback: str) -> None:
+    if metrics.BUS.active:
+        metrics.emit(metrics.FallbackEvent("noaa", "nws_v3", fallback))
+
+
+class _RecordingReader:
+    """Binary stream wrapper that keeps a copy of everything read through it."""
+
+    def __init__(self, stream: BinaryIO) -> None:
+        self._stream = stream
+        self._chunks: list[bytes] = []
+
+    def read(self, amt: int | None = None) -> bytes:
+        data = self._stream.read() if amt is None else self._stream.read(amt)
+        self._chunks.append(data)
+        return data
+
+    def getvalue(self) -> bytes:
+        return b"".join(self._chunks)
+
+
+def _fetch_cached(
+    key: tuple[str, str],
+    req: urllib.request.Request,
+    timeout: float,
+    parse: Callable[[BinaryIO], T],
+    cache: ObservationCache | None,
+    deadline: Deadline | None = None,
+) -> T:
+    """Fetch and parse ``req``, serving from ``cache`` while fresh.
+
+    Stale entries are revalidated with ``If-None-Match``/``If-Modified-Since``; on a 304 the
+    previously parsed value is reused without downloading or parsing the payload again.
+
+    Network access is guarded by the circuit breaker for the endpoint named by ``key[0]``;
+    :class:`CircuitOpenError` is raised without contacting upstream while it is open.
+    Running out of ``deadline`` is not counted as a failure of the endpoint.
+
+    Requests and cache lookups are reported to :mod:`services.metrics` under provider
+    ``"noaa"`` and endpoint ``key[0]``.
     """
-    weather_data_tags_dict = {
-        "observation_time": "",
-        "weather": "",
-        "temp_f": "",
-        "temp_c": "",
-        "dewpoint_f": "",
-        "dewpoint_c": "",
-        "relative_humidity": "",
-        "wind_string": "",
-        "visibility_mi": "",
-        "pressure_string": "",
-        "pressure_in": "",
-        "location": "",
-    }
-    url_general = "https://www.weather.gov/xml/current_obs/{}.xml"
-    url = url_general.format(station_id)
-    req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
-    with _urlopen_with_retry(req, timeout=timeout) as resp:
-        content = resp.read().decode()
-
-    xml_root = ET.fromstring(content)
-    for key in weather_data_tags_dict:
+    with metrics.labels("noaa", key[0]):
+        return _fetch_cached_labelled(key, req, timeout, parse, cache, deadline)
+
+
+def _fetch_cached_labelled(
+    key: tuple[str, str],
+    req: urllib.request.Request,
+    timeout: float,
+    parse: Callable[[BinaryIO], T],
+    cache: ObservationCache | None,
+    deadline: Deadline | None,
+) -> T:
+    entry = cache.get(key) if cache is not None else None
+    if entry is not None and cache is not None:
+        if cache.is_fresh(entry):
+            _emit_cache(key, "hit")
+            return entry.value
+        for name, header_value in entry.conditional_headers().items():
+            req.add_header(name, header_value)
+    breaker = BREAKERS[key[0]]
+    if not breaker.allow_request():
+        raise CircuitOpenError(f"{key[0]} circuit is open")
+    recorder: _RecordingReader | None = None
+    try:
+        with _urlopen_with_retry(req, timeout=timeout, deadline=deadline) as resp:
+            stream = resp
+            if cache is not None and cache.store is not None:
+                # Keep the raw payload alongside the parsed value in the disk cache
+                stream = recorder = _RecordingReader(resp)
+            value = parse(stream)
+            etag = resp.headers.get("ETag", "")
+            last_modified = resp.headers.get("Last-Modified", "")
+    except urllib.error.HTTPError as exc:
+        # Client errors (unknown station, 304) mean the endpoint itself is healthy
+        if exc.code < 500 and exc.code != 429:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+        if exc.code == 304 and entry is not None and cache is not None:
+            cache.touch(key)
+            _emit_cache(key, "revalidated")
+            return entry.value
+        if cache is not None:
+            _emit_cache(key, "miss")
+        raise
+    except (DeadlineExceeded, RateLimitExceeded):
+        # The caller's budget ran out, or our own limiter held the request back; neither
+        # says anything about the endpoint's health
+        breaker.release_probe()
+        if cache is not None:
+            _emit_cache(key, "miss")
+        raise
+    except Exception:
+        breaker.record_failure()
+        if cache is not None:
+            _emit_cache(key, "miss")
+        raise
+    except BaseException:
+        breaker.release_probe()
+        raise
+    breaker.record_success()
+    if cache is not None:
+        _emit_cache(key, "miss")
+        payload = recorder.getvalue() if recorder is not None else None
+        cache.put(key, value, etag=etag, last_modified=last_modified, payload=payload)
+    return value
+
+
+def _parse_noaa_xml(stream: BinaryIO, station_id: str) -> Observation:
+    xml_root = ET.fromstring(stream.read())
+    tags: dict[str, str] = {}
+    for key in _XML_TAGS:
         node = xml_root.find(key)
-        weather_data_tags_dict[key] = node.text if node is not None else ""
+        if node is not None:
+            tags[key] = node.text or ""
+    return Observation.from_noaa_xml(tags, station_id)
 
-    icon_url_base = (
-        xml_root.find("icon_url_base").text if xml_root.find("icon_url_base") is not None else ""
-    )
-    icon_url_name = (
-        xml_root.find("icon_url_name").text if xml_root.find("icon_url_name") is not None else ""
-    )
-    icon_url = f"{icon_url_base}{icon_url_name}"
-    return weather_data_tags_dict, icon_url
 
+def _xml_request(station_id: str) -> urllib.request.Request:
+    url = f"{NOAA_BASE}/xml/current_obs/{station_id}.xml"
+    return urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
 
-def try_get_nws_v3_latest_observation(station_id: str, timeout: int = 10) -> dict[str, str] | None:
-    """Attempt to fetch latest observation via NWS v3 JSON API.
 
-    Returns a normalized dict on success, or None on failure (caller may fallback to XML).
-    """
-    api_url = f"https://api.weather.gov/stations/{station_id}/observations/latest"
-    req = urllib.request.Request(
+def _nws_v3_request(station_id: str) -> urllib.request.Request:
+    api_url = f"{NWS_API_BASE}/stations/{station_id}/observations/latest"
+    return urllib.request.Request(
         api_url,
         headers={
             "User-Agent": USER_AGENT,
             "Accept": "application/ld+json",
         },
     )
+
+
+def fetch_noaa_xml_observation(
+    station_id: str,
+    timeout: float = 10,
+    cache: ObservationCache | None = OBS_CACHE,
+    deadline: Deadline | None = None,
+) -> Observation:
+    """Fetch an :class:`Observation` from the legacy NOAA XML endpoint.
+
+    Results are served from ``cache`` while fresh and revalidated conditionally once stale;
+    pass ``cache=None`` to always download.
+    """
+    return _fetch_cached(
+        ("xml", station_id),
+        _xml_request(station_id),
+        timeout,
+        lambda stream: _parse_noaa_xml(stream, station_id),
+        cache,
+        deadline,
+    )
+
+
+def get_noaa_xml_current_obs(
+    station_id: str,
+    timeout: float = 10,
+    cache: ObservationCache | None = OBS_CACHE,
+    deadline: Deadline | None = None,
+) -> tuple[dict[str, str], str]:
+    """Fetch current observations from legacy NOAA XML endpoint.
+
+    Returns a tuple of (data_dict, icon_url).
+    """
+    obs = fetch_noaa_xml_observation(station_id, timeout=timeout, cache=cache, deadline=deadline)
+    return obs.to_dict(), obs.icon_url
+
+
+def fetch_nws_v3_observation(
+    station_id: str,
+    timeout: float = 10,
+    cache: ObservationCache | None = OBS_CACHE,
+    deadline: Deadline | None = None,
+) -> Observation:
+    """Fetch the latest :class:`Observation` via the NWS v3 JSON API.
+
+    Raises on failure. Results are cached like :func:`fetch_noaa_xml_observation`.
+    """
+    return _fetch_cached(
+        ("nws_v3", station_id),
+        _nws_v3_request(station_id),
+        timeout,
+        lambda stream: Observation.from_nws_v3(json.load(stream), station_id),
+        cache,
+        deadline,
+    )
+
+
+def _try_nws_v3(
+    station_id: str,
+    timeout: float = 10,
+    cache: ObservationCache | None = OBS_CACHE,
+    deadline: Deadline | None = None,
+) -> Observation | None:
     try:
-        with _urlopen_with_retry(req, timeout=timeout) as resp:
-            data = json.loads(resp.read().decode())
+        return fetch_nws_v3_observation(station_id, timeout=timeout, cache=cache, deadline=deadline)
     except Exception:
         return None
 
-    props = data.get("properties", {})
 
-    # Conversions and safe extraction helpers
-    def _get_num(dct: dict, key: str) -> float:
-        val = (dct.get(key) or {}).get("value") if isinstance(dct, dict) else None
-        try:
-            return float(val) if val is not None else 0.0
-        except Exception:
-            return 0.0
-
-    wind_speed_m_s = _get_num(props, "windSpeed")
-    wind_dir_deg = _get_num(props, "windDirection")
-    vis_m = _get_num(props, "visibility")
-    pressure_pa = _get_num(props, "barometricPressure") or _get_num(props, "seaLevelPressure")
-
-    wind_mph = wind_speed_m_s * 2.23693629
-    vis_miles = vis_m * 0.000621371 if vis_m else 0.0
-    pressure_inhg = pressure_pa * 0.0002953 if pressure_pa else 0.0
-    pressure_hpa = pressure_pa / 100.0 if pressure_pa else 0.0
-
-    out: dict[str, str] = {
-        "observation_time": props.get("timestamp", ""),
-        "weather": (props.get("textDescription") or ""),
-        "temp_f": str(
-            round(((props.get("temperature", {}) or {}).get("value") or 0) * 9 / 5 + 32, 1)
-        ),
-        "temp_c": str(round(((props.get("temperature", {}) or {}).get("value") or 0), 1)),
-        "dewpoint_f": str(
-            round(((props.get("dewpoint", {}) or {}).get("value") or 0) * 9 / 5 + 32, 1)
-        ),
-        "dewpoint_c": str(round(((props.get("dewpoint", {}) or {}).get("value") or 0), 1)),
-        "relative_humidity": str(
-            round(((props.get("relativeHumidity", {}) or {}).get("value") or 0), 1)
-        ),
-        "wind_string": (
-            f"{int(round(wind_dir_deg))} degrees at {wind_mph:.1f} MPH" if wind_mph else ""
-        ),
-        "visibility_mi": f"{vis_miles:.2f}" if vis_miles else "",
-        "pressure_string": f"{pressure_hpa:.1f} hPa" if pressure_hpa else "",
-        "pressure_in": f"{pressure_inhg:.2f}" if pressure_inhg else "",
-        "location": station_id,
-    }
-    return out
-
-
-def get_noaa_current_obs(station_id: str, timeout: int = 10) -> tuple[dict[str, str], str]:
+def try_get_nws_v3_latest_observation(
+    station_id: str,
+    timeout: float = 10,
+    cache: ObservationCache | None = OBS_CACHE,
+    deadline: Deadline | None = None,
+) -> dict[str, str] | None:
+    """Attempt to fetch latest observation via NWS v3 JSON API.
+
+    Returns a normalized dict on success, or None on failure (caller may fallback to XML).
+    """
+    obs = _try_nws_v3(station_id, timeout=timeout, cache=cache, deadline=deadline)
+    return obs.to_dict() if obs is not None else None
+
+
+def get_observation(
+    station_id: str,
+    timeout: float = 10,
+    cache: ObservationCache | None = OBS_CACHE,
+    deadline: float | Deadline | None = None,
+    hedge_after: float | None = None,
+) -> Observation:
+    """Fetch an :class:`Observation`, preferring NWS v3 JSON and falling back to legacy XML.
+
+    ``deadline`` (seconds or a :class:`Deadline`) bounds the whole call: JSON attempts,
+    backoff and the XML fallback all draw from one budget, and :class:`DeadlineExceeded` is
+    raised once it is spent. Pass a :class:`Deadline` to read per-stage usage from its
+    ``stages`` afterwards.
+
+    While the NWS v3 circuit breaker is open the JSON request is skipped entirely (see
+    :func:`breaker_states`).
+
+    With ``hedge_after`` (seconds, e.g. the observed p95 JSON latency) the XML request is
+    started in parallel once the JSON request has been outstanding that long, and whichever
+    valid response arrives first wins; the slower request is ignored.
+
+    Concurrent lookups of the same station with the same ``cache``, ``timeout`` and
+    ``hedge_after`` are coalesced into one upstream request (see :data:`FLIGHTS`); callers
+    that join an in-flight lookup share its result or exception, and wait no longer than
+    their own ``deadline``. Lookups with ``cache=None`` ask for a fresh fetch and are never
+    coalesced.
+    """
+    if isinstance(deadline, int | float):
+        deadline = Deadline(deadline)
+    budget = deadline
+    if cache is None:
+        return _get_observation(station_id, timeout, cache, budget, hedge_after)
+    return FLIGHTS.do(
+        ("noaa", station_id, cache, timeout, hedge_after),
+        lambda: _get_observation(station_id, timeout, cache, budget, hedge_after),
+        deadline=deadline,
+    )
+
+
+def _get_observation(
+    station_id: str,
+    timeout: float,
+    cache: ObservationCache | None,
+    deadline: Deadline | None,
+    hedge_after: float | None,
+) -> Observation:
+    if hedge_after is not None:
+        return _get_observation_hedged(station_id, timeout, cache, deadline, hedge_after)
+    if deadline is None:
+        json_obs = _try_nws_v3(station_id, timeout=timeout, cache=cache)
+        if json_obs is not None:
+            return json_obs
+        _emit_fallback("xml")
+        return fetch_noaa_xml_observation(station_id, timeout=timeout, cache=cache)
+
+    with deadline.stage("nws_v3"):
+        json_obs = _try_nws_v3(station_id, timeout=timeout, cache=cache, deadline=deadline)
+    if json_obs is not None:
+        return json_obs
+    _emit_fallback("xml")
+    with deadline.stage("xml"):
+        return fetch_noaa_xml_observation(
+            station_id, timeout=timeout, cache=cache, deadline=deadline
+        )
+
+
+def get_noaa_current_obs(
+    station_id: str,
+    timeout: float = 10,
+    cache: ObservationCache | None = OBS_CACHE,
+    deadline: float | Deadline | None = None,
+    hedge_after: float | None = None,
+) -> tuple[dict[str, str], str]:
     """Prefer NWS v3 JSON; fall back to legacy XML.
 
     Returns a tuple of (data_dict, icon_url). NWS v3 does not provide an icon URL; in that
-    case the icon_url will be an empty string.
+    case the icon_url will be an empty string. See :func:`get_observation` for the
+    ``deadline`` and ``hedge_after`` options.
     """
-    json_obs = try_get_nws_v3_latest_observation(station_id, timeout=timeout)
-    if json_obs is not None:
-        return json_obs, ""
-    return get_noaa_xml_current_obs(station_id, timeout=timeout)
+    obs = get_observation(
+        station_id, timeout=timeout, cache=cache, deadline=deadline, hedge_after=hedge_after
+    )
+    return obs.to_dict(), obs.icon_url
+
+
+def breaker_states() -> dict[str, dict[str, object]]:
+    """Return a snapshot of the per-endpoint circuit breakers, e.g. for alerting."""
+    return {name: breaker.snapshot() for name, breaker in BREAKERS.items()}
+
+
+def _get_observation_hedged(
+    station_id: str,
+    timeout: float,
+    cache: ObservationCache | None,
+    deadline: Deadline | None,
+    hedge_after: float,
+) -> Observation:
+    def staged(name: str, fn: Callable[..., T]) -> T:
+        if deadline is None:
+            return fn(station_id, timeout=timeout, cache=cache)
+        with deadline.stage(name):
+            return fn(station_id, timeout=timeout, cache=cache, deadline=deadline)
+
+    executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="noaa-hedge")
+    try:
+        json_fut = executor.submit(staged, "nws_v3", _try_nws_v3)
+        wait([json_fut], timeout=hedge_after)
+        if json_fut.done():
+            json_obs = json_fut.result()
+            if json_obs is not None:
+                return json_obs
+        xml_fut = executor.submit(staged, "xml", fetch_noaa_xml_observation)
+
+        pending: set[Future[Any]] = {json_fut, xml_fut}
+        xml_exc: BaseException | None = None
+        while pending:
+            remaining = deadline.remaining() if deadline is not None else None
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done and deadline is not None:
+                deadline.check()
+            for fut in done:
+                if fut is json_fut:
+                    json_obs = fut.result()
+                    if json_obs is not None:
+                        return json_obs
+                elif fut.exception() is None:
+                    _emit_fallback("xml_hedge")
+                    return fut.result()
+                else:
+                    xml_exc = fut.exception()
+        assert xml_exc is not None
+        raise xml_exc
+    finally:
+        # Do not wait for the losing request; its result (if any) still warms the cache.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+class StationResult(NamedTuple):
+    """Outcome for one station of a batch fetch; ``error`` is set when the fetch failed."""
+
+    station_id: str
+    data: dict[str, str] | None
+    icon_url: str
+    error: Exception | None
+
+
+def get_noaa_current_obs_many(
+    station_ids: Iterable[str],
+    timeout: float = 10,
+    max_workers: int = 8,
+    deadline: float | None = None,
+) -> Iterator[StationResult]:
+    """Fetch current observations for many stations concurrently.
+
+    Stations are fetched by a pool of at most ``max_workers`` threads and results are yielded
+    in completion order. A failing station yields a result carrying its exception instead of
+    aborting the batch. Closing the generator early cancels stations that have not started.
+    ``deadline`` gives each station its own end-to-end budget in seconds.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="noaa") as pool:
+        futures = {
+            pool.submit(get_noaa_current_obs, sid, timeout, deadline=deadline): sid
+            for sid in station_ids
+        }
+        try:
+            for fut in as_completed(futures):
+                sid = futures[fut]
+                try:
+                    data, icon_url = fut.result()
+                except Exception as exc:  # noqa: BLE001 - reported per station
+                    yield StationResult(sid, None, "", exc)
+                else:
+                    yield StationResult(sid, data, icon_url, None)
+        finally:
+            for fut in futures:
+                fut.cancel()
+
+
+def _history_url(station_id: str, start: int, end: int, limit: int) -> str:
+    def iso(seconds: int) -> str:
+        return datetime.fromtimestamp(seconds, UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    query = urllib.parse.urlencode({"start": iso(start), "end": iso(end), "limit": limit})
+    return f"{NWS_API_BASE}/stations/{station_id}/observations?{query}"
+
+
+def iter_history_pages(
+    station_id: str,
+    start: int,
+    end: int,
+    timeout: float = 10,
+    limit: int = HISTORY_PAGE_LIMIT,
+) -> Iterator[list[dict]]:
+    """Yield pages of observation features for ``station_id`` between two Unix times.
+
+    Follows the collection's ``pagination.next`` links until a page comes back empty. Requests
+    are retried like the other NWS calls and honour the ``nws_v3`` circuit breaker.
+    """
+    return _iter_nws_pages(_history_url(station_id, start, end, limit), "history", timeout)
+
+
+def iter_station_pages(
+    state: str, timeout: float = 10, limit: int = STATIONS_PAGE_LIMIT
+) -> Iterator[list[dict]]:
+    """Yield pages of the NWS station features in ``state`` (a two-letter code).
+
+    Paged, retried and circuit-broken like :func:`iter_history_pages`.
+    """
+    query = urllib.parse.urlencode({"state": state.upper(), "limit": limit})
+    return _iter_nws_pages(f"{NWS_API_BASE}/stations?{query}", "stations", timeout)
+
+
+def _iter_nws_pages(url: str | None, endpoint: str, timeout: float) -> Iterator[list[dict]]:
+    seen: set[str] = set()
+    breaker = BREAKERS["nws_v3"]
+    while url and url not in seen:
+        seen.add(url)
+        if not breaker.allow_request():
+            raise CircuitOpenError("nws_v3 circuit is open")
+        req = urllib.request.Request(
+            url, headers={"User-Agent": USER_AGENT, "Accept": "application/geo+json"}
+        )
+        try:
+            with metrics.labels("noaa", endpoint), _urlopen_with_retry(req, timeout) as resp:
+                document = json.load(resp)
+        except urllib.error.HTTPError as exc:
+            if exc.code < 500 and exc.code != 429:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+            raise
+        except RateLimitExceeded:
+            breaker.release_probe()
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.release_probe()
+            raise
+        breaker.record_success()
+        features = document.get("features") or []
+        if not features:
+            return
+        yield features
+        url = (document.get("pagination") or {}).get("next")
+
+
+def _history_rows(features: Iterable[dict], start: int, end: int) -> tuple[array, dict]:
+    """Columns for the features timestamped in ``[start, end)``, ascending and de-duplicated."""
+    by_time: dict[int, dict] = {}
+    for feature in features:
+        props = feature.get("properties") or {}
+        stamp = props.get("timestamp")
+        if stamp:
+            seconds = int(datetime.fromisoformat(stamp).timestamp())
+            if start <= seconds < end:
+                by_time[seconds] = props
+    times = sorted(by_time)
+    columns = {}
+    for column, field in HISTORY_FIELDS.items():
+        values = (_nws_value(by_time[t], field) for t in times)
+        columns[column] = array("d", [math.nan if v is None else v for v in values])
+    return array("q", times), columns
+
+
+def backfill_station(
+    store: HistoryStore,
+    station_id: str,
+    start: datetime,
+    end: datetime | None = None,
+    timeout: float = 10,
+    window: timedelta = HISTORY_WINDOW,
+) -> int:
+    """Fetch ``station_id``'s observations from ``start`` to ``end`` (now) into ``store``.
+
+    The range is fetched one ``window`` at a time, oldest first, and each window is appended
+    as soon as it arrives. The store is append-only, so the range begins after the station's
+    :meth:`~services.history.HistoryStore.high_water` mark when that is later than
+    ``start``; re-running a backfill therefore resumes where it stopped. Returns the number
+    of rows added.
+    """
+    begin = int(start.timestamp())
+    stop = int((end or datetime.now(UTC)).timestamp())
+    newest = store.high_water(station_id)
+    if newest is not None:
+        begin = max(begin, newest + 1)
+    step = max(1, int(window.total_seconds()))
+    added = 0
+    for lo in range(begin, stop, step):
+        hi = min(lo + step, stop)
+        pages = iter_history_pages(station_id, lo, hi, timeout)
+        times, columns = _history_rows((f for page in pages for f in page), lo, hi)
+        added += store.append(station_id, times, columns)
+    return added
+
+
+def sync_station(
+    store: HistoryStore,
+    station_id: str,
+    timeout: float = 10,
+    lookback: timedelta = HISTORY_LOOKBACK,
+) -> int:
+    """Fetch only the observations newer than the newest one ``store`` holds for the station.
+
+    A station with no stored history starts ``lookback`` ago. Returns the rows added.
+    """
+    now = datetime.now(UTC)
+    return backfill_station(store, station_id, now - lookback, now, timeout)
+
+
+class SyncResult(NamedTuple):
+    """Outcome for one station of :func:`sync_stations`; ``error`` is set when it failed."""
+
+    station_id: str
+    rows: int
+    error: Exception | None
+
+
+def sync_stations(
+    store: HistoryStore,
+    station_ids: Iterable[str],
+    start: datetime | None = None,
+    end: datetime | None = None,
+    timeout: float = 10,
+    max_workers: int = 4,
+) -> Iterator[SyncResult]:
+    """Backfill (from ``start``) or incrementally sync many stations concurrently.
+
+    At most ``max_workers`` stations are in flight, each holding one window of rows, so memory
+    stays bounded however many stations or days are requested. Results are yielded as
+    stations finish; a failing station reports its error, and the rows it already appended
+    are kept, so the next sync resumes after them.
+    """
+
+    def run(station_id: str) -> int:
+        if start is None:
+            return sync_station(store, station_id, timeout)
+        return backfill_station(store, station_id, start, end, timeout)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="noaa-history") as pool:
+        futures = {pool.submit(run, sid): sid for sid in dict.fromkeys(station_ids)}
+        try:
+            for fut in as_completed(futures):
+                sid = futures[fut]
+                try:
+                    yield SyncResult(sid, fut.result(), None)
+                except Exception as exc:  # noqa: BLE001 - reported per station
+                    yield SyncResult(sid, 0, exc)
+        finally:
+            for fut in futures:
+                fut.cancel()
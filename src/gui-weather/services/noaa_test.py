@@ -0,0 +1,250 @@
+"""Tests for the NOAA/NWS service helpers (network access is monkeypatched out)."""
+
+import io
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from services import noaa
+from services.breaker import HALF_OPEN, CircuitBreaker
+from services.cache import ObservationCache
+from services.deadline import Deadline, DeadlineExceeded
+from services.observation import Observation
+from services.ratelimit import RateLimitExceeded
+from services.singleflight import SingleFlight
+
+FIXTURES = Path(__file__).resolve().parents[1] / "fixtures"
+
+
+@pytest.fixture(autouse=True)
+def closed_breakers():
+    for breaker in noaa.BREAKERS.values():
+        breaker.reset()
+
+
+def test_get_noaa_current_obs_many_reports_errors_per_station(monkeypatch):
+    def fake_obs(station_id, timeout=10, **kwargs):
+        if station_id == "BAD":
+            raise OSError("boom")
+        return {"location": station_id}, ""
+
+    monkeypatch.setattr(noaa, "get_noaa_current_obs", fake_obs)
+    results = {r.station_id: r for r in noaa.get_noaa_current_obs_many(["KLAX", "BAD", "KDEN"])}
+
+    assert set(results) == {"KLAX", "BAD", "KDEN"}
+    assert results["KLAX"].data == {"location": "KLAX"}
+    assert results["KDEN"].error is None
+    assert isinstance(results["BAD"].error, OSError)
+    assert results["BAD"].data is None
+
+
+def test_stale_observation_is_revalidated_and_reused_on_304(monkeypatch, fake_response):
+    payload = b'{"properties": {"temperature": {"value": 20}, "timestamp": "t1"}}'
+    seen_headers = []
+
+    def fake_urlopen(req, timeout, **kwargs):
+        seen_headers.append(dict(req.header_items()))
+        if len(seen_headers) == 1:
+            return fake_response(payload, {"ETag": '"v1"'})
+        raise urllib.error.HTTPError(req.full_url, 304, "Not Modified", {}, None)
+
+    monkeypatch.setattr(noaa, "_urlopen_with_retry", fake_urlopen)
+    cache = ObservationCache(ttl=0)
+
+    first = noaa.try_get_nws_v3_latest_observation("KLAX", cache=cache)
+    second = noaa.try_get_nws_v3_latest_observation("KLAX", cache=cache)
+
+    assert first == second
+    assert first["temp_c"] == "20.0"
+    assert seen_headers[1]["If-none-match"] == '"v1"'
+
+
+def test_deadline_bounds_retries_and_fallback(monkeypatch):
+    def failing_urlopen(req, timeout):
+        raise OSError("unreachable")
+
+    monkeypatch.setattr(noaa.transport, "urlopen", failing_urlopen)
+    deadline = Deadline(0.3)
+    start = time.monotonic()
+
+    with pytest.raises(DeadlineExceeded) as excinfo:
+        noaa.get_noaa_current_obs("KLAX", cache=None, deadline=deadline)
+
+    # Without a deadline this would back off for 1.5s per endpoint before giving up
+    assert time.monotonic() - start < 0.3
+    assert "nws_v3" in excinfo.value.stages
+    assert set(deadline.stages) == {"nws_v3", "xml"}
+
+
+def test_running_out_of_deadline_does_not_trip_the_breaker(monkeypatch, clock):
+    def timing_out_urlopen(req, timeout):
+        clock.now += timeout
+        raise TimeoutError("timed out")
+
+    monkeypatch.setattr(noaa.transport, "urlopen", timing_out_urlopen)
+    deadline = Deadline(2.0, clock=clock)
+
+    with pytest.raises(DeadlineExceeded):
+        noaa.fetch_noaa_xml_observation("KLAX", cache=None, deadline=deadline)
+
+    assert noaa.BREAKERS["xml"].snapshot()["consecutive_failures"] == 0
+
+
+def test_half_open_probe_that_runs_out_of_deadline_is_released(monkeypatch, clock):
+    breaker = CircuitBreaker("nws_v3", failure_threshold=1, reset_timeout=60, clock=clock)
+    monkeypatch.setitem(noaa.BREAKERS, "nws_v3", breaker)
+    breaker.record_failure()
+    clock.now = 60
+
+    def timing_out_urlopen(req, timeout):
+        clock.now += timeout
+        raise TimeoutError("timed out")
+
+    monkeypatch.setattr(noaa.transport, "urlopen", timing_out_urlopen)
+    with pytest.raises(DeadlineExceeded):
+        noaa.fetch_nws_v3_observation("KLAX", cache=None, deadline=Deadline(2.0, clock=clock))
+
+    clock.now += 1000
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()  # the next request probes instead of being refused
+
+
+def test_local_rate_limit_is_not_retried_or_counted_against_the_breaker(monkeypatch):
+    attempts = []
+
+    def rate_limited_urlopen(req, timeout):
+        attempts.append(req.full_url)
+        raise RateLimitExceeded("rate limit for api.weather.gov leaves no slot within 10s")
+
+    monkeypatch.setattr(noaa.transport, "urlopen", rate_limited_urlopen)
+    monkeypatch.setattr(noaa.time, "sleep", lambda seconds: pytest.fail("backed off"))
+
+    with pytest.raises(RateLimitExceeded):
+        noaa.fetch_nws_v3_observation("KLAX", cache=None)
+
+    assert len(attempts) == 1
+    assert noaa.BREAKERS["nws_v3"].snapshot()["consecutive_failures"] == 0
+
+
+def test_uncached_lookups_are_not_coalesced(monkeypatch):
+    flights = SingleFlight()
+    monkeypatch.setattr(noaa, "FLIGHTS", flights)
+    monkeypatch.setattr(
+        noaa, "_try_nws_v3", lambda station_id, timeout, cache: Observation(station_id)
+    )
+
+    assert noaa.get_observation("KLAX", cache=None) == Observation("KLAX")
+    noaa.get_observation("KLAX", cache=ObservationCache())
+    assert flights.stats()["executed"] == 1
+
+
+def test_hedged_request_returns_xml_when_json_is_slow(monkeypatch):
+    def slow_json(station_id, **kwargs):
+        time.sleep(1)
+        return Observation(station_id, location="json")
+
+    def fast_xml(station_id, **kwargs):
+        return Observation(station_id, location="xml", icon_url="icon.png")
+
+    monkeypatch.setattr(noaa, "_try_nws_v3", slow_json)
+    monkeypatch.setattr(noaa, "fetch_noaa_xml_observation", fast_xml)
+    start = time.monotonic()
+
+    data, icon_url = noaa.get_noaa_current_obs("KLAX", hedge_after=0.05)
+
+    assert time.monotonic() - start < 0.5
+    assert (data["location"], icon_url) == ("xml", "icon.png")
+
+
+def test_open_json_circuit_goes_straight_to_xml(monkeypatch, fake_response):
+    requested = []
+
+    def fake_urlopen(req, timeout, **kwargs):
+        requested.append(req.full_url)
+        body = b"<current_observation><location>LA</location></current_observation>"
+        return fake_response(body)
+
+    monkeypatch.setattr(noaa, "_urlopen_with_retry", fake_urlopen)
+    for _ in range(noaa.BREAKERS["nws_v3"].failure_threshold):
+        noaa.BREAKERS["nws_v3"].record_failure()
+
+    data, _icon_url = noaa.get_noaa_current_obs("KLAX", cache=None)
+
+    assert data["location"] == "LA"
+    assert requested == ["https://www.weather.gov/xml/current_obs/KLAX.xml"]
+    assert noaa.breaker_states()["nws_v3"]["state"] == "open"
+
+
+def test_xml_parser_reads_only_top_level_tags():
+    with open(FIXTURES / "current_obs" / "KLAX.xml", "rb") as stream:
+        obs = noaa._parse_noaa_xml(stream, "KLAX")
+
+    assert obs.to_dict() == {
+        "observation_time": "Last Updated on Aug 13 2020, 9:53 am PDT",
+        "weather": "Fair",
+        "temp_f": "72.0",
+        "temp_c": "22.2",
+        "dewpoint_f": "59.0",
+        "dewpoint_c": "15.0",
+        "relative_humidity": "65",
+        "wind_string": "West at 8.1 MPH (7 KT)",
+        "visibility_mi": "10.00",
+        "pressure_string": "1013.4 mb",
+        "pressure_in": "29.93",
+        "location": "Los Angeles, Los Angeles International Airport, CA",
+    }
+    assert obs.location == "Los Angeles, Los Angeles International Airport, CA"
+    assert obs.temperature_c == 22.2
+    assert obs.wind_direction_deg == 260
+    assert round(obs.wind_mph, 1) == 8.1
+    assert obs.pressure_pa == 101340
+    assert obs.icon_url == "https://forecast.weather.gov/images/wtf/small/skc.png"
+
+
+def test_retry_waits_for_retry_after_on_throttling(monkeypatch, fake_response):
+    slept = []
+    responses = [
+        urllib.error.HTTPError("u", 429, "Too Many Requests", {"Retry-After": "3"}, None),
+        fake_response(b"{}"),
+    ]
+
+    def fake_urlopen(req, timeout):
+        result = responses.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(noaa.transport, "urlopen", fake_urlopen)
+    monkeypatch.setattr(noaa.time, "sleep", slept.append)
+
+    noaa._urlopen_with_retry(urllib.request.Request("https://api.weather.gov/"), timeout=1)
+
+    assert slept == [3]
+
+
+def test_missing_xml_tags_stay_empty_strings():
+    document = b"<current_observation><wind_string>Calm</wind_string></current_observation>"
+    data = noaa._parse_noaa_xml(io.BytesIO(document), "KXYZ").to_dict()
+
+    assert data["wind_string"] == "Calm"
+    assert data["temp_f"] == data["temp_c"] == data["relative_humidity"] == ""
+
+
+def test_history_wind_columns_are_converted_from_km_h():
+    props = {
+        "timestamp": "2020-08-13T16:53:00+00:00",
+        "windSpeed": {"unitCode": "wmoUnit:km_h-1", "value": 36.0},
+        "windGust": {"unitCode": "wmoUnit:km_h-1", "value": 54.0},
+        "temperature": {"unitCode": "wmoUnit:degC", "value": 22.2},
+    }
+    stamp = 1597337580
+
+    times, columns = noaa._history_rows([{"properties": props}], stamp, stamp + 1)
+
+    assert list(times) == [stamp]
+    assert columns["wind_speed_m_s"][0] == pytest.approx(10.0)
+    assert columns["wind_gust_m_s"][0] == pytest.approx(15.0)
+    assert columns["temperature_c"][0] == 22.2
@@ -0,0 +1,211 @@
+"""Typed, compact weather observation record shared by the NOAA/NWS parsers."""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import Any
+
+MPH_PER_M_S = 2.23693629
+MILES_PER_METER = 0.000621371
+INHG_PER_PA = 0.0002953
+
+# Keys of the legacy ``dict[str, str]`` (also the legacy XML tags that carry them)
+LEGACY_KEYS = (
+    "observation_time",
+    "weather",
+    "temp_f",
+    "temp_c",
+    "dewpoint_f",
+    "dewpoint_c",
+    "relative_humidity",
+    "wind_string",
+    "visibility_mi",
+    "pressure_string",
+    "pressure_in",
+    "location",
+)
+
+
+def _float_or_none(value: Any) -> float | None:
+    try:
+        return float(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+# Scale from the ``unitCode`` of an NWS v3 quantitative value to the SI unit Observation keeps;
+# wind speeds are usually served in km/h. Codes not listed (degC, Pa, m, ...) are already SI.
+NWS_UNIT_SCALE = {
+    "wmoUnit:km_h-1": 1 / 3.6,
+    "wmoUnit:kn": 1852 / 3600,
+    "wmoUnit:hPa": 100.0,
+    "wmoUnit:km": 1000.0,
+}
+
+
+def _nws_value(props: dict, key: str) -> float | None:
+    """Extract ``props[key]["value"]`` from an NWS v3 quantitative value, converted to SI."""
+    quantity = props.get(key)
+    if not isinstance(quantity, dict):
+        return None
+    value = _float_or_none(quantity.get("value"))
+    if value is None:
+        return None
+    return value * NWS_UNIT_SCALE.get(quantity.get("unitCode") or "", 1.0)
+
+
+@dataclass(frozen=True, slots=True)
+class Observation:
+    """A single station observation with numbers kept raw, in SI units.
+
+    Missing measurements are ``None``. Derived units are computed on access, and display
+    strings are only produced by :meth:`to_dict`, which yields the legacy ``dict[str, str]``
+    shape consumed by ``weather_app.populate_gui`` and ``create_html_report``.
+
+    ``wind_string`` (``"West at 8.1 MPH (7 KT)"``) and ``pressure_string`` (``"1013.4 mb"``)
+    are the texts the legacy XML feed formats itself, which the numbers cannot reproduce;
+    they are ``None`` for NWS v3 observations. When set, :meth:`to_dict` formats the other
+    values the way that feed does, with ``""`` for missing ones. Every field is an immutable
+    scalar, so observations are hashable.
+    """
+
+    station_id: str
+    observation_time: str = ""
+    weather: str = ""
+    location: str = ""
+    temperature_c: float | None = None
+    dewpoint_c: float | None = None
+    relative_humidity: float | None = None
+    wind_speed_m_s: float | None = None
+    wind_direction_deg: float | None = None
+    visibility_m: float | None = None
+    pressure_pa: float | None = None
+    icon_url: str = ""
+    wind_string: str | None = None
+    pressure_string: str | None = None
+
+    @classmethod
+    def from_nws_v3(cls, data: dict, station_id: str) -> Observation:
+        """Build from an NWS v3 ``observations/latest`` JSON document."""
+        props = data.get("properties", {}) or {}
+        return cls(
+            station_id=station_id,
+            observation_time=props.get("timestamp") or "",
+            weather=props.get("textDescription") or "",
+            location=station_id,
+            temperature_c=_nws_value(props, "temperature"),
+            dewpoint_c=_nws_value(props, "dewpoint"),
+            relative_humidity=_nws_value(props, "relativeHumidity"),
+            wind_speed_m_s=_nws_value(props, "windSpeed"),
+            wind_direction_deg=_nws_value(props, "windDirection"),
+            visibility_m=_nws_value(props, "visibility"),
+            pressure_pa=(
+                _nws_value(props, "barometricPressure") or _nws_value(props, "seaLevelPressure")
+            ),
+        )
+
+    @classmethod
+    def from_noaa_xml(cls, tags: dict[str, str], station_id: str) -> Observation:
+        """Build from the top-level tag texts of a legacy current_obs XML document."""
+        wind_mph = _float_or_none(tags.get("wind_mph"))
+        visibility_mi = _float_or_none(tags.get("visibility_mi"))
+        pressure_mb = _float_or_none(tags.get("pressure_mb"))
+        return cls(
+            station_id=station_id,
+            observation_time=tags.get("observation_time", ""),
+            weather=tags.get("weather", ""),
+            location=tags.get("location", ""),
+            temperature_c=_float_or_none(tags.get("temp_c")),
+            dewpoint_c=_float_or_none(tags.get("dewpoint_c")),
+            relative_humidity=_float_or_none(tags.get("relative_humidity")),
+            wind_speed_m_s=None if wind_mph is None else wind_mph / MPH_PER_M_S,
+            wind_direction_deg=_float_or_none(tags.get("wind_degrees")),
+            visibility_m=None if visibility_mi is None else visibility_mi / MILES_PER_METER,
+            pressure_pa=None if pressure_mb is None else pressure_mb * 100.0,
+            icon_url=f"{tags.get('icon_url_base', '')}{tags.get('icon_url_name', '')}",
+            wind_string=tags.get("wind_string", ""),
+            pressure_string=tags.get("pressure_string", ""),
+        )
+
+    @classmethod
+    def from_record(cls, record: dict[str, Any]) -> Observation:
+        """Inverse of :meth:`to_record`."""
+        return cls(**record)
+
+    def to_record(self) -> dict[str, Any]:
+        """Return the raw fields as a JSON-serializable dict (used by the disk cache)."""
+        return asdict(self)
+
+    @property
+    def temperature_f(self) -> float | None:
+        return None if self.temperature_c is None else self.temperature_c * 9 / 5 + 32
+
+    @property
+    def dewpoint_f(self) -> float | None:
+        return None if self.dewpoint_c is None else self.dewpoint_c * 9 / 5 + 32
+
+    @property
+    def wind_mph(self) -> float | None:
+        return None if self.wind_speed_m_s is None else self.wind_speed_m_s * MPH_PER_M_S
+
+    @property
+    def visibility_mi(self) -> float | None:
+        return None if self.visibility_m is None else self.visibility_m * MILES_PER_METER
+
+    @property
+    def pressure_hpa(self) -> float | None:
+        return None if self.pressure_pa is None else self.pressure_pa / 100.0
+
+    @property
+    def pressure_inhg(self) -> float | None:
+        return None if self.pressure_pa is None else self.pressure_pa * INHG_PER_PA
+
+    def to_dict(self) -> dict[str, str]:
+        """Format as the legacy ``dict[str, str]`` returned by ``get_noaa_current_obs``."""
+        if self.wind_string is not None:
+            return self._feed_dict()
+        temp_c = self.temperature_c or 0
+        dewpoint_c = self.dewpoint_c or 0
+        wind_mph = self.wind_mph or 0.0
+        vis_miles = self.visibility_mi or 0.0
+        pressure_hpa = self.pressure_hpa or 0.0
+        pressure_inhg = self.pressure_inhg or 0.0
+        return {
+            "observation_time": self.observation_time,
+            "weather": self.weather,
+            "temp_f": str(round(temp_c * 9 / 5 + 32, 1)),
+            "temp_c": str(round(temp_c, 1)),
+            "dewpoint_f": str(round(dewpoint_c * 9 / 5 + 32, 1)),
+            "dewpoint_c": str(round(dewpoint_c, 1)),
+            "relative_humidity": str(round(self.relative_humidity or 0, 1)),
+            "wind_string": (
+                f"{int(round(self.wind_direction_deg or 0))} degrees at {wind_mph:.1f} MPH"
+                if wind_mph
+                else ""
+            ),
+            "visibility_mi": f"{vis_miles:.2f}" if vis_miles else "",
+            "pressure_string": f"{pressure_hpa:.1f} hPa" if pressure_hpa else "",
+            "pressure_in": f"{pressure_inhg:.2f}" if pressure_inhg else "",
+            "location": self.location,
+        }
+
+    def _feed_dict(self) -> dict[str, str]:
+        """The legacy dict as the XML feed formats it (see the class docstring)."""
+        return {
+            "observation_time": self.observation_time,
+            "weather": self.weather,
+            "temp_f": _feed_format(self.temperature_f, ".1f"),
+            "temp_c": _feed_format(self.temperature_c, ".1f"),
+            "dewpoint_f": _feed_format(self.dewpoint_f, ".1f"),
+            "dewpoint_c": _feed_format(self.dewpoint_c, ".1f"),
+            "relative_humidity": _feed_format(self.relative_humidity, ".0f"),
+            "wind_string": self.wind_string or "",
+            "visibility_mi": _feed_format(self.visibility_mi, ".2f"),
+            "pressure_string": self.pressure_string or "",
+            "pressure_in": _feed_format(self.pressure_inhg, ".2f"),
+            "location": self.location,
+        }
+
+
+def _feed_format(value: float | None, spec: str) -> str:
+    return "" if value is None else format(value, spec)
@@ -0,0 +1,95 @@
+"""Tests for the typed Observation record and its legacy dict adapter."""
+
+import dataclasses
+import json
+from pathlib import Path
+
+import pytest
+
+from services.observation import Observation
+
+FIXTURES = Path(__file__).resolve().parents[1] / "fixtures"
+
+NWS_V3_DOC = {
+    "properties": {
+        "timestamp": "2020-08-13T16:53:00+00:00",
+        "textDescription": "Clear",
+        "temperature": {"value": 22.2},
+        "dewpoint": {"value": 15},
+        "relativeHumidity": {"value": 64.83},
+        "windSpeed": {"value": 3.6},
+        "windDirection": {"value": 260},
+        "visibility": {"value": 16090},
+        "barometricPressure": {"value": 101340},
+        "seaLevelPressure": {"value": None},
+    }
+}
+
+
+def test_nws_v3_document_keeps_raw_si_values():
+    obs = Observation.from_nws_v3(NWS_V3_DOC, "KLAX")
+
+    assert obs.temperature_c == 22.2
+    assert obs.pressure_pa == 101340
+    assert round(obs.temperature_f, 2) == 71.96
+    assert round(obs.pressure_hpa, 1) == 1013.4
+
+
+def test_nws_values_are_converted_by_unit_code():
+    props = {
+        "windSpeed": {"unitCode": "wmoUnit:km_h-1", "value": 36.0},
+        "windDirection": {"unitCode": "wmoUnit:degree_(angle)", "value": 260},
+        "barometricPressure": {"unitCode": "wmoUnit:hPa", "value": 1013.4},
+    }
+    obs = Observation.from_nws_v3({"properties": props}, "KLAX")
+
+    assert obs.wind_speed_m_s == pytest.approx(10.0)
+    assert obs.wind_direction_deg == 260
+    assert obs.pressure_pa == pytest.approx(101340)
+
+
+def test_recorded_nws_wind_speed_is_served_in_km_h():
+    document = json.loads((FIXTURES / "nws_v3" / "KLAX.json").read_text())
+    obs = Observation.from_nws_v3(document, "KLAX")
+
+    # Same reading as the legacy XML feed's "West at 8.1 MPH (7 KT)"
+    assert round(obs.wind_mph, 1) == 8.1
+
+
+def test_legacy_dict_matches_previous_formatting():
+    assert Observation.from_nws_v3(NWS_V3_DOC, "KLAX").to_dict() == {
+        "observation_time": "2020-08-13T16:53:00+00:00",
+        "weather": "Clear",
+        "temp_f": "72.0",
+        "temp_c": "22.2",
+        "dewpoint_f": "59.0",
+        "dewpoint_c": "15.0",
+        "relative_humidity": "64.8",
+        "wind_string": "260 degrees at 8.1 MPH",
+        "visibility_mi": "10.00",
+        "pressure_string": "1013.4 hPa",
+        "pressure_in": "29.93",
+        "location": "KLAX",
+    }
+
+
+def test_missing_values_are_none_and_record_is_frozen():
+    obs = Observation.from_nws_v3({"properties": {"temperature": {"value": None}}}, "KDEN")
+
+    assert obs.temperature_c is None and obs.temperature_f is None
+    assert obs.to_dict()["wind_string"] == ""
+    assert not hasattr(obs, "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        obs.temperature_c = 1.0
+
+
+def test_xml_observation_keeps_feed_texts_and_is_hashable():
+    tags = {"temp_c": "22.2", "relative_humidity": "65", "wind_mph": "8.1"}
+    tags |= {"wind_string": "West at 8.1 MPH (7 KT)", "pressure_string": "1013.4 mb"}
+    obs = Observation.from_noaa_xml(tags, "KLAX")
+
+    data = obs.to_dict()
+    assert data["wind_string"] == "West at 8.1 MPH (7 KT)"
+    assert (data["temp_f"], data["relative_humidity"], data["pressure_in"]) == ("72.0", "65", "")
+    assert hash(obs) == hash(Observation.from_noaa_xml(dict(tags), "KLAX"))
+    assert Observation.from_record(json.loads(json.dumps(obs.to_record()))) == obs
@@ -3,21 +3,309 @@
 from __future__ import annotations
 
 import json
+import os
+import threading
 import urllib.parse
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from datetime import datetime
-from urllib.request import Request, urlopen
+from typing import NamedTuple
+from urllib.request import Request
+
+from . import metrics, transport
+from .cache import ObservationCache
+from .cityindex import CityIndex
+from .forecast import DAILY, HOURLY, THREE_HOURLY, Forecast, parse_forecast
+from .singleflight import FLIGHTS
 
 USER_AGENT = "python-projects/ci (github.com/brennanbrown)"
 
+# Override to point at a stand-in server (see ``benchmarks/standin_server.py``)
+OWM_API_BASE = os.getenv("WEATHER_OWM_API_BASE", "https://api.openweathermap.org")
+
+# OWM refreshes current weather roughly every 10 minutes; attach a DiskCache as
+# ``OWM_CACHE.store`` to persist results across restarts.
+OWM_CACHE = ObservationCache(ttl=600.0, max_entries=256)
+
+# Forecasts change every few hours. Memory only: values are Forecast objects, not JSON.
+FORECAST_CACHE = ObservationCache(ttl=1800.0, max_entries=1024)
+
+_FORECAST_PATHS = {
+    THREE_HOURLY: "/data/2.5/forecast",
+    HOURLY: "/data/2.5/forecast/hourly",
+    DAILY: "/data/2.5/forecast/daily",
+}
+
+# The group endpoint accepts at most this many city IDs per call
+GROUP_SIZE = 20
+
+# City query (as passed by callers) -> OWM city ID, learned from responses
+CITY_IDS: dict[str, int] = {}
+_CITY_IDS_LOCK = threading.Lock()
+
+# Optional offline index of OWM's bulk city list (see ``services/cityindex.py``). When set,
+# unambiguous "Name, CC" queries are sent by ID instead of being geocoded upstream.
+CITY_INDEX: CityIndex | None = None
+
+
+def get_open_weather_data(
+    city: str, api_key: str, timeout: int = 10, cache: ObservationCache | None = OWM_CACHE
+) -> dict[str, str]:
+    """Fetch current weather for ``city`` (e.g. ``"London, UK"``) as display strings.
+
+    Fresh results are served from ``cache`` without a network round trip; pass
+    ``cache=None`` to always fetch. Concurrent requests for the same city with the same
+    ``api_key``, ``cache`` and ``timeout`` are coalesced into one upstream call; requests
+    with ``cache=None`` never are.
+    """
+    key = ("owm", city)
+    if cache is None:
+        return dict(_fetch_open_weather_data(city, api_key, timeout, cache))
+    entry = cache.get(key)
+    if entry is not None and cache.is_fresh(entry):
+        if metrics.BUS.active:
+            metrics.emit(metrics.CacheEvent("owm", "weather", "hit"))
+        return dict(entry.value)
+    data = FLIGHTS.do(
+        (*key, api_key, cache, timeout),
+        lambda: _fetch_open_weather_data(city, api_key, timeout, cache),
+    )
+    return dict(data)
+
+
+def _weather_request(city: str, api_key: str) -> Request:
+    city_id = _city_id(city)
+    if city_id is not None:
+        url = f"{OWM_API_BASE}/data/2.5/weather?id={city_id}&appid={api_key}"
+    else:
+        city_q = urllib.parse.quote(city)
+        url = f"{OWM_API_BASE}/data/2.5/weather?q={city_q}&appid={api_key}"
+    return Request(url, headers={"User-Agent": USER_AGENT})
+
+
+def _fetch_open_weather_data(
+    city: str, api_key: str, timeout: int, cache: ObservationCache | None
+) -> dict[str, str]:
+    req = _weather_request(city, api_key)
+    with metrics.labels("owm", "weather"), transport.urlopen(req, timeout=timeout) as resp:
+        payload = resp.read()
+    json_data = json.loads(payload.decode())
+    result = _parse_open_weather(json_data)
+    if "id" in json_data:
+        remember_city_id(city, json_data["id"])
+    if cache is not None:
+        if metrics.BUS.active:
+            metrics.emit(metrics.CacheEvent("owm", "weather", "miss"))
+        cache.put(("owm", city), result, payload=payload)
+    return result
+
+
+def remember_city_id(city: str, city_id: int) -> None:
+    """Record the OWM ID for ``city`` so batch fetches can use the group endpoint."""
+    with _CITY_IDS_LOCK:
+        CITY_IDS[city] = int(city_id)
+
+
+def _city_id(city: str) -> int | None:
+    if city.isdigit():
+        return int(city)
+    with _CITY_IDS_LOCK:
+        city_id = CITY_IDS.get(city)
+    if city_id is None and CITY_INDEX is not None:
+        match = CITY_INDEX.resolve(city)
+        if match is not None:
+            remember_city_id(city, match.id)
+            city_id = match.id
+    return city_id
+
+
+class CityResult(NamedTuple):
+    """Outcome for one city of a batch fetch; ``error`` is set when the fetch failed."""
+
+    city: str
+    data: dict[str, str] | None
+    error: Exception | None
+
+
+def _group_request(city_ids: list[int], api_key: str) -> Request:
+    ids = ",".join(str(city_id) for city_id in city_ids)
+    url = f"{OWM_API_BASE}/data/2.5/group?id={ids}&appid={api_key}"
+    return Request(url, headers={"User-Agent": USER_AGENT})
+
+
+def _fetch_group(city_ids: list[int], api_key: str, timeout: float) -> dict[int, dict]:
+    """Fetch one group-endpoint chunk; returns the raw per-city documents keyed by ID."""
+    req = _group_request(city_ids, api_key)
+    with metrics.labels("owm", "group"), transport.urlopen(req, timeout=timeout) as resp:
+        document = json.load(resp)
+    return {int(item["id"]): item for item in document.get("list", [])}
+
+
+def get_open_weather_data_many(
+    cities: Iterable[str],
+    api_key: str,
+    timeout: int = 10,
+    max_workers: int = 4,
+    cache: ObservationCache | None = OWM_CACHE,
+) -> Iterator[CityResult]:
+    """Fetch current weather for many cities with as few upstream requests as possible.
+
+    Fresh cache entries are yielded first. Cities with a known OWM ID (see
+    :func:`remember_city_id` and :data:`CITY_INDEX`; numeric strings are taken as IDs) are
+    fetched through the group endpoint, :data:`GROUP_SIZE` per request. Any others get one
+    ``q=`` request each, which also records their IDs so the next batch can group them.
+    Requests run on up to ``max_workers`` threads, and results, in the same shape as
+    :func:`get_open_weather_data`, are yielded as they complete. A failing chunk or city
+    yields results carrying the exception instead of aborting the batch.
+    """
+    by_id: dict[int, list[str]] = {}
+    singles: list[str] = []
+    for city in dict.fromkeys(cities):
+        entry = cache.get(("owm", city)) if cache is not None else None
+        if entry is not None and cache is not None and cache.is_fresh(entry):
+            if metrics.BUS.active:
+                metrics.emit(metrics.CacheEvent("owm", "group", "hit"))
+            yield CityResult(city, dict(entry.value), None)
+            continue
+        city_id = _city_id(city)
+        if city_id is None:
+            singles.append(city)
+        else:
+            by_id.setdefault(city_id, []).append(city)
+
+    ids = list(by_id)
+    chunks = [ids[start : start + GROUP_SIZE] for start in range(0, len(ids), GROUP_SIZE)]
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="owm") as pool:
+        futures: dict[Future, str | list[int]] = {
+            pool.submit(_fetch_group, chunk, api_key, timeout): chunk for chunk in chunks
+        }
+        for city in singles:
+            futures[pool.submit(get_open_weather_data, city, api_key, timeout, cache)] = city
+        try:
+            for fut in as_completed(futures):
+                request = futures[fut]
+                if isinstance(request, str):
+                    try:
+                        yield CityResult(request, fut.result(), None)
+                    except Exception as exc:  # noqa: BLE001 - reported per city
+                        yield CityResult(request, None, exc)
+                    continue
+                try:
+                    found = fut.result()
+                except Exception as exc:  # noqa: BLE001 - reported per city
+                    for city_id in request:
+                        for city in by_id[city_id]:
+                            yield CityResult(city, None, exc)
+                    continue
+                for city_id in request:
+                    item = found.get(city_id)
+                    for city in by_id[city_id]:
+                        if item is None:
+                            error = LookupError(f"group response has no city with id {city_id}")
+                            yield CityResult(city, None, error)
+                            continue
+                        result = _parse_open_weather(item)
+                        if cache is not None:
+                            if metrics.BUS.active:
+                                metrics.emit(metrics.CacheEvent("owm", "group", "miss"))
+                            payload = json.dumps(item).encode() if cache.store is not None else None
+                            cache.put(("owm", city), result, payload=payload)
+                        yield CityResult(city, dict(result), None)
+        finally:
+            for fut in futures:
+                fut.cancel()
+
+
+def get_open_weather_forecast(
+    city: str,
+    api_key: str,
+    kind: str = THREE_HOURLY,
+    timeout: int = 10,
+    cache: ObservationCache | None = FORECAST_CACHE,
+) -> Forecast:
+    """Fetch the ``kind`` forecast (``"3h"``, ``"hourly"`` or ``"daily"``) for ``city``.
+
+    Returns a columnar :class:`~services.forecast.Forecast` in SI units; see its conversion
+    properties and :meth:`~services.forecast.Forecast.rows` for display values. Caching and
+    request coalescing work as in :func:`get_open_weather_data`.
+    """
+    if kind not in _FORECAST_PATHS:
+        raise ValueError(f"unknown forecast kind: {kind!r}")
+    key = ("owm-forecast", kind, city)
+    if cache is None:
+        return _fetch_forecast(city, api_key, kind, timeout, cache)
+    entry = cache.get(key)
+    if entry is not None and cache.is_fresh(entry):
+        if metrics.BUS.active:
+            metrics.emit(metrics.CacheEvent("owm", "forecast", "hit"))
+        return entry.value
+    return FLIGHTS.do(
+        (*key, api_key, cache, timeout),
+        lambda: _fetch_forecast(city, api_key, kind, timeout, cache),
+    )
+
+
+def _forecast_request(city: str, api_key: str, kind: str) -> Request:
+    city_id = _city_id(city)
+    where = f"id={city_id}" if city_id is not None else f"q={urllib.parse.quote(city)}"
+    url = f"{OWM_API_BASE}{_FORECAST_PATHS[kind]}?{where}&appid={api_key}"
+    return Request(url, headers={"User-Agent": USER_AGENT})
+
+
+def _fetch_forecast(
+    city: str, api_key: str, kind: str, timeout: int, cache: ObservationCache | None
+) -> Forecast:
+    req = _forecast_request(city, api_key, kind)
+    with metrics.labels("owm", "forecast"), transport.urlopen(req, timeout=timeout) as resp:
+        document = json.load(resp)
+    forecast = parse_forecast(document, kind)
+    if forecast.city_id:
+        remember_city_id(city, forecast.city_id)
+    if cache is not None:
+        if metrics.BUS.active:
+            metrics.emit(metrics.CacheEvent("owm", "forecast", "miss"))
+        cache.put(("owm-forecast", kind, city), forecast)
+    return forecast
+
+
+class ForecastResult(NamedTuple):
+    """Outcome for one city of a batch forecast fetch; ``error`` is set when it failed."""
+
+    city: str
+    forecast: Forecast | None
+    error: Exception | None
+
+
+def get_open_weather_forecast_many(
+    cities: Iterable[str],
+    api_key: str,
+    kind: str = THREE_HOURLY,
+    timeout: int = 10,
+    max_workers: int = 8,
+    cache: ObservationCache | None = FORECAST_CACHE,
+) -> Iterator[ForecastResult]:
+    """Fetch forecasts for many cities on up to ``max_workers`` threads.
+
+    Results are yielded as they complete; a failing city yields a result carrying the
+    exception instead of aborting the batch.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="owm") as pool:
+        futures = {
+            pool.submit(get_open_weather_forecast, city, api_key, kind, timeout, cache): city
+            for city in dict.fromkeys(cities)
+        }
+        try:
+            for fut in as_completed(futures):
+                try:
+                    yield ForecastResult(futures[fut], fut.result(), None)
+                except Exception as exc:  # noqa: BLE001 - reported per city
+                    yield ForecastResult(futures[fut], None, exc)
+        finally:
+            for fut in futures:
+                fut.cancel()
 
-def get_open_weather_data(city: str, api_key: str, timeout: int = 10) -> dict[str, str]:
-    city_q = urllib.parse.quote(city)
-    url = f"https://api.openweathermap.org/data/2.5/weather?q={city_q}&appid={api_key}"
-    req = Request(url, headers={"User-Agent": USER_AGENT})
-    with urlopen(req, timeout=timeout) as resp:
-        data = resp.read().decode()
-    json_data = json.loads(data)
 
+def _parse_open_weather(json_data: dict) -> dict[str, str]:
     def kelvin_to_celsius(temp_k: float) -> str:
         return f"{(temp_k - 273.15):.1f}"
 
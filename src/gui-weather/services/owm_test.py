@@ -0,0 +1,104 @@
+"""Tests for the OpenWeatherMap service helpers (network access is monkeypatched out)."""
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.parse
+from pathlib import Path
+
+from services import owm
+from services.cache import ObservationCache
+from services.singleflight import SingleFlight
+
+RECORDED = json.loads(
+    (Path(__file__).resolve().parents[1] / "fixtures" / "owm" / "weather.json").read_text()
+)
+
+
+def city_document(city_id, name):
+    return dict(RECORDED, id=city_id, name=name)
+
+
+def test_batch_uses_group_endpoint_in_chunks(monkeypatch, fake_response):
+    monkeypatch.setattr(owm, "CITY_IDS", {f"City {n}": 1000 + n for n in range(43)})
+    urls = []
+
+    def fake_urlopen(req, timeout):
+        urls.append(req.full_url)
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(req.full_url).query)
+        if "q" in query:
+            return fake_response(json.dumps(city_document(7, "Elsewhere")).encode())
+        ids = [int(i) for i in query["id"][0].split(",")]
+        items = [city_document(i, f"Town{i}") for i in ids if i != 1042]
+        return fake_response(json.dumps({"cnt": len(items), "list": items}).encode())
+
+    monkeypatch.setattr(owm.transport, "urlopen", fake_urlopen)
+    cities = [*owm.CITY_IDS, "2643743", "Elsewhere, XX", "City 0"]
+    cache = ObservationCache()
+
+    results = {r.city: r for r in owm.get_open_weather_data_many(cities, "key", cache=cache)}
+
+    assert len(results) == 45
+    assert sum("/group?" in url for url in urls) == 3  # 44 IDs in chunks of 20
+    assert sum("q=" in url for url in urls) == 1
+    assert results["City 5"].data["location"] == "Town1005, GB"
+    assert results["2643743"].data["location"] == "Town2643743, GB"
+    assert isinstance(results["City 42"].error, LookupError)
+    assert owm.CITY_IDS["Elsewhere, XX"] == 7
+
+    urls.clear()
+    again = list(owm.get_open_weather_data_many(["City 5", "Elsewhere, XX"], "key", cache=cache))
+    assert [r.error for r in again] == [None, None] and urls == []
+
+
+def test_failed_chunk_is_reported_per_city(monkeypatch):
+    monkeypatch.setattr(owm, "CITY_IDS", {"A": 1, "B": 2})
+
+    def fake_urlopen(req, timeout):
+        raise urllib.error.URLError("down")
+
+    monkeypatch.setattr(owm.transport, "urlopen", fake_urlopen)
+    results = list(owm.get_open_weather_data_many(["A", "B"], "key", cache=None))
+
+    assert sorted(r.city for r in results) == ["A", "B"]
+    assert all(isinstance(r.error, urllib.error.URLError) for r in results)
+
+
+def test_lookups_are_coalesced_per_api_key_and_cache(monkeypatch):
+    flights = SingleFlight()
+    monkeypatch.setattr(owm, "FLIGHTS", flights)
+    release = threading.Event()
+    fetched = []
+
+    def fake_fetch(city, api_key, timeout, cache):
+        fetched.append(api_key)
+        release.wait(5)
+        return {"location": city}
+
+    monkeypatch.setattr(owm, "_fetch_open_weather_data", fake_fetch)
+    cache = ObservationCache()
+
+    def lookup(api_key):
+        return threading.Thread(
+            target=owm.get_open_weather_data, args=("London", api_key, 10, cache)
+        )
+
+    threads = [lookup("a")]
+    threads[0].start()
+    while not fetched:
+        time.sleep(0.001)
+    threads += [lookup("a"), lookup("b")]
+    for thread in threads[1:]:
+        thread.start()
+    while flights.stats()["coalesced"] < 1 or len(fetched) < 2:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    # The second "a" lookup shares the first; "b" must not reuse another key's response
+    assert sorted(fetched) == ["a", "b"]
+    assert flights.stats() == {"executed": 2, "coalesced": 1, "in_flight": 0}
+    owm.get_open_weather_data("London", "a", cache=None)
+    assert flights.stats()["executed"] == 2
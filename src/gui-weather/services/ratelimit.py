@@ -0,0 +1,166 @@
+"""Per-host token-bucket rate limiting with adaptive back-off on throttling responses."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from email.utils import parsedate_to_datetime
+
+
+def parse_retry_after(value: str | None, now: float | None = None) -> float | None:
+    """Return the delay in seconds requested by a ``Retry-After`` header, or None.
+
+    Accepts both forms allowed by RFC 9110: delay-seconds and an HTTP-date.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - (time.time() if now is None else now))
+
+
+class RateLimitExceeded(TimeoutError):
+    """Raised when the local rate limiter has no slot for a request within its timeout.
+
+    Nothing was sent, so this says nothing about the remote host's health.
+    """
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing ``rate`` requests/second with bursts up to ``burst``.
+
+    On a throttling response, :meth:`throttled` halves the rate (down to ``min_rate``) and
+    blocks the bucket until the server's ``Retry-After`` has passed; each :meth:`success`
+    then adds back ``recovery`` requests/second until the configured rate is reached again.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        min_rate: float | None = None,
+        recovery: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = rate / 16 if min_rate is None else min_rate
+        self.recovery = rate / 20 if recovery is None else recovery
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(float(self.burst), self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, timeout: float | None = None) -> float | None:
+        """Take one token and return how long to wait before using it.
+
+        Returns None without taking a token if the wait would be longer than ``timeout``.
+        Used directly by async callers, which sleep without blocking the event loop.
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens -= 1
+            wait = max(-self._tokens / self.rate, self._blocked_until - now, 0.0)
+            if timeout is not None and wait > timeout:
+                self._tokens += 1
+                return None
+            return wait
+
+    def acquire(self, timeout: float | None = None) -> bool:
+        """Take one token, sleeping until it is available.
+
+        Returns False without taking a token if that would take longer than ``timeout``.
+        """
+        wait = self.reserve(timeout)
+        if wait is None:
+            return False
+        if wait > 0:
+            self._sleep(wait)
+        return True
+
+    def throttled(self, retry_after: float | None = None) -> None:
+        """Record a 429/503 response: slow down and honor ``retry_after`` seconds."""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = min(self._tokens, 0.0)
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+
+    def success(self) -> None:
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._refill(self._clock())
+                self.rate = min(self.max_rate, self.rate + self.recovery)
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            self._refill(self._clock())
+            return {
+                "rate": self.rate,
+                "max_rate": self.max_rate,
+                "tokens": self._tokens,
+                "blocked_for": max(0.0, self._blocked_until - self._clock()),
+            }
+
+
+class RateLimiters:
+    """Lazily created :class:`TokenBucket` per host, shared by all threads."""
+
+    def __init__(
+        self,
+        default_rate: float = 5.0,
+        default_burst: int = 10,
+        limits: dict[str, tuple[float, int]] | None = None,
+    ) -> None:
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.limits = dict(limits or {})
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def for_host(self, host: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, burst = self.limits.get(host, (self.default_rate, self.default_burst))
+                bucket = self._buckets[host] = TokenBucket(rate, burst)
+            return bucket
+
+    def configure(self, host: str, rate: float, burst: int) -> None:
+        """Set the requests/second and burst size for ``host`` (resets its bucket)."""
+        with self._lock:
+            self.limits[host] = (rate, burst)
+            self._buckets.pop(host, None)
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {host: bucket.snapshot() for host, bucket in buckets.items()}
+
+
+# OpenWeatherMap's free tier allows 60 calls/minute; NWS asks clients to stay reasonable.
+LIMITERS = RateLimiters(
+    limits={
+        "api.weather.gov": (5.0, 10),
+        "www.weather.gov": (5.0, 10),
+        "w1.weather.gov": (5.0, 10),
+        "api.openweathermap.org": (1.0, 5),
+    }
+)
@@ -0,0 +1,60 @@
+"""Tests for the token-bucket rate limiter and Retry-After parsing."""
+
+from services.ratelimit import TokenBucket, parse_retry_after
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def make_bucket(fake, rate=2.0, burst=2):
+    return TokenBucket(rate, burst, clock=fake.clock, sleep=fake.sleep)
+
+
+def test_burst_is_free_then_requests_are_paced():
+    fake = FakeTime()
+    bucket = make_bucket(fake)
+
+    for _ in range(3):
+        assert bucket.acquire()
+
+    assert fake.slept == [0.5]
+
+
+def test_acquire_gives_up_when_wait_exceeds_timeout():
+    fake = FakeTime()
+    bucket = make_bucket(fake, burst=1)
+    bucket.acquire()
+
+    assert not bucket.acquire(timeout=0.1)
+    assert fake.slept == []
+
+
+def test_throttling_honors_retry_after_and_recovers():
+    fake = FakeTime()
+    bucket = make_bucket(fake)
+    bucket.throttled(retry_after=5)
+
+    assert bucket.rate == 1.0
+    bucket.acquire()
+    assert fake.slept == [5]
+
+    for _ in range(20):
+        bucket.success()
+    assert bucket.rate == bucket.max_rate
+
+
+def test_parse_retry_after_accepts_seconds_and_http_dates():
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("Thu, 01 Jan 1970 00:01:00 GMT", now=30) == 30
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
@@ -0,0 +1,103 @@
+"""Request coalescing: concurrent callers asking for the same key share one upstream call."""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future, wait
+from typing import TypeVar
+
+from .deadline import Deadline, DeadlineExceeded
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; callers arriving meanwhile wait for its outcome.
+
+    Every waiter receives the leader's result, or the leader's exception re-raised.
+    ``executed`` counts calls actually made and ``coalesced`` counts the requests saved.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Future] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], T],
+        timeout: float | None = None,
+        deadline: Deadline | None = None,
+    ) -> T:
+        """Return ``fn()``, sharing an in-flight call for ``key`` if there is one.
+
+        ``timeout`` only bounds how long a follower waits for the leader; it raises
+        ``TimeoutError`` if the shared call has not finished by then. A follower with a
+        ``deadline`` also waits no longer than its remaining budget, books the wait as its
+        ``"coalesced"`` stage and raises :class:`DeadlineExceeded` with its own stages.
+
+        A leader failing with :class:`DeadlineExceeded` ran out of its own budget, not its
+        followers'; they make the call again instead of sharing that error.
+        """
+        while True:
+            with self._lock:
+                fut = self._calls.get(key)
+                leader = fut is None
+                if fut is None:
+                    fut = self._calls[key] = Future()
+                    self.executed += 1
+                else:
+                    self.coalesced += 1
+            if leader:
+                break
+            self._wait(key, fut, timeout, deadline)
+            if not isinstance(fut.exception(), DeadlineExceeded):
+                return fut.result()
+
+        try:
+            result = fn()
+        except BaseException as exc:
+            self._finish(key)
+            fut.set_exception(exc)
+            raise
+        self._finish(key)
+        fut.set_result(result)
+        return result
+
+    @staticmethod
+    def _wait(key: Hashable, fut: Future, timeout: float | None, deadline: Deadline | None) -> None:
+        if deadline is None:
+            if not wait([fut], timeout).done:
+                raise TimeoutError(f"timed out waiting for in-flight request {key!r}")
+            return
+        with deadline.stage("coalesced"):
+            remaining = deadline.remaining()
+            done = wait([fut], remaining if timeout is None else min(timeout, remaining)).done
+        if done:
+            return
+        if deadline.expired:
+            raise DeadlineExceeded(
+                f"deadline of {deadline.budget:.2f}s exceeded waiting for in-flight request"
+                f" {key!r}",
+                dict(deadline.stages),
+            )
+        raise TimeoutError(f"timed out waiting for in-flight request {key!r}")
+
+    def _finish(self, key: Hashable) -> None:
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+            }
+
+
+# Shared by the service modules; keys start with (provider, station or city)
+FLIGHTS = SingleFlight()
@@ -0,0 +1,92 @@
+"""Tests for single-flight request coalescing."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services.deadline import Deadline, DeadlineExceeded
+from services.singleflight import SingleFlight
+
+
+def _wait_for_followers(flights, count):
+    while flights.stats()["coalesced"] < count:
+        threading.Event().wait(0.001)
+
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {"location": "KLAX"}
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(flights.do, ("noaa", "KLAX"), fetch) for _ in range(4)]
+        _wait_for_followers(flights, 3)
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert len(calls) == 1
+    assert all(r == {"location": "KLAX"} for r in results)
+    assert flights.stats() == {"executed": 1, "coalesced": 3, "in_flight": 0}
+
+
+def test_followers_receive_the_leaders_exception():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def fetch():
+        release.wait(5)
+        raise OSError("upstream down")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = [pool.submit(flights.do, "KDEN", fetch) for _ in range(2)]
+        _wait_for_followers(flights, 1)
+        release.set()
+        for fut in futures:
+            with pytest.raises(OSError):
+                fut.result()
+
+
+def test_follower_wait_is_bounded_by_its_own_deadline():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        leader = pool.submit(flights.do, "KLAX", lambda: release.wait(5))
+        while flights.stats()["in_flight"] == 0:
+            threading.Event().wait(0.001)
+        deadline = Deadline(0.05)
+        with pytest.raises(DeadlineExceeded) as excinfo:
+            flights.do("KLAX", lambda: "unused", deadline=deadline)
+        release.set()
+        leader.result()
+
+    assert set(excinfo.value.stages) == {"coalesced"}
+    assert excinfo.value.stages["coalesced"] >= 0.05
+
+
+def test_followers_retry_when_the_leader_runs_out_of_its_deadline():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def leader_fetch():
+        release.wait(5)
+        raise DeadlineExceeded("deadline of 1.00s exceeded", {"nws_v3": 1.0})
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flights.do, "KDEN", leader_fetch)
+        while flights.stats()["in_flight"] == 0:
+            threading.Event().wait(0.001)
+        follower = pool.submit(flights.do, "KDEN", lambda: {"location": "KDEN"})
+        _wait_for_followers(flights, 1)
+        release.set()
+
+        with pytest.raises(DeadlineExceeded):
+            leader.result()
+        assert follower.result() == {"location": "KDEN"}
+    assert flights.stats()["executed"] == 2
@@ -0,0 +1,325 @@
+"""Offline directory of NWS observation stations with a search-as-you-type prefix index.
+
+:func:`build_directory` pages through the NWS station list (``/stations?state=``) for every
+state once and writes one tab-separated file of station ID, name, state and coordinates.
+:class:`StationDirectory` loads that file and keeps a sorted list of lookup keys (the station
+ID, the normalized name, and every later word of the name), so :meth:`StationDirectory.search`
+is a binary search plus a short scan and needs no network.
+
+:func:`crawl_directory` builds the same file from the legacy seek.php pages instead, fetching
+all states concurrently and parsing each page as it streams in with :class:`SeekParser`.
+"""
+
+from __future__ import annotations
+
+import codecs
+import csv
+import math
+import os
+import urllib.parse
+import urllib.request
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import NamedTuple
+
+from . import metrics, noaa
+from .cityindex import normalize
+
+US_STATES = (
+    "AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DE", "FL", "GA",
+    "HI", "ID", "IL", "IN", "IA", "KS", "KY", "LA", "ME", "MD",
+    "MA", "MI", "MN", "MS", "MO", "MT", "NE", "NV", "NH", "NJ",
+    "NM", "NY", "NC", "ND", "OH", "OK", "OR", "PA", "RI", "SC",
+    "SD", "TN", "TX", "UT", "VT", "VA", "WA", "WV", "WI", "WY",
+)  # fmt: skip
+
+_COLUMNS = ("id", "name", "state", "lat", "lon")
+_SEEK_LINK = "display.php?stid="
+_SEEK_CHUNK_SIZE = 16 * 1024
+# What the seek.php pages declare; used when a response names no charset or an unknown one
+_SEEK_CHARSET = "iso-8859-1"
+
+
+class Station(NamedTuple):
+    id: str
+    name: str
+    state: str
+    lat: float = math.nan
+    lon: float = math.nan
+
+    @property
+    def label(self) -> str:
+        """``"KLAX  Los Angeles International Airport, CA"``, as listed in the GUI."""
+        return f"{self.id}  {self.name}, {self.state}"
+
+
+def default_directory_path() -> Path:
+    """``$WEATHER_STATION_DIRECTORY`` or ``$XDG_CACHE_HOME/python-projects/stations.tsv``."""
+    override = os.getenv("WEATHER_STATION_DIRECTORY")
+    if override:
+        return Path(override)
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "python-projects" / "stations.tsv"
+
+
+def station_from_feature(feature: dict, state: str) -> Station | None:
+    """A :class:`Station` from one GeoJSON feature of the NWS station list."""
+    props = feature.get("properties") or {}
+    station_id = props.get("stationIdentifier")
+    if not station_id:
+        return None
+    coordinates = (feature.get("geometry") or {}).get("coordinates") or (math.nan, math.nan)
+    lon, lat = coordinates[:2]
+    return Station(station_id, " ".join(str(props.get("name") or "").split()), state, lat, lon)
+
+
+def iter_state_stations(state: str, timeout: float = 10) -> Iterator[Station]:
+    """Yield every station the NWS lists for ``state``."""
+    for page in noaa.iter_station_pages(state, timeout):
+        for feature in page:
+            station = station_from_feature(feature, state.upper())
+            if station is not None:
+                yield station
+
+
+def build_directory(
+    target: str | os.PathLike[str],
+    states: Iterable[str] = US_STATES,
+    timeout: float = 10,
+) -> int:
+    """Fetch the stations of ``states`` from the NWS API into ``target``; returns the count."""
+    return write_directory(
+        (station for state in states for station in iter_state_stations(state, timeout)), target
+    )
+
+
+class SeekParser(HTMLParser):
+    """Collect the stations linked from a seek.php page, fed in chunks as it downloads.
+
+    Each station is an ``<a href="display.php?stid=ID">Name</a>`` link; the ID comes from the
+    ``href`` attribute and the name from the link text, however the text is split across
+    :meth:`feed` calls.
+    """
+
+    def __init__(self, state: str) -> None:
+        super().__init__()
+        self.state = state.upper()
+        self.stations: list[Station] = []
+        self._station_id: str | None = None
+        self._text: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag != "a":
+            return
+        for name, value in attrs:
+            if name == "href" and value and value.startswith(_SEEK_LINK):
+                self._station_id = value[len(_SEEK_LINK) :]
+                self._text = []
+
+    def handle_data(self, data: str) -> None:
+        if self._station_id is not None:
+            self._text.append(data)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "a" and self._station_id is not None:
+            name = " ".join("".join(self._text).split())
+            self.stations.append(Station(self._station_id, name, self.state))
+            self._station_id = None
+
+
+def fetch_seek_stations(state: str, timeout: float = 10) -> list[Station]:
+    """The stations seek.php lists for ``state``, parsed while the page downloads."""
+    query = urllib.parse.urlencode({"state": state.lower(), "Find": "Find"})
+    req = urllib.request.Request(
+        f"{noaa.NOAA_SEEK_BASE}/xml/current_obs/seek.php?{query}",
+        headers={"User-Agent": noaa.USER_AGENT},
+    )
+    parser = SeekParser(state)
+    with metrics.labels("noaa", "seek"), noaa._urlopen_with_retry(req, timeout) as resp:
+        decoder = _seek_decoder(resp.headers.get_content_charset(_SEEK_CHARSET))
+        while chunk := resp.read(_SEEK_CHUNK_SIZE):
+            # Incremental, so a multi-byte character split across chunks decodes intact
+            parser.feed(decoder.decode(chunk))
+        parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    return parser.stations
+
+
+def _seek_decoder(charset: str) -> codecs.IncrementalDecoder:
+    try:
+        factory = codecs.getincrementaldecoder(charset)
+    except LookupError:
+        factory = codecs.getincrementaldecoder(_SEEK_CHARSET)
+    return factory(errors="replace")
+
+
+class CrawlResult(NamedTuple):
+    """Outcome for one state of :func:`crawl_seek_stations`; ``error`` is set when it failed."""
+
+    state: str
+    stations: list[Station]
+    error: Exception | None
+
+
+def crawl_seek_stations(
+    states: Iterable[str] = US_STATES, timeout: float = 10, max_workers: int = 8
+) -> Iterator[CrawlResult]:
+    """Fetch the seek.php station lists of many states concurrently.
+
+    Requests go through the shared connection pool, so the host's rate limit in
+    :data:`~services.ratelimit.LIMITERS` paces the crawl however many workers run. Results
+    are yielded as states finish; a failing state reports its error.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="noaa-seek") as pool:
+        futures = {
+            pool.submit(fetch_seek_stations, state, timeout): state
+            for state in dict.fromkeys(state.upper() for state in states)
+        }
+        try:
+            for fut in as_completed(futures):
+                state = futures[fut]
+                try:
+                    yield CrawlResult(state, fut.result(), None)
+                except Exception as exc:  # noqa: BLE001 - reported per state
+                    yield CrawlResult(state, [], exc)
+        finally:
+            for fut in futures:
+                fut.cancel()
+
+
+def crawl_directory(
+    target: str | os.PathLike[str],
+    states: Iterable[str] = US_STATES,
+    timeout: float = 10,
+    max_workers: int = 8,
+) -> tuple[int, dict[str, Exception]]:
+    """Crawl seek.php for ``states`` into one directory file at ``target``.
+
+    Coordinates (which seek.php does not list) are kept from an existing directory at
+    ``target``, as are the existing entries of states whose crawl failed. Returns the number
+    of stations written and the errors by state.
+    """
+    try:
+        previous = read_directory(target)
+    except (OSError, ValueError):
+        previous = []
+    known = {station.id: station for station in previous}
+    stations: list[Station] = []
+    errors: dict[str, Exception] = {}
+    for result in crawl_seek_stations(states, timeout, max_workers):
+        if result.error is not None:
+            errors[result.state] = result.error
+            continue
+        for station in result.stations:
+            old = known.get(station.id)
+            stations.append(station._replace(lat=old.lat, lon=old.lon) if old else station)
+    crawled = {state.upper() for state in states} - set(errors)
+    stations.extend(station for station in previous if station.state not in crawled)
+    return write_directory(stations, target), errors
+
+
+def write_directory(stations: Iterable[Station], target: str | os.PathLike[str]) -> int:
+    """Write ``stations`` (de-duplicated by ID, sorted) to ``target``; returns the count.
+
+    The file is written to a temporary name and moved into place, so readers never see a
+    partial directory.
+    """
+    unique = sorted({station.id: station for station in stations}.values())
+    path = Path(target)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8", newline="") as out:
+        writer = csv.writer(out, delimiter="\t", lineterminator="\n")
+        writer.writerow(_COLUMNS)
+        writer.writerows(unique)
+    os.replace(tmp, path)
+    return len(unique)
+
+
+def read_directory(path: str | os.PathLike[str]) -> list[Station]:
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f, delimiter="\t")
+        if tuple(next(reader, ())) != _COLUMNS:
+            raise ValueError("not a station directory")
+        return [
+            Station(station_id, name, state, float(lat), float(lon))
+            for station_id, name, state, lat, lon in reader
+        ]
+
+
+class StationDirectory:
+    """In-memory station list with a prefix index over station IDs and name words."""
+
+    def __init__(self, stations: Iterable[Station]) -> None:
+        self._stations = list(stations)
+        self._by_id = {station.id: station for station in self._stations}
+        keys: list[str] = []
+        rows: list[int] = []
+        for n, station in enumerate(self._stations):
+            words = normalize(station.name).split()
+            keys.append(station.id.casefold())
+            keys.extend(" ".join(words[i:]) for i in range(len(words)))
+            rows.extend([n] * (len(words) + 1))
+        # Sorting a permutation by key alone is much cheaper than sorting (key, row) tuples
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self._keys = [keys[i] for i in order]
+        self._rows = [rows[i] for i in order]
+
+    @classmethod
+    def load(cls, path: str | os.PathLike[str]) -> StationDirectory:
+        return cls(read_directory(path))
+
+    def __len__(self) -> int:
+        return len(self._stations)
+
+    def __iter__(self) -> Iterator[Station]:
+        return iter(self._stations)
+
+    def get(self, station_id: str) -> Station | None:
+        return self._by_id.get(station_id.upper())
+
+    def in_state(self, state: str) -> list[Station]:
+        state = state.upper()
+        return [station for station in self._stations if station.state == state]
+
+    def search(self, prefix: str, limit: int = 25, state: str = "") -> list[Station]:
+        """Stations whose ID, name, or any word onward of the name starts with ``prefix``.
+
+        Matching is case- and accent-insensitive; results are in key order, each station
+        listed once.
+        """
+        key = normalize(prefix)
+        if not key:
+            return []
+        state = state.upper()
+        seen: set[int] = set()
+        results: list[Station] = []
+        n = bisect_left(self._keys, key)
+        while n < len(self._keys) and len(results) < limit and self._keys[n].startswith(key):
+            row = self._rows[n]
+            station = self._stations[row]
+            if row not in seen and (not state or station.state == state):
+                seen.add(row)
+                results.append(station)
+            n += 1
+        return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the offline station directory.")
+    parser.add_argument("target", nargs="?", default=default_directory_path())
+    parser.add_argument("--seek", action="store_true", help="crawl seek.php, not the NWS API")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+    if args.seek:
+        count, errors = crawl_directory(args.target, max_workers=args.workers)
+        for state, exc in sorted(errors.items()):
+            print(f"{state}: {exc}")
+    else:
+        count = build_directory(args.target)
+    print(f"Wrote {count} stations to {args.target}")
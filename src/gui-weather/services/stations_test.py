@@ -0,0 +1,88 @@
+"""Tests for the offline station directory and its prefix index."""
+
+import http.client
+import math
+from pathlib import Path
+
+import pytest
+
+from services import noaa, stations
+from services.stations import (
+    SeekParser,
+    Station,
+    StationDirectory,
+    read_directory,
+    write_directory,
+)
+
+SEEK_PAGES = Path(__file__).resolve().parents[1] / "fixtures" / "seek"
+
+STATIONS = [
+    Station("KLAX", "Los Angeles, Los Angeles International Airport", "CA", 33.938, -118.389),
+    Station("KSFO", "San Francisco, San Francisco International Airport", "CA", 37.619, -122.365),
+    Station("KSAN", "San Diego, San Diego International Airport", "CA", 32.734, -117.183),
+    Station("KDEN", "Denver International Airport", "CO", 39.847, -104.656),
+    Station("KNYC", "New York City, Central Park", "NY"),
+]
+
+
+@pytest.fixture()
+def directory():
+    return StationDirectory(STATIONS)
+
+
+def test_directory_file_round_trip(tmp_path):
+    path = tmp_path / "stations.tsv"
+    assert write_directory(STATIONS + STATIONS[:2], path) == len(STATIONS)
+    loaded = read_directory(path)
+    assert [s.id for s in loaded] == ["KDEN", "KLAX", "KNYC", "KSAN", "KSFO"]
+    assert loaded[1] == STATIONS[0] and math.isnan(loaded[2].lat)
+    (tmp_path / "other.tsv").write_text("city\tid\n")
+    with pytest.raises(ValueError):
+        read_directory(tmp_path / "other.tsv")
+
+
+def test_search_matches_ids_names_and_later_words(directory):
+    assert [s.id for s in directory.search("san")] == ["KSAN", "KSFO"]
+    assert [s.id for s in directory.search("KLA")] == ["KLAX"]
+    # "International Airport" appears in three names; each station is listed once
+    assert sorted(s.id for s in directory.search("intern")) == ["KDEN", "KLAX", "KSAN", "KSFO"]
+    assert [s.id for s in directory.search("central")] == ["KNYC"]
+    assert [s.id for s in directory.search("k", limit=2)] == ["KDEN", "KLAX"]
+    assert sorted(s.id for s in directory.search("intern", state="ca")) == ["KLAX", "KSAN", "KSFO"]
+    assert directory.search("  ") == [] and directory.search("zzz") == []
+
+
+def test_lookups_by_id_and_state(directory):
+    assert directory.get("klax") == STATIONS[0]
+    assert [s.id for s in directory.in_state("CO")] == ["KDEN"]
+    assert STATIONS[0].label == "KLAX  Los Angeles, Los Angeles International Airport, CA"
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+def test_seek_parser_reads_href_and_link_text_across_chunks(chunk_size):
+    page = (SEEK_PAGES / "CA.html").read_bytes().decode("latin-1")
+    parser = SeekParser("ca")
+    for start in range(0, len(page), chunk_size):
+        parser.feed(page[start : start + chunk_size])
+    parser.close()
+    assert [s.id for s in parser.stations] == ["KLAX", "KSFO", "KSAN", "KSMF", "KFAT"]
+    assert parser.stations[0] == Station(
+        "KLAX", "Los Angeles, Los Angeles International Airport", "CA"
+    )
+
+
+def test_seek_page_is_decoded_with_the_declared_charset(monkeypatch, fake_response):
+    link = '<a href="display.php?stid=KSJU">San Juan, Luis Mu\u00f1oz Mar\u00edn Airport</a>'
+    body = link.encode("utf-8")
+    headers = http.client.HTTPMessage()
+    headers["Content-Type"] = "text/html; charset=utf-8"
+    monkeypatch.setattr(
+        noaa, "_urlopen_with_retry", lambda req, timeout: fake_response(body, headers)
+    )
+    # Split every multi-byte character across two reads
+    monkeypatch.setattr(stations, "_SEEK_CHUNK_SIZE", 1)
+
+    [station] = stations.fetch_seek_stations("PR")
+
+    assert (station.id, station.name) == ("KSJU", "San Juan, Luis Mu\u00f1oz Mar\u00edn Airport")
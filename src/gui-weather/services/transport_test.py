@@ -0,0 +1,178 @@
+"""Tests for the keep-alive connection pool against a local HTTP server."""
+
+import gzip
+import threading
+import urllib.error
+import urllib.request
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services.transport import ConnectionPool, ContentDecoder
+
+DOCUMENT = b'{"@context": "https://geojson.org", "geometry": [0, 0]}' * 200
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/document":
+            body = DOCUMENT
+            self.send_response(200)
+            if "gzip" in self.headers.get("Accept-Encoding", ""):
+                body = gzip.compress(body)
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        status = 404 if self.path == "/missing" else 200
+        body = b'{"ok": true}'
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ProxyHandler(BaseHTTPRequestHandler):
+    """Forward proxy stand-in: answers plain requests itself and refuses CONNECT tunnels."""
+
+    protocol_version = "HTTP/1.1"
+    seen: list[tuple[str, str, str | None]] = []
+
+    def do_GET(self):
+        self.seen.append(("GET", self.path, self.headers.get("Proxy-Authorization")))
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_CONNECT(self):
+        self.seen.append(("CONNECT", self.path, self.headers.get("Proxy-Authorization")))
+        self.send_response(403)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve(handler):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def no_proxy_environment(monkeypatch):
+    for name in ("http_proxy", "https_proxy", "no_proxy"):
+        monkeypatch.delenv(name, raising=False)
+        monkeypatch.delenv(name.upper(), raising=False)
+
+
+@pytest.fixture()
+def base_url():
+    yield from _serve(Handler)
+
+
+@pytest.fixture()
+def proxy_url():
+    ProxyHandler.seen = []
+    yield from _serve(ProxyHandler)
+
+
+def test_connections_are_reused_between_requests(base_url):
+    pool = ConnectionPool(max_per_host=2)
+    for _ in range(3):
+        with pool.urlopen(urllib.request.Request(base_url + "/obs"), timeout=5) as resp:
+            assert resp.read() == b'{"ok": true}'
+
+    stats = pool.stats()["127.0.0.1"]
+    assert (stats.requests, stats.opened, stats.reused) == (3, 1, 2)
+    pool.close()
+
+
+def test_error_status_raises_http_error_and_keeps_connection(base_url):
+    pool = ConnectionPool()
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        pool.urlopen(urllib.request.Request(base_url + "/missing"), timeout=5)
+    assert excinfo.value.code == 404
+
+    with pool.urlopen(urllib.request.Request(base_url + "/obs"), timeout=5) as resp:
+        resp.read()
+    assert pool.stats()["127.0.0.1"].reused == 1
+    pool.close()
+
+
+def test_gzip_bodies_are_decoded_while_streaming(base_url):
+    pool = ConnectionPool()
+    for _ in range(2):
+        with pool.urlopen(urllib.request.Request(base_url + "/document"), timeout=5) as resp:
+            chunks = iter(lambda: resp.read(1000), b"")
+            assert b"".join(chunks) == DOCUMENT
+
+    stats = pool.stats()["127.0.0.1"]
+    assert stats.bytes_decoded == 2 * len(DOCUMENT)
+    assert stats.bytes_received < stats.bytes_decoded / 10
+    assert stats.reused == 1
+    pool.close()
+
+
+def test_compression_can_be_disabled(base_url):
+    pool = ConnectionPool(accept_encoding=None)
+    with pool.urlopen(urllib.request.Request(base_url + "/document"), timeout=5) as resp:
+        assert resp.read() == DOCUMENT
+    stats = pool.stats()["127.0.0.1"]
+    assert stats.bytes_received == stats.bytes_decoded == len(DOCUMENT)
+    pool.close()
+
+
+@pytest.mark.parametrize("wbits", [zlib.MAX_WBITS, -zlib.MAX_WBITS])
+def test_deflate_accepts_zlib_wrapped_and_raw_streams(wbits):
+    compressor = zlib.compressobj(wbits=wbits)
+    data = compressor.compress(DOCUMENT) + compressor.flush()
+    decoder = ContentDecoder.for_encoding("deflate")
+    assert decoder is not None
+    assert decoder.decompress(data[:10]) + decoder.decompress(data[10:]) + decoder.flush() == (
+        DOCUMENT
+    )
+
+
+def test_http_requests_go_through_the_environment_proxy(proxy_url, monkeypatch):
+    monkeypatch.setenv("http_proxy", proxy_url.replace("http://", "http://user:secret@"))
+    pool = ConnectionPool()
+    with pool.urlopen(urllib.request.Request("http://weather.example/obs?id=KLAX"), 5) as resp:
+        assert resp.read() == b'{"ok": true}'
+
+    assert ProxyHandler.seen == [
+        ("GET", "http://weather.example/obs?id=KLAX", "Basic dXNlcjpzZWNyZXQ=")
+    ]
+    assert pool.stats()["weather.example"].requests == 1
+    pool.close()
+
+
+def test_https_requests_are_tunnelled_through_the_proxy(proxy_url, monkeypatch):
+    monkeypatch.setenv("https_proxy", proxy_url)
+    pool = ConnectionPool()
+    with pytest.raises(OSError, match="Tunnel connection failed: 403"):
+        pool.urlopen(urllib.request.Request("https://weather.example/obs"), timeout=5)
+
+    assert ProxyHandler.seen == [("CONNECT", "weather.example:443", None)]
+
+
+def test_no_proxy_hosts_are_reached_directly(base_url, monkeypatch):
+    monkeypatch.setenv("http_proxy", "http://127.0.0.1:9")
+    monkeypatch.setenv("no_proxy", "127.0.0.1")
+    pool = ConnectionPool()
+    with pool.urlopen(urllib.request.Request(base_url + "/obs"), timeout=5) as resp:
+        assert resp.read() == b'{"ok": true}'
+    pool.close()
@@ -6,17 +6,22 @@ Created on Aug 13, 2020
 # ===========
 # IMPORTS
 # ===========
-from html.parser import HTMLParser
+import io
 import os
 import tkinter as tk
 from tkinter import Menu, scrolledtext, ttk
-import urllib.request
-from urllib.request import Request, urlopen
-
-from PIL import Image, ImageTk
+from typing import TYPE_CHECKING
 
+from background import BackgroundRunner
+from refresh import REFRESH_CHOICES, AutoRefresh, DiffUpdater
+from services import noaa
+from services.diskcache import DiskCache, default_cache_path
 from services.noaa import get_noaa_current_obs
-from services.owm import get_open_weather_data as owm_fetch
+from services.stations import StationDirectory, default_directory_path, fetch_seek_stations
+
+# PIL and the OpenWeatherMap services load when the tabs that use them are first shown
+if TYPE_CHECKING:
+    from PIL import ImageTk
 
 # Optional local module for API key; fallback to env var
 try:
@@ -24,6 +29,13 @@ try:
 except Exception:
     OWM_API_KEY = os.getenv("OWM_API_KEY", "")
 
+# Persist observations across restarts; fall back to memory-only caching if unavailable
+DISK_CACHE: DiskCache | None = None
+try:
+    DISK_CACHE = noaa.OBS_CACHE.store = DiskCache(default_cache_path())
+except Exception:
+    pass
+
 # ============
 # FUNCTIONS
 # ============
@@ -31,6 +43,7 @@ except Exception:
 
 # Exit GUI Cleanly
 def _quit():
+    TASKS.shutdown()
     win.quit()
     win.destroy()
     exit()
@@ -46,6 +59,9 @@ win = tk.Tk()
 # Add a title:
 win.title("Weather App")
 
+# Network calls run here; their results come back to the Tk thread through win.after
+TASKS = BackgroundRunner(win.after)
+
 # ---------------------
 # Creating a Menu Bar
 menu_bar = Menu()
@@ -78,114 +94,188 @@ tab_control.add(tab_4, text="OpenWeather")
 tab_control.pack(expand=1, fill="both")
 # ---------------------
 
-# Container frame to hold all other widgets:
-weather_frame = ttk.LabelFrame(tab_1, text=" Current Weather Conditions ")
-
-# Tkinter grid layout manager:
-weather_frame.grid(column=0, row=0, padx=8, pady=4)
-weather_frame.grid_configure(column=0, row=1, padx=8, pady=4)
-
-weather_cities_frame = ttk.LabelFrame(tab_1, text=" Latest Observation for ")
-weather_cities_frame.grid(column=0, row=0, padx=8, pady=4)
-ttk.Label(weather_cities_frame, text="Weather Station ID: ").grid(column=0, row=0)
-
-# ==========================
-ENTRY_WIDTH = 22
-# ==========================
-# Adding Label and
-# Textbox Entry Widgets
-# ==========================
-
-ttk.Label(weather_frame, text="Last Updated: ").grid(column=0, row=1, sticky="E")
-updated = tk.StringVar()
-updated_entry = ttk.Entry(weather_frame, width=ENTRY_WIDTH, textvariable=updated, state="readonly")
-updated_entry.grid(column=1, row=1, sticky="W")
-
-ttk.Label(weather_frame, text="Weather: ").grid(column=0, row=2, sticky="E")
-weather_desc = tk.StringVar()
-weather_entry = ttk.Entry(
-    weather_frame, width=ENTRY_WIDTH, textvariable=weather_desc, state="readonly"
-)
-weather_entry.grid(column=1, row=2, sticky="W")
-
-ttk.Label(weather_frame, text="Temperature: ").grid(column=0, row=3, sticky="E")
-temperature = tk.StringVar()
-temperature_entry = ttk.Entry(
-    weather_frame, width=ENTRY_WIDTH, textvariable=temperature, state="readonly"
-)
-temperature_entry.grid(column=1, row=3, sticky="W")
-
-ttk.Label(weather_frame, text="Dew Point: ").grid(column=0, row=4, sticky="E")
-dew_point = tk.StringVar()
-dew_point_entry = ttk.Entry(
-    weather_frame, width=ENTRY_WIDTH, textvariable=dew_point, state="readonly"
-)
-dew_point_entry.grid(column=1, row=4, sticky="W")
-
-ttk.Label(weather_frame, text="Relative Humidity: ").grid(column=0, row=5, sticky="E")
-humidity = tk.StringVar()
-humidity_entry = ttk.Entry(
-    weather_frame, width=ENTRY_WIDTH, textvariable=humidity, state="readonly"
-)
-humidity_entry.grid(column=1, row=5, sticky="W")
-
-ttk.Label(weather_frame, text="Wind: ").grid(column=0, row=6, sticky="E")
-wind = tk.StringVar()
-wind_entry = ttk.Entry(weather_frame, width=ENTRY_WIDTH, textvariable=wind, state="readonly")
-wind_entry.grid(column=1, row=6, sticky="W")
-
-ttk.Label(weather_frame, text="Visibility: ").grid(column=0, row=7, sticky="E")
-visibility = tk.StringVar()
-visibility_entry = ttk.Entry(
-    weather_frame, width=ENTRY_WIDTH, textvariable=visibility, state="readonly"
-)
-visibility_entry.grid(column=1, row=7, sticky="W")
-
-ttk.Label(weather_frame, text="MSL Pressure: ").grid(column=0, row=8, sticky="E")
-pressure = tk.StringVar()
-pressure_entry = ttk.Entry(
-    weather_frame, width=ENTRY_WIDTH, textvariable=pressure, state="readonly"
-)
-pressure_entry.grid(column=1, row=8, sticky="W")
-
-ttk.Label(weather_frame, text="Altimeter: ").grid(column=0, row=9, sticky="E")
-altimeter = tk.StringVar()
-altimeter_entry = ttk.Entry(
-    weather_frame, width=ENTRY_WIDTH, textvariable=altimeter, state="readonly"
-)
-altimeter_entry.grid(column=1, row=9, sticky="W")
-
-# Spacing around labels:
-for child in weather_frame.winfo_children():
-    child.grid_configure(padx=4, pady=2)
-
 
 # ========================================================
 # NOAA (National Oceanic and Atmospheric Administration)
 # ========================================================
 
-station_id = tk.StringVar()
-station_id_combo = ttk.Combobox(weather_cities_frame, width=6, textvariable=station_id)
-station_id_combo["values"] = ("KLAX", "KDEN", "KNYC")
-station_id_combo.grid(column=1, row=0)
-station_id_combo.current(0)
 
+def _build_noaa_tab():
+    global station_id_combo, NOAA_REFRESH, NOAA_VIEW
 
-def _get_station():
-    station = station_id_combo.get()
-    get_weather_data(station)
-    populate_gui()
+    # Container frame to hold all other widgets:
+    weather_frame = ttk.LabelFrame(tab_1, text=" Current Weather Conditions ")
+
+    # Tkinter grid layout manager:
+    weather_frame.grid(column=0, row=0, padx=8, pady=4)
+    weather_frame.grid_configure(column=0, row=1, padx=8, pady=4)
+
+    weather_cities_frame = ttk.LabelFrame(tab_1, text=" Latest Observation for ")
+    weather_cities_frame.grid(column=0, row=0, padx=8, pady=4)
+    ttk.Label(weather_cities_frame, text="Weather Station ID: ").grid(column=0, row=0)
+
+    # ==========================
+    ENTRY_WIDTH = 22
+    # ==========================
+    # Adding Label and
+    # Textbox Entry Widgets
+    # ==========================
+
+    ttk.Label(weather_frame, text="Last Updated: ").grid(column=0, row=1, sticky="E")
+    updated = tk.StringVar()
+    updated_entry = ttk.Entry(
+        weather_frame, width=ENTRY_WIDTH, textvariable=updated, state="readonly"
+    )
+    updated_entry.grid(column=1, row=1, sticky="W")
+
+    ttk.Label(weather_frame, text="Weather: ").grid(column=0, row=2, sticky="E")
+    weather_desc = tk.StringVar()
+    weather_entry = ttk.Entry(
+        weather_frame, width=ENTRY_WIDTH, textvariable=weather_desc, state="readonly"
+    )
+    weather_entry.grid(column=1, row=2, sticky="W")
+
+    ttk.Label(weather_frame, text="Temperature: ").grid(column=0, row=3, sticky="E")
+    temperature = tk.StringVar()
+    temperature_entry = ttk.Entry(
+        weather_frame, width=ENTRY_WIDTH, textvariable=temperature, state="readonly"
+    )
+    temperature_entry.grid(column=1, row=3, sticky="W")
+
+    ttk.Label(weather_frame, text="Dew Point: ").grid(column=0, row=4, sticky="E")
+    dew_point = tk.StringVar()
+    dew_point_entry = ttk.Entry(
+        weather_frame, width=ENTRY_WIDTH, textvariable=dew_point, state="readonly"
+    )
+    dew_point_entry.grid(column=1, row=4, sticky="W")
+
+    ttk.Label(weather_frame, text="Relative Humidity: ").grid(column=0, row=5, sticky="E")
+    humidity = tk.StringVar()
+    humidity_entry = ttk.Entry(
+        weather_frame, width=ENTRY_WIDTH, textvariable=humidity, state="readonly"
+    )
+    humidity_entry.grid(column=1, row=5, sticky="W")
+
+    ttk.Label(weather_frame, text="Wind: ").grid(column=0, row=6, sticky="E")
+    wind = tk.StringVar()
+    wind_entry = ttk.Entry(weather_frame, width=ENTRY_WIDTH, textvariable=wind, state="readonly")
+    wind_entry.grid(column=1, row=6, sticky="W")
+
+    ttk.Label(weather_frame, text="Visibility: ").grid(column=0, row=7, sticky="E")
+    visibility = tk.StringVar()
+    visibility_entry = ttk.Entry(
+        weather_frame, width=ENTRY_WIDTH, textvariable=visibility, state="readonly"
+    )
+    visibility_entry.grid(column=1, row=7, sticky="W")
+
+    ttk.Label(weather_frame, text="MSL Pressure: ").grid(column=0, row=8, sticky="E")
+    pressure = tk.StringVar()
+    pressure_entry = ttk.Entry(
+        weather_frame, width=ENTRY_WIDTH, textvariable=pressure, state="readonly"
+    )
+    pressure_entry.grid(column=1, row=8, sticky="W")
 
+    ttk.Label(weather_frame, text="Altimeter: ").grid(column=0, row=9, sticky="E")
+    altimeter = tk.StringVar()
+    altimeter_entry = ttk.Entry(
+        weather_frame, width=ENTRY_WIDTH, textvariable=altimeter, state="readonly"
+    )
+    altimeter_entry.grid(column=1, row=9, sticky="W")
+
+    # Spacing around labels:
+    for child in weather_frame.winfo_children():
+        child.grid_configure(padx=4, pady=2)
+
+    station_id = tk.StringVar()
+    station_id_combo = ttk.Combobox(weather_cities_frame, width=28, textvariable=station_id)
+    station_id_combo["values"] = DEFAULT_STATIONS
+    station_id_combo.grid(column=1, row=0)
+    station_id_combo.current(0)
+    # Typing filters the list through the offline station directory, once it has loaded
+    station_id_combo.bind("<KeyRelease>", _filter_stations)
+    TASKS.submit(
+        "directory",
+        lambda: StationDirectory.load(default_directory_path()),
+        on_done=_set_station_directory,
+        on_error=lambda exc: None,  # not built yet (python -m services.stations)
+    )
+
+    get_weather_btn = ttk.Button(weather_cities_frame, text="Get Weather", command=_get_station)
+    get_weather_btn.grid(column=2, row=0)
+
+    # Station City label
+    location = tk.StringVar()
+    ttk.Label(weather_cities_frame, textvariable=location).grid(column=0, row=1, columnspan=3)
+
+    # Auto-refresh interval for this tab
+    ttk.Label(weather_cities_frame, text="Auto-refresh: ").grid(column=0, row=2)
+    noaa_refresh = tk.StringVar(value="Off")
+    noaa_refresh_combo = ttk.Combobox(
+        weather_cities_frame,
+        width=6,
+        textvariable=noaa_refresh,
+        values=tuple(REFRESH_CHOICES),
+        state="readonly",
+    )
+    noaa_refresh_combo.grid(column=1, row=2)
+    NOAA_REFRESH = AutoRefresh(win.after, win.after_cancel, lambda: _get_station(auto=True))
+    noaa_refresh_combo.bind(
+        "<<ComboboxSelected>>",
+        lambda _event: NOAA_REFRESH.set_interval(REFRESH_CHOICES[noaa_refresh.get()]),
+    )
+
+    for child in weather_cities_frame.winfo_children():
+        child.grid_configure(padx=5, pady=4)
+
+    # Only the fields that changed since the last refresh are set, in one idle pass
+    NOAA_VIEW = DiffUpdater(
+        win.after_idle,
+        {
+            "location": location,
+            "updated": updated,
+            "weather": weather_desc,
+            "temperature": temperature,
+            "dew_point": dew_point,
+            "humidity": humidity,
+            "wind": wind,
+            "visibility": visibility,
+            "pressure": pressure,
+            "altimeter": altimeter,
+        },
+    )
+
+
+DEFAULT_STATIONS = ("KLAX", "KDEN", "KNYC")
+STATION_DIRECTORY = StationDirectory([])
+
+
+def _set_station_directory(directory):
+    global STATION_DIRECTORY
+    STATION_DIRECTORY = directory
+
+
+def _filter_stations(event):
+    if event.keysym in ("Up", "Down", "Return", "Escape", "Tab"):
+        return  # moving through or picking from the list
+    text = station_id_combo.get()
+    matches = STATION_DIRECTORY.search(text) if text.strip() else []
+    station_id_combo["values"] = [station.label for station in matches] or DEFAULT_STATIONS
 
-get_weather_btn = ttk.Button(weather_cities_frame, text="Get Weather", command=_get_station).grid(
-    column=2, row=0
-)
 
-# Station City label
-location = tk.StringVar()
-ttk.Label(weather_cities_frame, textvariable=location).grid(column=0, row=1, columnspan=3)
-for child in weather_cities_frame.winfo_children():
-    child.grid_configure(padx=5, pady=4)
+def _get_station(auto=False):
+    # Directory entries read "KLAX  Los Angeles ..."; the station ID comes first
+    station = (station_id_combo.get().split() or [""])[0].upper()
+    if auto and TASKS.busy("noaa"):
+        return  # the previous refresh is still running
+    if not auto:
+        NOAA_VIEW.stage({"location": f"Fetching {station}..."})
+    TASKS.submit(
+        "noaa",
+        lambda: get_weather_data(station),
+        on_done=_show_station,
+        on_error=lambda exc: NOAA_VIEW.stage({"location": f"{station}: {exc}"}),
+    )
+
 
 WEATHER_DATA = {
     "observation_time": "",
@@ -204,271 +294,351 @@ WEATHER_DATA = {
 
 
 def get_weather_data(station_id):
-    # Prefer NWS v3 JSON with XML fallback via service wrapper
+    # Prefer NWS v3 JSON with XML fallback via service wrapper (runs on a worker thread)
     data_dict, _icon_url = get_noaa_current_obs(station_id, timeout=10)
-    for key in WEATHER_DATA.keys():
-        WEATHER_DATA[key] = data_dict.get(key, "")
+    return {key: data_dict.get(key, "") for key in WEATHER_DATA}
+
+
+def _show_station(data):
+    WEATHER_DATA.update(data)
+    populate_gui()
 
 
 def populate_gui():
-    location.set(WEATHER_DATA["location"])
-    updated.set(WEATHER_DATA["observation_time"].replace("Last Updated on ", ""))
-    weather_desc.set(WEATHER_DATA["weather"])
-    temperature.set("{} \xb0F  ({} \xb0C)".format(WEATHER_DATA["temp_f"], WEATHER_DATA["temp_c"]))
-    dew_point.set(
-        "{} \xb0F  ({} \xb0C)".format(WEATHER_DATA["dewpoint_f"], WEATHER_DATA["dewpoint_c"])
+    NOAA_VIEW.stage(
+        {
+            "location": WEATHER_DATA["location"],
+            "updated": WEATHER_DATA["observation_time"].replace("Last Updated on ", ""),
+            "weather": WEATHER_DATA["weather"],
+            "temperature": "{} \xb0F  ({} \xb0C)".format(
+                WEATHER_DATA["temp_f"], WEATHER_DATA["temp_c"]
+            ),
+            "dew_point": "{} \xb0F  ({} \xb0C)".format(
+                WEATHER_DATA["dewpoint_f"], WEATHER_DATA["dewpoint_c"]
+            ),
+            "humidity": WEATHER_DATA["relative_humidity"] + " %",
+            "wind": WEATHER_DATA["wind_string"],
+            "visibility": WEATHER_DATA["visibility_mi"] + " miles",
+            "pressure": WEATHER_DATA["pressure_string"],
+            "altimeter": WEATHER_DATA["pressure_in"] + " in Hg",
+        }
     )
-    humidity.set(WEATHER_DATA["relative_humidity"] + " %")
-    wind.set(WEATHER_DATA["wind_string"])
-    visibility.set(WEATHER_DATA["visibility_mi"] + " miles")
-    pressure.set(WEATHER_DATA["pressure_string"])
-    altimeter.set(WEATHER_DATA["pressure_in"] + " in Hg")
 
 
 # ==============
 # STATION DATA
 # ==============
 
-weather_states_frame = ttk.LabelFrame(tab_2, text=" Weather Station IDs ")
-weather_states_frame.grid(column=0, row=0, padx=8, pady=4)
-ttk.Label(weather_states_frame, text="Select a State: ").grid(column=0, row=0)
-
-state = tk.StringVar()
-state_combo = ttk.Combobox(weather_states_frame, width=5, textvariable=state)
-state_combo["values"] = (
-    "AL",
-    "AK",
-    "AZ",
-    "AR",
-    "CA",
-    "CO",
-    "CT",
-    "DE",
-    "FL",
-    "GA",
-    "HI",
-    "ID",
-    "IL",
-    "IN",
-    "IA",
-    "KS",
-    "KY",
-    "LA",
-    "ME",
-    "MD",
-    "MA",
-    "MI",
-    "MN",
-    "MS",
-    "MO",
-    "MT",
-    "NE",
-    "NV",
-    "NH",
-    "NJ",
-    "NM",
-    "NY",
-    "NC",
-    "ND",
-    "OH",
-    "OK",
-    "OR",
-    "PA",
-    "RI",
-    "SC",
-    "SD",
-    "TN",
-    "TX",
-    "UT",
-    "VT",
-    "VA",
-    "WA",
-    "WV",
-    "WI",
-    "WY",
-)
-
-state_combo.grid(column=1, row=0)
-state_combo.current(0)
-
 
-def _get_cities():
-    state = state_combo.get()
-    get_city_station_ids(state)
+def _build_stations_tab():
+    global state_combo, scroll
+
+    weather_states_frame = ttk.LabelFrame(tab_2, text=" Weather Station IDs ")
+    weather_states_frame.grid(column=0, row=0, padx=8, pady=4)
+    ttk.Label(weather_states_frame, text="Select a State: ").grid(column=0, row=0)
+
+    state = tk.StringVar()
+    state_combo = ttk.Combobox(weather_states_frame, width=5, textvariable=state)
+    state_combo["values"] = (
+        "AL",
+        "AK",
+        "AZ",
+        "AR",
+        "CA",
+        "CO",
+        "CT",
+        "DE",
+        "FL",
+        "GA",
+        "HI",
+        "ID",
+        "IL",
+        "IN",
+        "IA",
+        "KS",
+        "KY",
+        "LA",
+        "ME",
+        "MD",
+        "MA",
+        "MI",
+        "MN",
+        "MS",
+        "MO",
+        "MT",
+        "NE",
+        "NV",
+        "NH",
+        "NJ",
+        "NM",
+        "NY",
+        "NC",
+        "ND",
+        "OH",
+        "OK",
+        "OR",
+        "PA",
+        "RI",
+        "SC",
+        "SD",
+        "TN",
+        "TX",
+        "UT",
+        "VT",
+        "VA",
+        "WA",
+        "WV",
+        "WI",
+        "WY",
+    )
 
+    state_combo.grid(column=1, row=0)
+    state_combo.current(0)
 
-get_weather_btn = ttk.Button(weather_states_frame, text="Get Cities", command=_get_cities).grid(
-    column=2, row=0
-)
+    get_cities_btn = ttk.Button(weather_states_frame, text="Get Cities", command=_get_cities)
+    get_cities_btn.grid(column=2, row=0)
 
-scroll = scrolledtext.ScrolledText(weather_states_frame, width=38, height=17, wrap=tk.WORD)
-scroll.grid(column=0, row=1, columnspan=3)
+    scroll = scrolledtext.ScrolledText(weather_states_frame, width=38, height=17, wrap=tk.WORD)
+    scroll.grid(column=0, row=1, columnspan=3)
 
-for child in weather_states_frame.winfo_children():
-    child.grid_configure(padx=6, pady=6)
+    for child in weather_states_frame.winfo_children():
+        child.grid_configure(padx=6, pady=6)
 
 
-def get_city_station_ids(state):
-    # Retrieves HTML, not XML
-    url_general = "https://w1.weather.gov/xml/current_obs/seek.php?state={}&Find=Find"
-    state = state.lower()
-    url = url_general.format(state)
-    request = urllib.request.urlopen(url, timeout=10)
-    content = request.read().decode()
-    parser = WeatherHTMLParser()
-    parser.feed(content)
-
-    # Verify amount of stations vs. cities
-    print(len(parser.stations) == len(parser.cities))
-    # Clear scrolledText widget for next btn click
+def _get_cities():
+    state = state_combo.get()
+    listed = STATION_DIRECTORY.in_state(state)
+    if listed:
+        _show_cities(_station_lines(listed))
+        return
     scroll.delete("1.0", tk.END)
+    scroll.insert(tk.INSERT, f"Fetching stations for {state}...\n")
+    TASKS.submit(
+        "stations",
+        lambda: get_city_station_ids(state),
+        on_done=_show_cities,
+        on_error=lambda exc: _show_cities([f"{state}: {exc}"]),
+    )
 
-    for idx in range(len(parser.stations)):
-        city_station = parser.cities[idx] + " (" + parser.stations[idx] + ")"
-        print(city_station)
-        scroll.insert(tk.INSERT, city_station + "\n")
 
+def get_city_station_ids(state):
+    # Streams and parses the seek.php HTML page (runs on a worker thread)
+    return _station_lines(fetch_seek_stations(state, timeout=10))
 
-class WeatherHTMLParser(HTMLParser):
-    def __init__(self):
-        super().__init__()
-        self.stations = []
-        self.cities = []
-        self.grab_data = False
 
-    def handle_starttag(self, tag, attrs):
-        for attr in attrs:
-            if "display.php?stid=" in str(attr):
-                cleaned_attr = str(attr)
-                cleaned_attr = cleaned_attr.replace("('href', 'display.php?stid=", "")
-                cleaned_attr = cleaned_attr.replace("')", "")
-                self.stations.append(cleaned_attr)
-                self.grab_data = True
+def _station_lines(stations):
+    return [f"{station.name} ({station.id})" for station in stations]
 
-    def handle_data(self, data):
-        if self.grab_data:
-            self.cities.append(data)
-            self.grab_data = False
+
+def _show_cities(lines):
+    # Clear scrolledText widget for next btn click
+    scroll.delete("1.0", tk.END)
+    scroll.insert(tk.INSERT, "".join(line + "\n" for line in lines))
 
 
 # ========
 # IMAGES
 # ========
 
-weather_images_frame = ttk.LabelFrame(tab_3, text=" Weather Images ")
-weather_images_frame.grid(column=0, row=0, padx=8, pady=4)
 
-img = Image.open("img/few_clouds.png")
-photo = ImageTk.PhotoImage(img)
-ttk.Label(weather_images_frame, image=photo).grid(column=0, row=0)
+def _build_images_tab():
+    global photo, photo1, photo2
+    from PIL import Image, ImageTk
+
+    weather_images_frame = ttk.LabelFrame(tab_3, text=" Weather Images ")
+    weather_images_frame.grid(column=0, row=0, padx=8, pady=4)
 
-img = Image.open("img/night_few_clouds.png")
-photo1 = ImageTk.PhotoImage(img)
-ttk.Label(weather_images_frame, image=photo1).grid(column=1, row=0)
+    img = Image.open("img/few_clouds.png")
+    photo = ImageTk.PhotoImage(img)
+    ttk.Label(weather_images_frame, image=photo).grid(column=0, row=0)
 
-img = Image.open("img/night_fair.png")
-photo2 = ImageTk.PhotoImage(img)
-ttk.Label(weather_images_frame, image=photo2).grid(column=2, row=0)
+    img = Image.open("img/night_few_clouds.png")
+    photo1 = ImageTk.PhotoImage(img)
+    ttk.Label(weather_images_frame, image=photo1).grid(column=1, row=0)
+
+    img = Image.open("img/night_fair.png")
+    photo2 = ImageTk.PhotoImage(img)
+    ttk.Label(weather_images_frame, image=photo2).grid(column=2, row=0)
 
 
 # ====================
 # OpenWeatherMap API
 # ====================
 
-open_weather_cities_frame = ttk.LabelFrame(tab_4, text=" Latest Observation for ")
-open_weather_cities_frame.grid(column=0, row=0, padx=8, pady=4)
 
-open_location = tk.StringVar()
-ttk.Label(open_weather_cities_frame, textvariable=open_location).grid(column=0, row=1, columnspan=3)
+def _build_owm_tab():
+    global open_icon, open_city_combo, OWM_REFRESH, OWM_VIEW
+    _init_owm()
+
+    open_weather_cities_frame = ttk.LabelFrame(tab_4, text=" Latest Observation for ")
+    open_weather_cities_frame.grid(column=0, row=0, padx=8, pady=4)
+
+    open_location = tk.StringVar()
+    ttk.Label(open_weather_cities_frame, textvariable=open_location).grid(
+        column=0, row=1, columnspan=3
+    )
+
+    # One label for the condition icon, updated in place on every refresh (gridded on first use)
+    open_icon = ttk.Label(open_weather_cities_frame)
+
+    ttk.Label(open_weather_cities_frame, text="City: ").grid(column=0, row=0)
+
+    open_city = tk.StringVar()
+    open_city_combo = ttk.Combobox(open_weather_cities_frame, width=16, textvariable=open_city)
+    open_city_combo["values"] = (
+        "Los Angeles, US",
+        "London, UK",
+        "Paris, FR",
+        "Mumbai, IN",
+        "Beijing, CN",
+    )
+    open_city_combo.grid(column=1, row=0)
+    open_city_combo.current(0)
+
+    get_open_weather_btn = ttk.Button(
+        open_weather_cities_frame, text="Get Weather", command=_get_station_open
+    )
+    get_open_weather_btn.grid(column=2, row=0)
+
+    # Auto-refresh interval for this tab
+    ttk.Label(open_weather_cities_frame, text="Auto-refresh: ").grid(column=0, row=2)
+    owm_refresh = tk.StringVar(value="Off")
+    owm_refresh_combo = ttk.Combobox(
+        open_weather_cities_frame,
+        width=6,
+        textvariable=owm_refresh,
+        values=tuple(REFRESH_CHOICES),
+        state="readonly",
+    )
+    owm_refresh_combo.grid(column=1, row=2, sticky="W")
+    OWM_REFRESH = AutoRefresh(win.after, win.after_cancel, lambda: _get_station_open(auto=True))
+    owm_refresh_combo.bind(
+        "<<ComboboxSelected>>",
+        lambda _event: OWM_REFRESH.set_interval(REFRESH_CHOICES[owm_refresh.get()]),
+    )
+
+    for child in open_weather_cities_frame.winfo_children():
+        child.grid_configure(padx=5, pady=2)
+
+    open_frame = ttk.LabelFrame(tab_4, text=" Current Weather Conditions ")
+    open_frame.grid(column=0, row=1, padx=8, pady=4)
+
+    # ================
+    ENTRY_WIDTH = 25
+    # ================
+    # Adding Label & Textbox Entry widgets
+    # ---------------------------------------------
+    ttk.Label(open_frame, text="Last Updated:").grid(column=0, row=1, sticky="E")
+    open_updated = tk.StringVar()
+    open_updatedEntry = ttk.Entry(
+        open_frame, width=ENTRY_WIDTH, textvariable=open_updated, state="readonly"
+    )
+    open_updatedEntry.grid(column=1, row=1, sticky="W")
+
+    ttk.Label(open_frame, text="Weather:").grid(column=0, row=2, sticky="E")
+    open_weather = tk.StringVar()
+    open_weatherEntry = ttk.Entry(
+        open_frame, width=ENTRY_WIDTH, textvariable=open_weather, state="readonly"
+    )
+    open_weatherEntry.grid(column=1, row=2, sticky="W")
+
+    ttk.Label(open_frame, text="Temperature:").grid(column=0, row=3, sticky="E")
+    open_temp = tk.StringVar()
+    open_tempEntry = ttk.Entry(
+        open_frame, width=ENTRY_WIDTH, textvariable=open_temp, state="readonly"
+    )
+    open_tempEntry.grid(column=1, row=3, sticky="W")
+
+    ttk.Label(open_frame, text="Relative Humidity:").grid(column=0, row=5, sticky="E")
+    open_rel_humi = tk.StringVar()
+    open_rel_humiEntry = ttk.Entry(
+        open_frame, width=ENTRY_WIDTH, textvariable=open_rel_humi, state="readonly"
+    )
+    open_rel_humiEntry.grid(column=1, row=5, sticky="W")
+
+    ttk.Label(open_frame, text="Wind:").grid(column=0, row=6, sticky="E")
+    open_wind = tk.StringVar()
+    open_windEntry = ttk.Entry(
+        open_frame, width=ENTRY_WIDTH, textvariable=open_wind, state="readonly"
+    )
+    open_windEntry.grid(column=1, row=6, sticky="W")
 
-ttk.Label(open_weather_cities_frame, text="City: ").grid(column=0, row=0)
+    ttk.Label(open_frame, text="Visibility:").grid(column=0, row=7, sticky="E")
+    open_visi = tk.StringVar()
+    open_visiEntry = ttk.Entry(
+        open_frame, width=ENTRY_WIDTH, textvariable=open_visi, state="readonly"
+    )
+    open_visiEntry.grid(column=1, row=7, sticky="W")
+
+    ttk.Label(open_frame, text="Pressure:").grid(column=0, row=8, sticky="E")
+    open_msl = tk.StringVar()
+    open_mslEntry = ttk.Entry(
+        open_frame, width=ENTRY_WIDTH, textvariable=open_msl, state="readonly"
+    )
+    open_mslEntry.grid(column=1, row=8, sticky="W")
+
+    ttk.Label(open_frame, text="Sunrise:").grid(column=0, row=9, sticky="E")
+    sunrise = tk.StringVar()
+    sunriseEntry = ttk.Entry(open_frame, width=ENTRY_WIDTH, textvariable=sunrise, state="readonly")
+    sunriseEntry.grid(column=1, row=9, sticky="E")
+
+    ttk.Label(open_frame, text="Sunset:").grid(column=0, row=10, sticky="E")
+    sunset = tk.StringVar()
+    sunsetEntry = ttk.Entry(open_frame, width=ENTRY_WIDTH, textvariable=sunset, state="readonly")
+    sunsetEntry.grid(column=1, row=10, sticky="E")
+
+    for child in open_frame.winfo_children():
+        child.grid_configure(padx=4, pady=2)
+
+    # Only the fields that changed since the last refresh are set, in one idle pass
+    OWM_VIEW = DiffUpdater(
+        win.after_idle,
+        {
+            "location": open_location,
+            "updated": open_updated,
+            "weather": open_weather,
+            "temperature": open_temp,
+            "humidity": open_rel_humi,
+            "wind": open_wind,
+            "visibility": open_visi,
+            "pressure": open_msl,
+            "sunrise": sunrise,
+            "sunset": sunset,
+        },
+    )
 
-open_city = tk.StringVar()
-open_city_combo = ttk.Combobox(open_weather_cities_frame, width=16, textvariable=open_city)
-open_city_combo["values"] = (
-    "Los Angeles, US",
-    "London, UK",
-    "Paris, FR",
-    "Mumbai, IN",
-    "Beijing, CN",
-)
-open_city_combo.grid(column=1, row=0)
-open_city_combo.current(0)
 
+def _init_owm():
+    # Deferred until the OpenWeather tab is first shown, like the imports below it
+    from services import owm
+    from services.cityindex import CityIndex, default_index_path
+    from services.icons import ICONS
 
-def _get_station_open():
+    owm.OWM_CACHE.store = DISK_CACHE
+    # Query OWM by city ID when an offline index has been built (python -m services.cityindex)
+    try:
+        owm.CITY_INDEX = CityIndex.open(default_index_path())
+    except (OSError, ValueError):
+        pass
+    if OWM_API_KEY:
+        ICONS.prefetch()
+
+
+def _get_station_open(auto=False):
     city = open_city_combo.get()
-    get_open_weather_data(city)
-
-
-get_weather_btn = ttk.Button(
-    open_weather_cities_frame, text="Get Weather", command=_get_station_open
-).grid(column=2, row=0)
-
-for child in open_weather_cities_frame.winfo_children():
-    child.grid_configure(padx=5, pady=2)
-
-open_frame = ttk.LabelFrame(tab_4, text=" Current Weather Conditions ")
-open_frame.grid(column=0, row=1, padx=8, pady=4)
-
-# ================
-ENTRY_WIDTH = 25
-# ================
-# Adding Label & Textbox Entry widgets
-# ---------------------------------------------
-ttk.Label(open_frame, text="Last Updated:").grid(column=0, row=1, sticky="E")
-open_updated = tk.StringVar()
-open_updatedEntry = ttk.Entry(
-    open_frame, width=ENTRY_WIDTH, textvariable=open_updated, state="readonly"
-)
-open_updatedEntry.grid(column=1, row=1, sticky="W")
-
-ttk.Label(open_frame, text="Weather:").grid(column=0, row=2, sticky="E")
-open_weather = tk.StringVar()
-open_weatherEntry = ttk.Entry(
-    open_frame, width=ENTRY_WIDTH, textvariable=open_weather, state="readonly"
-)
-open_weatherEntry.grid(column=1, row=2, sticky="W")
-
-ttk.Label(open_frame, text="Temperature:").grid(column=0, row=3, sticky="E")
-open_temp = tk.StringVar()
-open_tempEntry = ttk.Entry(open_frame, width=ENTRY_WIDTH, textvariable=open_temp, state="readonly")
-open_tempEntry.grid(column=1, row=3, sticky="W")
-
-ttk.Label(open_frame, text="Relative Humidity:").grid(column=0, row=5, sticky="E")
-open_rel_humi = tk.StringVar()
-open_rel_humiEntry = ttk.Entry(
-    open_frame, width=ENTRY_WIDTH, textvariable=open_rel_humi, state="readonly"
-)
-open_rel_humiEntry.grid(column=1, row=5, sticky="W")
-
-ttk.Label(open_frame, text="Wind:").grid(column=0, row=6, sticky="E")
-open_wind = tk.StringVar()
-open_windEntry = ttk.Entry(open_frame, width=ENTRY_WIDTH, textvariable=open_wind, state="readonly")
-open_windEntry.grid(column=1, row=6, sticky="W")
-
-ttk.Label(open_frame, text="Visibility:").grid(column=0, row=7, sticky="E")
-open_visi = tk.StringVar()
-open_visiEntry = ttk.Entry(open_frame, width=ENTRY_WIDTH, textvariable=open_visi, state="readonly")
-open_visiEntry.grid(column=1, row=7, sticky="W")
-
-ttk.Label(open_frame, text="Pressure:").grid(column=0, row=8, sticky="E")
-open_msl = tk.StringVar()
-open_mslEntry = ttk.Entry(open_frame, width=ENTRY_WIDTH, textvariable=open_msl, state="readonly")
-open_mslEntry.grid(column=1, row=8, sticky="W")
-
-ttk.Label(open_frame, text="Sunrise:").grid(column=0, row=9, sticky="E")
-sunrise = tk.StringVar()
-sunriseEntry = ttk.Entry(open_frame, width=ENTRY_WIDTH, textvariable=sunrise, state="readonly")
-sunriseEntry.grid(column=1, row=9, sticky="E")
-
-ttk.Label(open_frame, text="Sunset:").grid(column=0, row=10, sticky="E")
-sunset = tk.StringVar()
-sunsetEntry = ttk.Entry(open_frame, width=ENTRY_WIDTH, textvariable=sunset, state="readonly")
-sunsetEntry.grid(column=1, row=10, sticky="E")
-
-for child in open_frame.winfo_children():
-    child.grid_configure(padx=4, pady=2)
+    if not OWM_API_KEY:
+        OWM_VIEW.stage({"location": "OpenWeatherMap API key not set"})
+        return
+    if auto and TASKS.busy("owm"):
+        return  # the previous refresh is still running
+    if not auto:
+        OWM_VIEW.stage({"location": f"Fetching {city}..."})
+    TASKS.submit(
+        "owm",
+        lambda: get_open_weather_data(city),
+        on_done=_show_open_weather,
+        on_error=lambda exc: OWM_VIEW.stage({"location": f"{city}: {exc}"}),
+    )
 
 
 # ================================
@@ -477,35 +647,84 @@ for child in open_frame.winfo_children():
 
 
 def get_open_weather_data(city):
-    if not OWM_API_KEY:
-        open_location.set("OpenWeatherMap API key not set")
-        return
+    from services.icons import ICONS
+    from services.owm import get_open_weather_data as owm_fetch
+
+    # Runs on a worker thread; also loads the icon so the Tk thread only decodes it
     data = owm_fetch(city, OWM_API_KEY, timeout=10)
+    if data.get("weather_icon"):
+        try:
+            ICONS.get(data["weather_icon"])
+        except Exception:
+            pass  # show the observation without its icon
+    return data
+
+
+_shown_icon = ""
+_icon_photos: "dict[str, ImageTk.PhotoImage]" = {}
+
+
+def _show_open_weather(data):
+    global _shown_icon
+    from services.icons import ICONS
 
     # Update GUI entry widgets with live data
-    open_location.set(data["location"])
-    open_updated.set(data["lastupdate"])
-    open_weather.set(data["weather"])
-    open_temp.set("{} \xb0F  ({} \xb0C)".format(data["temp_f"], data["temp_c"]))
-    open_rel_humi.set(data["humidity"])
-    open_wind.set(data["wind"])
-    open_visi.set(data["visibility"])
-    open_msl.set(data["pressure"])
-    sunrise.set(data.get("sunrise", ""))
-    sunset.set(data.get("sunset", ""))
-
-    # Icon
+    OWM_VIEW.stage(
+        {
+            "location": data["location"],
+            "updated": data["lastupdate"],
+            "weather": data["weather"],
+            "temperature": "{} \xb0F  ({} \xb0C)".format(data["temp_f"], data["temp_c"]),
+            "humidity": data["humidity"],
+            "wind": data["wind"],
+            "visibility": data["visibility"],
+            "pressure": data["pressure"],
+            "sunrise": data.get("sunrise", ""),
+            "sunset": data.get("sunset", ""),
+        }
+    )
+
+    # Icon; if the new one could not be loaded, clear the previous city's rather than keep it
     weather_icon = data.get("weather_icon", "")
-    if weather_icon:
-        url_icon = f"https://openweathermap.org/img/w/{weather_icon}.png"
-        req = Request(url_icon, headers={"User-Agent": "python-projects/gui"})
-        ico = urlopen(req, timeout=10)
-        open_im = Image.open(ico)
-        open_photo = ImageTk.PhotoImage(open_im)
-        # Prevent garbage collection of the image reference
-        open_weather_cities_frame.open_photo = open_photo
-        ttk.Label(open_weather_cities_frame, image=open_photo).grid(column=0, row=1)
-        win.update()
+    if weather_icon != _shown_icon:
+        photo = _icon_photo(weather_icon) if weather_icon in ICONS else None
+        open_icon.configure(image=photo if photo is not None else "")
+        open_icon.grid(column=0, row=1)
+        _shown_icon = weather_icon if photo is not None else ""
+
+
+def _icon_photo(code):
+    # Decoded once per icon code; the dict also keeps the images from being garbage collected
+    photo = _icon_photos.get(code)
+    if photo is None:
+        from PIL import Image, ImageTk
+        from services.icons import ICONS
+
+        try:
+            photo = ImageTk.PhotoImage(Image.open(io.BytesIO(ICONS.get(code))))
+        except OSError:
+            return None  # truncated or not a PNG
+        _icon_photos[code] = photo
+    return photo
+
+
+# Tabs are built the first time they are selected, so only the visible one delays startup
+TAB_BUILDERS = {
+    str(tab_1): _build_noaa_tab,
+    str(tab_2): _build_stations_tab,
+    str(tab_3): _build_images_tab,
+    str(tab_4): _build_owm_tab,
+}
+
+
+def _build_selected_tab(_event=None):
+    builder = TAB_BUILDERS.pop(tab_control.select(), None)
+    if builder is not None:
+        builder()
+
+
+tab_control.bind("<<NotebookTabChanged>>", _build_selected_tab)
+_build_selected_tab()
 
 
 # ============